@@ -17,6 +17,11 @@ logger = logging.getLogger(__name__)
 # Import des modules du package
 from ai_scrapping_toolkit.src.processors import html_to_chunks, pdf_to_chunks
 from ai_scrapping_toolkit.src.llm import get_llm_provider, extract_data_from_chunks, aggregate_extraction_results
+from ai_scrapping_toolkit.src.llm.data_extractor import default_parallelism
+
+# Nombre d'appels LLM simultanés imposé par l'environnement ; par défaut, il dépend
+# du provider (un serveur Ollama local ne traite qu'une requête à la fois)
+LLM_MAX_WORKERS = int(os.environ['LLM_MAX_WORKERS']) if os.environ.get('LLM_MAX_WORKERS') else None
 
 def main():
     parser = argparse.ArgumentParser(
@@ -160,7 +165,7 @@ def main():
                 query=query,
                 llm_provider=llm_provider,
                 url=args.source_url or "",
-                max_workers=min(4, len(chunks))
+                max_workers=min(LLM_MAX_WORKERS or default_parallelism(llm_provider), max(1, len(chunks)))
             )
             aggregated_data = result
         else:
@@ -168,7 +173,7 @@ def main():
                 chunks=chunks,
                 query=query,
                 llm_provider=llm_provider,
-                max_workers=min(4, len(chunks)),
+                max_workers=min(LLM_MAX_WORKERS or default_parallelism(llm_provider), max(1, len(chunks))),
                 enhanced_mode=False
             )
             aggregated_data = aggregate_extraction_results(extraction_results)
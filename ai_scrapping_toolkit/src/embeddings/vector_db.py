@@ -4,30 +4,60 @@ et la gestion d'une base de données vectorielle avec FAISS.
 """
 
 import os
+import functools
 import numpy as np
 import faiss
 import pickle
 from sentence_transformers import SentenceTransformer
-from typing import List, Dict, Tuple, Union, Optional, Any
+from typing import List, Dict, Tuple, Union, Optional, Any, Iterator
 
-def load_embedding_model(model_name: str = 'all-MiniLM-L6-v2') -> SentenceTransformer:
+from ..llm.model_registry import get_model
+
+# Backend d'inférence du modèle d'embedding : "torch" (défaut) ou "onnx"
+EMBEDDING_BACKEND = os.environ.get("AI_SCRAPPING_EMBEDDING_BACKEND", "torch")
+
+# Fichier ONNX à charger avec le backend "onnx" (ex: version quantifiée int8)
+ONNX_MODEL_FILE = os.environ.get("AI_SCRAPPING_ONNX_MODEL_FILE", "onnx/model_qint8_avx512_vnni.onnx")
+
+def load_embedding_model(
+    model_name: str = 'all-MiniLM-L6-v2',
+    backend: Optional[str] = None
+) -> SentenceTransformer:
     """
     Charge un modèle de sentence-transformers pour générer des embeddings.
     
     Args:
         model_name (str): Nom du modèle à utiliser
+        backend (str, optional): "torch" ou "onnx" (défaut: AI_SCRAPPING_EMBEDDING_BACKEND)
         
     Returns:
         SentenceTransformer: Instance du modèle chargé
     """
     try:
-        model = SentenceTransformer(model_name)
-        print(f"Modèle d'embedding '{model_name}' chargé avec succès.")
-        return model
+        # Le modèle est chargé une seule fois par processus, par nom et par backend
+        return get_model(_create_embedding_model, model_name, backend or EMBEDDING_BACKEND)
     except Exception as e:
         print(f"Erreur lors du chargement du modèle: {str(e)}")
         raise
 
+def _create_embedding_model(model_name: str, backend: str) -> SentenceTransformer:
+    if backend == "onnx":
+        try:
+            # Inférence ONNX Runtime quantifiée int8 (sentence-transformers >= 3.2)
+            model = SentenceTransformer(
+                model_name,
+                backend="onnx",
+                model_kwargs={"file_name": ONNX_MODEL_FILE}
+            )
+            print(f"Modèle d'embedding '{model_name}' chargé avec succès (ONNX: {ONNX_MODEL_FILE}).")
+            return model
+        except (TypeError, ImportError, OSError, ValueError) as e:
+            print(f"Backend ONNX indisponible ({str(e)}), utilisation de PyTorch.")
+    
+    model = SentenceTransformer(model_name)
+    print(f"Modèle d'embedding '{model_name}' chargé avec succès.")
+    return model
+
 def chunks_to_embeddings(
     chunks: List[str], 
     model: Optional[SentenceTransformer] = None,
@@ -69,6 +99,9 @@ def chunks_to_embeddings(
         print(f"Erreur lors de la génération des embeddings: {str(e)}")
         raise
 
+# Nombre minimum de vecteurs pour entraîner les 256 centroïdes de la quantification produit
+PQ_MIN_TRAINING_POINTS = 39 * 256
+
 def create_faiss_index(
     embeddings: np.ndarray,
     chunks: List[str],
@@ -81,7 +114,7 @@ def create_faiss_index(
     Args:
         embeddings (np.ndarray): Matrice des vecteurs d'embedding
         chunks (List[str]): Liste de chunks de texte correspondants
-        index_type (str): Type d'index FAISS ('L2', 'IP', 'Flat', 'IVF', etc.)
+        index_type (str): Type d'index FAISS ('L2', 'IP', 'IVF', 'HNSW', 'IVFPQ')
         metadata (List[Dict]): Metadata optionnelle pour chaque chunk
         
     Returns:
@@ -108,7 +141,22 @@ def create_faiss_index(
         index = faiss.IndexIVFFlat(quantizer, dim, nlist)
         index.train(embeddings)
         index.nprobe = 16  # nombre de cellules à explorer pour la recherche (compromis vitesse/précision)
+    elif index_type == 'HNSW':
+        # Graphe HNSW : recherche en temps logarithmique, sans entraînement
+        index = faiss.IndexHNSWFlat(dim, 32)
+        index.hnsw.efSearch = 64
+    elif index_type == 'IVFPQ' and embeddings.shape[0] >= PQ_MIN_TRAINING_POINTS:
+        # Index IVF avec vecteurs compressés par quantification produit (codes de 8 bits)
+        nlist = min(4096, 4 * int(np.sqrt(embeddings.shape[0])))
+        m = next(m for m in (16, 8, 4, 2, 1) if dim % m == 0)  # sous-vecteurs
+        quantizer = faiss.IndexFlatL2(dim)
+        index = faiss.IndexIVFPQ(quantizer, dim, nlist, m, 8)
+        index.train(embeddings.astype(np.float32))
+        index.nprobe = 16
     else:
+        if index_type == 'IVFPQ':
+            print(f"Pas assez de vecteurs pour entraîner un index IVFPQ "
+                  f"({embeddings.shape[0]} < {PQ_MIN_TRAINING_POINTS}), utilisation d'un index plat L2")
         # Par défaut: index plat L2
         index = faiss.IndexFlatL2(dim)
     
@@ -174,29 +222,50 @@ def load_faiss_index(file_path: str) -> Tuple[faiss.Index, Dict[str, Any]]:
         Tuple[faiss.Index, Dict]: Index FAISS et dictionnaire de métadonnées
     """
     try:
-        # Charger l'index FAISS
-        index = faiss.read_index(f"{file_path}.index")
-        
-        # Charger les métadonnées
-        with open(f"{file_path}.meta", 'rb') as f:
-            index_metadata = pickle.load(f)
-            
+        # La date de modification fait partie de la clé : un index réécrit est rechargé
+        index, index_metadata = _load_faiss_index_cached(
+            os.path.abspath(file_path),
+            os.path.getmtime(f"{file_path}.index"),
+            os.path.getmtime(f"{file_path}.meta")
+        )
         print(f"Index FAISS chargé avec {index.ntotal} vecteurs")
         return index, index_metadata
     except Exception as e:
         print(f"Erreur lors du chargement de l'index: {str(e)}")
         raise
 
-def search_similar(
+@functools.lru_cache(maxsize=4)
+def _load_faiss_index_cached(
+    file_path: str,
+    index_mtime: float,
+    meta_mtime: float
+) -> Tuple[faiss.Index, Dict[str, Any]]:
+    # Index partagé entre les recherches d'un même processus (API, scripts en boucle)
+    try:
+        # Projection en mémoire : seules les pages utilisées par la recherche sont lues
+        index = faiss.read_index(f"{file_path}.index", faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY)
+    except RuntimeError:
+        # Type d'index ne supportant pas la projection en mémoire
+        index = faiss.read_index(f"{file_path}.index")
+    
+    # Charger les métadonnées
+    with open(f"{file_path}.meta", 'rb') as f:
+        index_metadata = pickle.load(f)
+    
+    return index, index_metadata
+
+def iter_similar(
     query: str,
     index: faiss.Index,
     index_metadata: Dict[str, Any],
     model: Optional[SentenceTransformer] = None,
     model_name: str = 'all-MiniLM-L6-v2',
-    top_k: int = 5
-) -> List[Dict[str, Any]]:
+    top_k: int = 5,
+    nprobe: Optional[int] = None
+) -> Iterator[Dict[str, Any]]:
     """
-    Recherche les chunks les plus similaires à une requête.
+    Recherche les chunks les plus similaires à une requête et les produit un par un,
+    par ordre de score décroissant.
     
     Args:
         query (str): Texte de la requête
@@ -205,9 +274,10 @@ def search_similar(
         model (SentenceTransformer, optional): Modèle préchargé ou None pour en charger un nouveau
         model_name (str): Nom du modèle à utiliser si model=None
         top_k (int): Nombre de résultats à retourner
+        nprobe (int, optional): Nombre de cellules explorées pour les index IVF
         
-    Returns:
-        List[Dict]: Liste des résultats avec scores de similarité
+    Yields:
+        Dict: Résultat avec chunk, score de similarité, position et métadonnées
     """
     # Charger le modèle si non fourni
     if model is None:
@@ -216,22 +286,54 @@ def search_similar(
     # Convertir la requête en vecteur d'embedding
     query_embedding = model.encode([query], normalize_embeddings=True)
     
+    # Compromis vitesse/précision des index IVF, passé à la seule recherche :
+    # l'index peut être partagé via le cache de chargement
+    params = None
+    if nprobe and hasattr(index, 'nprobe'):
+        params = faiss.SearchParametersIVF(nprobe=nprobe)
+    
     # Recherche des plus proches voisins
-    distances, indices = index.search(query_embedding.astype(np.float32), top_k)
+    distances, indices = index.search(query_embedding.astype(np.float32), top_k, params=params)
+    
+    # Les index de métrique L2 renvoient des distances à convertir en similarité
+    is_l2 = index.metric_type == faiss.METRIC_L2
     
-    # Récupérer les résultats
-    results = []
     for i in range(len(indices[0])):
         idx = indices[0][i]
         if idx != -1:  # FAISS peut retourner -1 si pas assez de résultats
-            results.append({
+            yield {
                 'chunk': index_metadata['chunks'][idx],
-                'score': float(1.0 - distances[0][i] / 2) if index_metadata['index_type'] == 'L2' else float(distances[0][i]),
+                'score': float(1.0 - distances[0][i] / 2) if is_l2 else float(distances[0][i]),
                 'index': int(idx),
                 'metadata': index_metadata['metadata'][idx] if idx < len(index_metadata['metadata']) else {}
-            })
+            }
+
+def search_similar(
+    query: str,
+    index: faiss.Index,
+    index_metadata: Dict[str, Any],
+    model: Optional[SentenceTransformer] = None,
+    model_name: str = 'all-MiniLM-L6-v2',
+    top_k: int = 5,
+    nprobe: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """
+    Recherche les chunks les plus similaires à une requête.
     
-    return results
+    Args:
+        query (str): Texte de la requête
+        index (faiss.Index): Index FAISS
+        index_metadata (Dict): Métadonnées de l'index
+        model (SentenceTransformer, optional): Modèle préchargé ou None pour en charger un nouveau
+        model_name (str): Nom du modèle à utiliser si model=None
+        top_k (int): Nombre de résultats à retourner
+        nprobe (int, optional): Nombre de cellules explorées pour les index IVF
+        
+    Returns:
+        List[Dict]: Liste des résultats avec scores de similarité
+    """
+    return list(iter_similar(query, index, index_metadata, model=model,
+                             model_name=model_name, top_k=top_k, nprobe=nprobe))
 
 def process_and_index_chunks(
     chunks: List[str],
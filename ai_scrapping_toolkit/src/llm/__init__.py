@@ -3,7 +3,7 @@ Module pour l'intégration avec les modèles de langage.
 """
 
 from .providers import get_llm_provider
-from .data_extractor import extract_data_from_chunks, aggregate_extraction_results
+from .data_extractor import extract_data_from_chunks, aggregate_extraction_results, ExtractionAggregator
 
 # Importer le module enhanced seulement s'il existe
 try:
@@ -12,6 +12,7 @@ try:
         'get_llm_provider',
         'extract_data_from_chunks',
         'aggregate_extraction_results',
+        'ExtractionAggregator',
         'enhanced_extract_data_from_chunks',
         'EnhancedDataExtractor'
     ]
@@ -19,5 +20,6 @@ except ImportError:
     __all__ = [
         'get_llm_provider',
         'extract_data_from_chunks',
-        'aggregate_extraction_results'
+        'aggregate_extraction_results',
+        'ExtractionAggregator'
     ]
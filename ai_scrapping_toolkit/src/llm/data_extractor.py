@@ -2,22 +2,133 @@
 Module pour l'extraction de données structurées à partir de chunks avec les LLMs.
 """
 
+import os
+import re
+import atexit
+import time
+import random
+import asyncio
 import logging
-import json
-from typing import List, Dict, Any, Optional
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import contextlib
+import threading
+from collections import Counter, deque
+from typing import List, Dict, Any, Optional, Callable
+from concurrent.futures import ThreadPoolExecutor
+
+# Import conditionnel de tiktoken (tokenisation rapide pour tronquer les chunks)
+try:
+    import tiktoken
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    TIKTOKEN_AVAILABLE = False
 
 from .enhanced_data_extractor import enhanced_extract_data_from_chunks
+from .extraction_cache import ExtractionCache, get_extraction_cache
+from .providers import PROVIDER_CLASSES
+from ..utils.file_handler import dumps_json
 
 logger = logging.getLogger(__name__)
 
+# Version du prompt d'extraction, incluse dans la clé de cache :
+# à incrémenter à chaque modification de EXTRACTION_INSTRUCTION_TEMPLATE
+EXTRACTION_PROMPT_VERSION = "3"
+
+# Instruction commune à tous les chunks. Elle précède le contenu dans le message
+# envoyé par les providers, ce qui permet au cache de préfixe des APIs
+# (OpenAI, OpenRouter, ...) de réutiliser sa partie déjà traitée. Les consignes
+# fixes viennent en premier et la requête en dernier, pour que le préfixe commun
+# soit le même quelle que soit la requête.
+EXTRACTION_INSTRUCTION_TEMPLATE = (
+    "Réponds uniquement avec un objet JSON valide, sans texte avant ou après.\n"
+    "Si tu ne trouves pas d'information, renvoie un objet avec des tableaux vides.\n\n"
+    "Analyse ce contenu et extrait les informations demandées selon cette requête : {query}"
+)
+
+# Nouvelles tentatives après un échec transitoire du provider
+DEFAULT_MAX_RETRIES = 2
+RETRY_BASE_DELAY = 1.0
+RETRY_MAX_DELAY = 30.0
+
+# Codes d'erreur des providers considérés comme transitoires (limite de débit,
+# délai dépassé, connexion, erreur 5xx). Les autres échecs (requête invalide,
+# authentification, réponse illisible, erreur inattendue) ne sont pas retentés.
+RETRYABLE_ERRORS = {
+    "rate_limit", "service_unavailable", "timeout", "timeout_error",
+    "connection_error"
+}
+
+# Parallélisme adapté à chaque provider : les serveurs locaux traitent peu de
+# requêtes à la fois, les APIs cloud en acceptent beaucoup plus
+PROVIDER_PARALLELISM = {
+    "OllamaProvider": 1,
+    "LMStudioProvider": 2,
+    "OpenRouterProvider": 8,
+    "OpenAIProvider": 16,
+}
+DEFAULT_PARALLELISM = 4
+
+# Un chunk ayant moins de mots que ce seuil (miettes de navigation, séparateurs...)
+# ne contient rien d'exploitable : il est écarté sans appel au LLM
+MIN_CHUNK_WORDS = 3
+WORD_RE = re.compile(r"\w{2,}")
+
+# Taille du pool de threads partagé par les extractions avec des providers synchrones
+# (appels réseau : plusieurs threads par cœur)
+EXTRACTION_WORKERS = int(
+    os.environ.get("AI_SCRAPPING_WORKERS", min(32, (os.cpu_count() or 4) * 4))
+)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+def get_extraction_executor() -> ThreadPoolExecutor:
+    """
+    Renvoie le pool de threads partagé par toutes les extractions du processus.
+    
+    Le pool est créé au premier appel puis réutilisé, ce qui évite de démarrer
+    et d'arrêter des threads pour chaque page traitée.
+    
+    Returns:
+        ThreadPoolExecutor: Pool de threads pour les providers synchrones
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=EXTRACTION_WORKERS, thread_name_prefix="extraction"
+            )
+            atexit.register(_executor.shutdown)
+        return _executor
+
+def default_parallelism(llm_provider) -> int:
+    """
+    Renvoie le nombre de requêtes simultanées conseillé pour un provider.
+    
+    Args:
+        llm_provider: Instance du provider LLM, ou nom du provider ("ollama", "openai"...)
+        
+    Returns:
+        int: Nombre de requêtes simultanées
+    """
+    if isinstance(llm_provider, str):
+        class_name = PROVIDER_CLASSES.get(llm_provider)
+    else:
+        class_name = type(llm_provider).__name__
+    return PROVIDER_PARALLELISM.get(class_name, DEFAULT_PARALLELISM)
+
 def extract_data_from_chunks(
     chunks: List[str],
     query: str,
     llm_provider,
     max_workers: int = 4,
     enhanced_mode: bool = True,
-    url: str = ""
+    url: str = "",
+    use_cache: bool = True,
+    parallelism: Optional[int] = None,
+    max_chunk_tokens: Optional[int] = None,
+    max_retries: int = DEFAULT_MAX_RETRIES,
+    on_result: Optional[Callable[[int, Dict[str, Any]], None]] = None,
+    chunks_per_request: int = 1
 ) -> List[Dict[str, Any]]:
     """
     Extrait des données structurées à partir d'une liste de chunks.
@@ -29,84 +140,561 @@ def extract_data_from_chunks(
         max_workers: Nombre maximum de workers pour le traitement parallèle
         enhanced_mode: Utiliser le mode amélioré avec deux passes
         url: URL source pour la détection du type de site
+        use_cache: Réutiliser les résultats déjà obtenus pour un même chunk et une même requête
+        parallelism: Nombre de requêtes LLM simultanées en mode classique (défaut: max_workers)
+        max_chunk_tokens: Tronquer les chunks dépassant ce nombre de tokens avant l'envoi
+            (nécessite tiktoken)
+        max_retries: Nombre de nouvelles tentatives par chunk après un échec transitoire
+        on_result: Fonction appelée avec (index du chunk, résultat) dès qu'un chunk est
+            traité avec succès, dans l'ordre d'achèvement
+        chunks_per_request: Nombre de chunks regroupés dans une même requête LLM ; au-delà
+            de 1, les résultats et les index passés à on_result désignent les lots
         
     Returns:
         Liste des résultats d'extraction ou résultat agrégé en mode amélioré
     """
+    if max_chunk_tokens:
+        chunks = _truncate_chunks_to_tokens(chunks, max_chunk_tokens, getattr(llm_provider, "model", ""))
+    
     if enhanced_mode:
         logger.info("Utilisation du mode d'extraction amélioré (deux passes)")
         result = enhanced_extract_data_from_chunks(
-            chunks, query, llm_provider, url, max_workers
+            _pack_chunks(chunks, chunks_per_request), query, llm_provider, url, max_workers,
+            use_cache=use_cache, on_result=on_result, max_retries=max_retries
         )
         return [result]  # Retourner dans une liste pour compatibilité
     
     # Mode classique : traiter tous les chunks
-    logger.info(f"Extraction de données depuis {len(chunks)} chunks avec {max_workers} workers")
+    parallelism = max(1, parallelism or max_workers)
+    logger.info(f"Extraction de données depuis {len(chunks)} chunks (parallélisme: {parallelism})")
     
-    results = []
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        # Soumettre tous les chunks pour traitement
-        future_to_chunk = {
-            executor.submit(_extract_from_single_chunk, chunk, query, llm_provider): i
-            for i, chunk in enumerate(chunks)
-        }
-        
-        # Collecter les résultats
-        for future in as_completed(future_to_chunk):
-            chunk_index = future_to_chunk[future]
-            try:
-                result = future.result()
-                if result:
-                    results.append(result)
-                    logger.debug(f"Chunk {chunk_index} traité avec succès")
-            except Exception as e:
-                logger.error(f"Erreur lors du traitement du chunk {chunk_index}: {e}")
+    # N'envoyer au LLM qu'un représentant par chunk identique (en-têtes répétés, etc.)
+    unique_chunks, chunk_to_unique = _deduplicate_chunks(chunks)
+    if len(unique_chunks) < len(chunks):
+        logger.info(f"{len(chunks) - len(unique_chunks)} chunks dupliqués ignorés")
+    
+    if chunks_per_request > 1:
+        # Une requête par lot de chunks : le prompt système n'est envoyé qu'une fois par lot
+        batches = _pack_chunks(unique_chunks, chunks_per_request)
+        logger.info(f"{len(unique_chunks)} chunks regroupés en {len(batches)} requêtes")
+        batch_results = _run_coroutine(
+            _extract_all_chunks_async(
+                batches, query, llm_provider, parallelism, use_cache, max_retries, on_result
+            )
+        )
+        results = [result for result in batch_results if result]
+        logger.info(f"Extraction terminée: {len(results)} résultats obtenus sur {len(batches)} lots")
+        return results
+    
+    unique_on_result = None
+    if on_result is not None:
+        # Redistribuer chaque résultat à tous les chunks identiques
+        unique_to_chunks: List[List[int]] = [[] for _ in unique_chunks]
+        for i, j in enumerate(chunk_to_unique):
+            unique_to_chunks[j].append(i)
+        
+        def unique_on_result(j: int, result: Dict[str, Any]) -> None:
+            for i in unique_to_chunks[j]:
+                on_result(i, result)
+    
+    unique_results = _run_coroutine(
+        _extract_all_chunks_async(
+            unique_chunks, query, llm_provider, parallelism, use_cache, max_retries,
+            unique_on_result
+        )
+    )
+    # Conserver l'ordre des chunks en écartant les échecs
+    results = [unique_results[j] for j in chunk_to_unique if unique_results[j]]
     
     logger.info(f"Extraction terminée: {len(results)} résultats obtenus sur {len(chunks)} chunks")
+    if use_cache:
+        logger.debug(f"Statistiques du cache d'extraction: {get_extraction_cache().cache_info()}")
     return results
 
-def _extract_from_single_chunk(chunk: str, query: str, llm_provider) -> Optional[Dict[str, Any]]:
+def _truncate_chunks_to_tokens(chunks: List[str], max_tokens: int, model: str = "") -> List[str]:
     """
-    Extrait des données d'un chunk individuel.
+    Tronque les chunks trop longs pour le contexte du modèle.
+    
+    Tous les chunks sont tokenisés en un seul appel multi-thread, ce qui évite
+    d'envoyer des requêtes vouées à être rejetées par le provider.
     
     Args:
-        chunk: Chunk de texte à analyser
+        chunks: Liste des chunks de texte
+        max_tokens: Nombre maximum de tokens par chunk
+        model: Nom du modèle, pour choisir l'encodage
+        
+    Returns:
+        Liste des chunks, tronqués si nécessaire
+    """
+    if not TIKTOKEN_AVAILABLE:
+        logger.warning("tiktoken n'est pas installé : les chunks ne sont pas tronqués")
+        return chunks
+    
+    try:
+        encoding = tiktoken.encoding_for_model(model)
+    except KeyError:
+        # Modèle inconnu de tiktoken (modèles locaux, OpenRouter...) : approximation
+        encoding = tiktoken.get_encoding("cl100k_base")
+    
+    token_lists = encoding.encode_batch(chunks, num_threads=os.cpu_count() or 1)
+    truncated = 0
+    result = []
+    for chunk, tokens in zip(chunks, token_lists):
+        if len(tokens) > max_tokens:
+            chunk = encoding.decode(tokens[:max_tokens])
+            truncated += 1
+        result.append(chunk)
+    
+    if truncated:
+        logger.info(f"{truncated} chunks tronqués à {max_tokens} tokens")
+    return result
+
+def _deduplicate_chunks(chunks: List[str]):
+    """
+    Regroupe les chunks dont le texte est identique aux espaces et à la casse près.
+    
+    Args:
+        chunks: Liste des chunks de texte
+        
+    Returns:
+        Tuple (chunks uniques, index du chunk unique correspondant à chaque chunk)
+    """
+    unique_chunks = []
+    chunk_to_unique = []
+    seen = {}
+    for chunk in chunks:
+        normalized = " ".join(chunk.split()).lower()
+        index = seen.get(normalized)
+        if index is None:
+            index = seen[normalized] = len(unique_chunks)
+            unique_chunks.append(chunk)
+        chunk_to_unique.append(index)
+    return unique_chunks, chunk_to_unique
+
+def _pack_chunks(chunks: List[str], chunks_per_request: int) -> List[str]:
+    """
+    Regroupe les chunks consécutifs par lots envoyés en une seule requête.
+    
+    Args:
+        chunks: Liste des chunks de texte
+        chunks_per_request: Nombre maximum de chunks par lot
+        
+    Returns:
+        Liste des lots, chaque chunk étant précédé d'un séparateur numéroté
+    """
+    if chunks_per_request <= 1:
+        return chunks
+    return [
+        "\n\n".join(
+            f"---CHUNK {i}---\n{chunk}"
+            for i, chunk in enumerate(chunks[start:start + chunks_per_request])
+        )
+        for start in range(0, len(chunks), chunks_per_request)
+    ]
+
+def _run_coroutine(coro):
+    """
+    Exécute une coroutine jusqu'à son terme depuis du code synchrone.
+    
+    Args:
+        coro: Coroutine à exécuter
+        
+    Returns:
+        Le résultat de la coroutine
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    
+    # Une boucle tourne déjà dans ce thread (ex: endpoint FastAPI) : utiliser un thread dédié
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coro).result()
+
+async def _extract_all_chunks_async(
+    chunks: List[str],
+    query: str,
+    llm_provider,
+    parallelism: int,
+    use_cache: bool = True,
+    max_retries: int = DEFAULT_MAX_RETRIES,
+    on_result: Optional[Callable[[int, Dict[str, Any]], None]] = None
+) -> List[Optional[Dict[str, Any]]]:
+    """
+    Lance l'extraction de tous les chunks sur une seule boucle d'événements.
+    
+    Les chunks sans contenu exploitable sont écartés sans appel au LLM. Les échecs
+    transitoires sont retentés avec un délai exponentiel, et les chunks restants
+    sont abandonnés si la plupart des appels récents échouent.
+    
+    Args:
+        chunks: Liste des chunks de texte à analyser
         query: Requête d'extraction
         llm_provider: Provider LLM à utiliser
+        parallelism: Nombre maximum de requêtes simultanées
+        use_cache: Consulter et alimenter le cache disque des extractions
+        max_retries: Nombre de nouvelles tentatives par chunk après un échec transitoire
+        on_result: Fonction appelée avec (index, résultat) pour chaque chunk réussi
         
     Returns:
-        Dictionnaire avec les données extraites ou None en cas d'échec
+        Liste des résultats, dans l'ordre des chunks (None pour les échecs)
     """
-    try:
-        # Créer un prompt structuré pour l'extraction
-        extraction_prompt = f"""
-Analyse ce contenu et extrait les informations demandées selon cette requête : {query}
+    semaphore = asyncio.Semaphore(parallelism)
+    breaker = get_circuit_breaker(llm_provider)
+    results: List[Optional[Dict[str, Any]]] = [None] * len(chunks)
+    
+    # Les providers synchrones sont exécutés dans le pool partagé ; le sémaphore
+    # borne le nombre de requêtes simultanées de cet appel
+    executor = get_extraction_executor()
+    
+    skipped = 0
+    
+    async def run_chunk(index: int, chunk: str):
+        nonlocal skipped
+        result = None
+        for attempt in range(max_retries + 1):
+            async with semaphore:
+                # Vérifier une fois la place obtenue : le disjoncteur a pu s'ouvrir pendant l'attente
+                if breaker.is_open:
+                    skipped += 1
+                    return index, result
+                try:
+                    result = await _extract_from_single_chunk_async(
+                        chunk, query, llm_provider, use_cache, executor
+                    )
+                except Exception as e:
+                    logger.error(f"Erreur lors du traitement du chunk {index}: {e}")
+                    result = None
+            
+            failed = _is_transient_failure(result)
+            # Seuls les succès et les échecs transitoires renseignent l'état du provider :
+            # un échec permanent (clé absente, requête invalide...) ne doit pas le couper
+            if failed or _is_success(result):
+                breaker.record(not failed)
+            if not failed or attempt == max_retries:
+                break
+            
+            # Attendre hors du sémaphore pour laisser la place aux autres chunks
+            delay = _retry_delay(attempt)
+            logger.debug(f"Chunk {index}: nouvelle tentative dans {delay:.1f}s")
+            await asyncio.sleep(delay)
+        
+        return index, result
+    
+    async with contextlib.AsyncExitStack() as stack:
+        # Un seul client asynchrone pour tous les chunks, fermé à la fin de l'extraction
+        async_session = getattr(llm_provider, "async_session", None)
+        if async_session is not None:
+            await stack.enter_async_context(async_session())
+        
+        tasks = [
+            asyncio.ensure_future(run_chunk(i, chunk))
+            for i, chunk in enumerate(chunks)
+            if _has_extractable_content(chunk)
+        ]
+        if len(tasks) < len(chunks):
+            logger.info(f"{len(chunks) - len(tasks)} chunks sans contenu exploitable ignorés sans appel au LLM")
+        for future in asyncio.as_completed(tasks):
+            index, result = await future
+            results[index] = result
+            if result:
+                logger.debug(f"Chunk {index} traité avec succès")
+                if on_result is not None:
+                    on_result(index, result)
+    
+    if skipped:
+        logger.error(f"Trop d'échecs du provider : {skipped} chunks non traités")
+    
+    return results
 
-Réponds uniquement avec un objet JSON valide, sans texte avant ou après.
-Si tu ne trouves pas d'information, renvoie un objet avec des tableaux vides.
+def _has_extractable_content(chunk: str) -> bool:
+    """
+    Indique si un chunk contient assez de texte pour justifier un appel au LLM.
+    
+    Args:
+        chunk: Chunk de texte
+        
+    Returns:
+        bool: True si le chunk contient au moins MIN_CHUNK_WORDS mots
+    """
+    words = 0
+    for _ in WORD_RE.finditer(chunk):
+        words += 1
+        if words >= MIN_CHUNK_WORDS:
+            return True
+    return False
 
-Contenu à analyser :
-{chunk}
-"""
+def _is_transient_failure(result: Optional[Dict[str, Any]]) -> bool:
+    """
+    Indique si un résultat d'extraction correspond à un échec à retenter.
+    
+    Args:
+        result: Résultat de l'extraction d'un chunk
+        
+    Returns:
+        bool: True si le provider a signalé une erreur transitoire (RETRYABLE_ERRORS)
+    """
+    return isinstance(result, dict) and result.get("error") in RETRYABLE_ERRORS
+
+def _is_success(result: Optional[Dict[str, Any]]) -> bool:
+    """
+    Indique si un résultat d'extraction est une réponse exploitable du provider.
+    
+    Args:
+        result: Résultat de l'extraction d'un chunk
+        
+    Returns:
+        bool: True si le résultat est un dictionnaire sans erreur
+    """
+    return isinstance(result, dict) and "error" not in result
+
+def _retry_delay(attempt: int) -> float:
+    """
+    Calcule le délai avant une nouvelle tentative (exponentiel avec gigue).
+    
+    Args:
+        attempt: Numéro de la tentative qui vient d'échouer (à partir de 0)
+        
+    Returns:
+        float: Délai en secondes
+    """
+    delay = min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * (2 ** attempt))
+    return random.uniform(delay / 2, delay)
+
+class CircuitBreaker:
+    """
+    Coupe les appels au provider lorsque la majorité des appels récents échouent.
+    
+    Le disjoncteur se referme après reset_timeout secondes : les appels suivants
+    servent alors de test et le recouperont si le provider est toujours dégradé.
+    """
+    
+    def __init__(
+        self,
+        window: int = 50,
+        failure_threshold: float = 0.6,
+        min_calls: int = 10,
+        reset_timeout: float = 60.0
+    ):
+        """
+        Initialise le disjoncteur.
         
-        result = llm_provider.extract(chunk, extraction_prompt, "json")
+        Args:
+            window: Nombre d'appels récents pris en compte
+            failure_threshold: Proportion d'échecs à partir de laquelle les appels sont coupés
+            min_calls: Nombre minimum d'appels observés avant de pouvoir couper
+            reset_timeout: Durée en secondes pendant laquelle les appels restent coupés
+        """
+        self.outcomes = deque(maxlen=window)
+        self.failure_threshold = failure_threshold
+        self.min_calls = min_calls
+        self.reset_timeout = reset_timeout
+        self._opened_at: Optional[float] = None
+        self._lock = threading.Lock()
+    
+    @property
+    def is_open(self) -> bool:
+        """True tant que les appels au provider sont coupés."""
+        with self._lock:
+            if self._opened_at is None:
+                return False
+            if time.monotonic() - self._opened_at < self.reset_timeout:
+                return True
+            # Délai écoulé : repartir d'un historique vide pour tester le provider
+            self._opened_at = None
+            self.outcomes.clear()
+            logger.info("Réouverture des appels au provider après la coupure")
+            return False
+    
+    def record(self, success: bool) -> None:
+        """
+        Enregistre le résultat d'un appel.
         
-        if isinstance(result, dict):
-            return result
-        else:
-            logger.warning(f"Résultat inattendu du LLM: {type(result)}")
-            return None
+        Args:
+            success: True si l'appel a réussi
+        """
+        with self._lock:
+            self.outcomes.append(success)
+            if self._opened_at is not None or len(self.outcomes) < self.min_calls:
+                return
             
+            failure_rate = self.outcomes.count(False) / len(self.outcomes)
+            if failure_rate > self.failure_threshold:
+                self._opened_at = time.monotonic()
+                logger.error(
+                    f"Taux d'échec du provider de {failure_rate:.0%} : arrêt des appels "
+                    f"pendant {self.reset_timeout:.0f}s"
+                )
+
+_circuit_breakers: Dict[str, CircuitBreaker] = {}
+_circuit_breakers_lock = threading.Lock()
+
+def get_circuit_breaker(llm_provider) -> CircuitBreaker:
+    """
+    Renvoie le disjoncteur partagé par toutes les extractions d'un même provider et modèle.
+    
+    Un provider dégradé est ainsi coupé pour l'ensemble du processus, et non
+    redécouvert à chaque page traitée.
+    
+    Args:
+        llm_provider: Instance du provider LLM
+        
+    Returns:
+        CircuitBreaker: Disjoncteur du provider
+    """
+    key = f"{type(llm_provider).__name__}:{getattr(llm_provider, 'model', '')}"
+    with _circuit_breakers_lock:
+        breaker = _circuit_breakers.get(key)
+        if breaker is None:
+            breaker = _circuit_breakers[key] = CircuitBreaker()
+        return breaker
+
+async def _extract_from_single_chunk_async(
+    chunk: str,
+    query: str,
+    llm_provider,
+    use_cache: bool = True,
+    executor: Optional[ThreadPoolExecutor] = None
+) -> Optional[Dict[str, Any]]:
+    """
+    Version asynchrone de _extract_from_single_chunk.
+    
+    Utilise la méthode extract_async du provider si elle existe, sinon exécute
+    l'extraction synchrone dans l'executor fourni.
+    
+    Args:
+        chunk: Chunk de texte à analyser
+        query: Requête d'extraction
+        llm_provider: Provider LLM à utiliser
+        use_cache: Consulter et alimenter le cache disque des extractions
+        executor: Pool de threads pour les providers synchrones
+        
+    Returns:
+        Dictionnaire avec les données extraites ou None en cas d'échec
+    """
+    extract_async = getattr(llm_provider, "extract_async", None)
+    if extract_async is None:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            executor, _extract_from_single_chunk, chunk, query, llm_provider, use_cache
+        )
+    
+    cache, cache_key, cached_result = _lookup_cache(chunk, query, llm_provider, use_cache)
+    if cached_result is not None:
+        return cached_result
+    
+    try:
+        result = await extract_async(chunk, _build_extraction_prompt(query), "json")
+        return _store_extraction_result(result, cache, cache_key)
     except Exception as e:
         logger.error(f"Erreur lors de l'extraction d'un chunk: {e}")
         return None
 
-def aggregate_extraction_results(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+def _extract_from_single_chunk(
+    chunk: str,
+    query: str,
+    llm_provider,
+    use_cache: bool = True
+) -> Optional[Dict[str, Any]]:
+    """
+    Extrait des données d'un chunk individuel.
+    
+    Args:
+        chunk: Chunk de texte à analyser
+        query: Requête d'extraction
+        llm_provider: Provider LLM à utiliser
+        use_cache: Consulter et alimenter le cache disque des extractions
+        
+    Returns:
+        Dictionnaire avec les données extraites ou None en cas d'échec
+    """
+    cache, cache_key, cached_result = _lookup_cache(chunk, query, llm_provider, use_cache)
+    if cached_result is not None:
+        return cached_result
+    
+    try:
+        result = llm_provider.extract(chunk, _build_extraction_prompt(query), "json")
+        return _store_extraction_result(result, cache, cache_key)
+    except Exception as e:
+        logger.error(f"Erreur lors de l'extraction d'un chunk: {e}")
+        return None
+
+def _lookup_cache(chunk: str, query: str, llm_provider, use_cache: bool):
+    """
+    Cherche le résultat d'un chunk dans le cache d'extraction.
+    
+    Args:
+        chunk: Chunk de texte à analyser
+        query: Requête d'extraction
+        llm_provider: Provider LLM à utiliser
+        use_cache: Consulter le cache disque des extractions
+        
+    Returns:
+        Tuple (cache, clé de cache, résultat en cache ou None)
+    """
+    cache = get_extraction_cache() if use_cache else None
+    cache_key = None
+    if cache is not None and cache.enabled:
+        cache_key = ExtractionCache.key_for_provider(
+            chunk, query, llm_provider, EXTRACTION_PROMPT_VERSION
+        )
+        cached_result = cache.get(cache_key)
+        if cached_result is not None:
+            logger.debug("Résultat d'extraction trouvé dans le cache")
+            return cache, cache_key, cached_result
+    return cache, cache_key, None
+
+def _build_extraction_prompt(query: str) -> str:
+    """
+    Construit l'instruction d'extraction pour une requête.
+    
+    Le chunk n'en fait pas partie : les providers l'ajoutent après l'instruction,
+    ce qui garde un préfixe identique pour tous les chunks d'une même requête.
+    
+    Args:
+        query: Requête d'extraction
+        
+    Returns:
+        str: Instruction à envoyer au LLM
+    """
+    return EXTRACTION_INSTRUCTION_TEMPLATE.format(query=query)
+
+def _store_extraction_result(
+    result: Any,
+    cache: Optional[ExtractionCache],
+    cache_key: Optional[str]
+) -> Optional[Dict[str, Any]]:
+    """
+    Valide le résultat renvoyé par le provider et le met en cache si besoin.
+    
+    Args:
+        result: Réponse du provider
+        cache: Cache d'extraction (ou None)
+        cache_key: Clé de cache du chunk (ou None)
+        
+    Returns:
+        Dictionnaire avec les données extraites ou None si la réponse est invalide
+    """
+    if isinstance(result, dict):
+        # Ne pas mettre en cache les réponses d'erreur des providers
+        if cache_key and "error" not in result:
+            cache.set(cache_key, result)
+        return result
+    
+    logger.warning(f"Résultat inattendu du LLM: {type(result)}")
+    return None
+
+def aggregate_extraction_results(
+    results: List[Dict[str, Any]],
+    rank_by_frequency: bool = False
+) -> Dict[str, Any]:
     """
     Agrège les résultats d'extraction de plusieurs chunks.
     
     Args:
         results: Liste des résultats d'extraction
+        rank_by_frequency: Classer les éléments de chaque clé par nombre de chunks
+            les mentionnant plutôt que par ordre d'apparition
         
     Returns:
         Dictionnaire avec les résultats agrégés
@@ -118,33 +706,101 @@ def aggregate_extraction_results(results: List[Dict[str, Any]]) -> Dict[str, Any
     if len(results) == 1:
         return results[0]
     
-    aggregated = {}
-    
-    # Agréger les listes
+    aggregator = ExtractionAggregator(rank_by_frequency)
     for result in results:
+        aggregator.update(result)
+    return aggregator.finalize()
+
+class ExtractionAggregator:
+    """
+    Agrégation incrémentale des résultats d'extraction, chunk par chunk.
+    
+    Permet de fusionner les résultats au fur et à mesure de leur arrivée sans
+    conserver la liste complète des résultats par chunk.
+    """
+    
+    def __init__(self, rank_by_frequency: bool = False):
+        """
+        Initialise l'agrégat.
+        
+        Args:
+            rank_by_frequency: Classer les éléments par nombre décroissant de chunks les
+                mentionnant : un élément extrait de plusieurs chunks est plus fiable
+        """
+        # Par clé : première forme de chaque élément (dans l'ordre d'apparition) et
+        # nombre de chunks le mentionnant
+        self.first_seen: Dict[str, Dict[Any, Any]] = {}
+        self.chunk_counts: Dict[str, Counter] = {}
+        self.rank_by_frequency = rank_by_frequency
+    
+    def update(self, result: Dict[str, Any]) -> None:
+        """
+        Ajoute le résultat d'un chunk à l'agrégat.
+        
+        Args:
+            result: Résultat d'extraction d'un chunk
+        """
+        if "error" in result:
+            # Réponse d'erreur du provider : ne pas mêler ses champs aux données extraites
+            logger.debug(f"Résultat en erreur ignoré lors de l'agrégation: {result.get('error')}")
+            return
+        
         for key, value in result.items():
-            if key not in aggregated:
-                aggregated[key] = []
+            first_seen = self.first_seen.setdefault(key, {})
+            counts = self.chunk_counts.setdefault(key, Counter())
+            
+            if not isinstance(value, list):
+                if value is None or value == "":
+                    continue
+                value = [value]
             
-            if isinstance(value, list):
-                aggregated[key].extend(value)
-            elif value is not None and value != "":
-                aggregated[key].append(value)
-    
-    # Nettoyer et dédupliquer
-    for key, value in aggregated.items():
-        if isinstance(value, list):
-            # Supprimer les doublons tout en préservant l'ordre
-            seen = set()
-            unique_items = []
+            # Un élément répété dans la réponse d'un même chunk n'est compté qu'une fois
+            chunk_keys = set()
             for item in value:
                 if isinstance(item, str):
-                    item_lower = item.lower().strip()
-                    if item_lower not in seen and item_lower:
-                        seen.add(item_lower)
-                        unique_items.append(item.strip())
-                elif item not in unique_items:
-                    unique_items.append(item)
-            aggregated[key] = unique_items
-    
-    return aggregated
\ No newline at end of file
+                    item = item.strip()
+                    if not item:
+                        continue
+                    item_key = ("str", item.lower())
+                else:
+                    item_key = _dedup_key(item)
+                first_seen.setdefault(item_key, item)
+                chunk_keys.add(item_key)
+            counts.update(chunk_keys)
+    
+    def finalize(self) -> Dict[str, Any]:
+        """
+        Renvoie l'agrégat, nettoyé et dédupliqué.
+        
+        Returns:
+            Dictionnaire avec les résultats agrégés
+        """
+        aggregated = {}
+        for key, first_seen in self.first_seen.items():
+            if self.rank_by_frequency:
+                # Tri stable sur first_seen : à égalité, l'ordre de première apparition est conservé
+                counts = self.chunk_counts[key]
+                ordered = sorted(first_seen, key=counts.__getitem__, reverse=True)
+                aggregated[key] = [first_seen[item_key] for item_key in ordered]
+            else:
+                aggregated[key] = list(first_seen.values())
+        
+        return aggregated
+
+def _dedup_key(item: Any) -> Any:
+    """
+    Renvoie une clé hachable identifiant un élément non textuel pour la déduplication.
+    
+    Args:
+        item: Élément extrait (nombre, dict, liste...)
+        
+    Returns:
+        L'élément lui-même s'il est hachable, sinon sa forme JSON canonique
+        (étiquetés pour ne jamais se confondre avec les clés des textes)
+    """
+    try:
+        hash(item)
+        return ("value", item)
+    except TypeError:
+        pass
+    return ("json", dumps_json(item, sort_keys=True, default=str))
@@ -4,7 +4,7 @@ Version complète à implémenter selon les besoins.
 """
 
 import logging
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Callable
 
 logger = logging.getLogger(__name__)
 
@@ -13,7 +13,10 @@ def enhanced_extract_data_from_chunks(
     query: str,
     llm_provider,
     url: str = "",
-    max_workers: int = 4
+    max_workers: int = 4,
+    use_cache: bool = True,
+    on_result: Optional[Callable[[int, Dict[str, Any]], None]] = None,
+    max_retries: Optional[int] = None
 ) -> Dict[str, Any]:
     """
     Version de base de l'extraction améliorée.
@@ -24,59 +27,37 @@ def enhanced_extract_data_from_chunks(
         llm_provider: Instance du provider LLM
         url: URL source pour la détection du type de site
         max_workers: Nombre maximum de workers
+        use_cache: Réutiliser les extractions déjà en cache
+        on_result: Fonction appelée avec (index du chunk, résultat) pour chaque chunk réussi
+        max_retries: Nombre de nouvelles tentatives par chunk après un échec transitoire
+            (défaut: DEFAULT_MAX_RETRIES de data_extractor)
         
     Returns:
         Dictionnaire avec les données extraites et agrégées
     """
     logger.info(f"Extraction améliorée de base avec {len(chunks)} chunks")
     
-    # Pour l'instant, utiliser la méthode classique mais traiter plus de chunks
-    from .data_extractor import _extract_from_single_chunk
-    
-    results = []
+    from .data_extractor import (
+        _extract_all_chunks_async, _run_coroutine, aggregate_extraction_results, DEFAULT_MAX_RETRIES
+    )
     
     # Traiter plus de chunks (pas seulement le premier)
     chunks_to_process = chunks[:min(10, len(chunks))]  # Traiter jusqu'à 10 chunks
-    
-    for i, chunk in enumerate(chunks_to_process):
-        try:
-            result = _extract_from_single_chunk(chunk, query, llm_provider)
-            if result:
-                results.append(result)
-                logger.debug(f"Chunk {i+1}/{len(chunks_to_process)} traité")
-        except Exception as e:
-            logger.error(f"Erreur chunk {i}: {e}")
-    
-    # Agrégation simple
-    if not results:
+    if not chunks_to_process:
         return {}
     
-    if len(results) == 1:
-        return results[0]
-    
-    # Agrégation basique
-    aggregated = {}
-    for result in results:
-        for key, value in result.items():
-            if key not in aggregated:
-                aggregated[key] = []
-            
-            if isinstance(value, list):
-                aggregated[key].extend(value)
-            elif value is not None and value != "":
-                if isinstance(aggregated[key], list):
-                    aggregated[key].append(value)
-                else:
-                    aggregated[key] = [aggregated[key], value]
-    
-    # Nettoyer les doublons
-    for key, value in aggregated.items():
-        if isinstance(value, list):
-            # Supprimer les doublons
-            unique_items = []
-            for item in value:
-                if item not in unique_items:
-                    unique_items.append(item)
-            aggregated[key] = unique_items
-    
-    return aggregated
+    # Toutes les requêtes partagent une boucle d'événements, bornée par max_workers
+    parallelism = max(1, min(max_workers, len(chunks_to_process)))
+    chunk_results = _run_coroutine(
+        _extract_all_chunks_async(
+            chunks_to_process, query, llm_provider, parallelism,
+            use_cache=use_cache,
+            max_retries=DEFAULT_MAX_RETRIES if max_retries is None else max_retries,
+            on_result=on_result
+        )
+    )
+    results = [result for result in chunk_results if result]
+    
+    # Agrégation avec déduplication insensible à la casse ; les éléments extraits de
+    # plusieurs chunks, plus fiables, sont placés en tête
+    return aggregate_extraction_results(results, rank_by_frequency=True)
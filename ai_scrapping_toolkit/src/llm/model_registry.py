@@ -0,0 +1,78 @@
+"""
+Registre des modèles chargés (pipelines Hugging Face, sentence-transformers).
+
+Les modèles sont conservés pour toute la durée du processus afin d'éviter de
+recharger plusieurs centaines de Mo de poids à chaque appel, avec une
+politique LRU pour borner la mémoire utilisée.
+"""
+
+import gc
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Nombre maximum de modèles gardés en mémoire
+MODEL_REGISTRY_SIZE = 8
+
+_models: "OrderedDict[tuple, Any]" = OrderedDict()
+_lock = threading.RLock()
+
+def get_model(factory: Callable[..., Any], *args, **kwargs) -> Any:
+    """
+    Renvoie le modèle construit par factory(*args, **kwargs), en le chargeant au premier appel.
+
+    Args:
+        factory: Fonction de chargement (ex: transformers.pipeline, SentenceTransformer)
+        *args: Arguments positionnels de la fonction de chargement
+        **kwargs: Arguments nommés de la fonction de chargement
+
+    Returns:
+        Any: Instance du modèle, partagée entre les appels identiques
+    """
+    key = (factory, args, tuple(sorted(kwargs.items())))
+    try:
+        hash(key)
+    except TypeError:
+        # Arguments non hachables : pas de mise en cache possible
+        return factory(*args, **kwargs)
+
+    with _lock:
+        if key in _models:
+            _models.move_to_end(key)
+            return _models[key]
+
+        model = factory(*args, **kwargs)
+        _models[key] = model
+        if len(_models) > MODEL_REGISTRY_SIZE:
+            _, evicted = _models.popitem(last=False)
+            logger.debug(f"Modèle retiré du registre: {type(evicted).__name__}")
+        return model
+
+def release_model(name: Optional[str] = None) -> int:
+    """
+    Libère les modèles chargés, par exemple en cas de pression mémoire.
+
+    Args:
+        name (str, optional): Nom du modèle à libérer (tous les modèles si None)
+
+    Returns:
+        int: Nombre de modèles libérés
+    """
+    with _lock:
+        if name is None:
+            keys = list(_models)
+        else:
+            keys = [
+                key for key in _models
+                if name in key[1] or name in (value for _, value in key[2])
+            ]
+        for key in keys:
+            del _models[key]
+
+    if keys:
+        gc.collect()
+        logger.info(f"{len(keys)} modèle(s) libéré(s)")
+    return len(keys)
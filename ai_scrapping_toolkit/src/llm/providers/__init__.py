@@ -3,10 +3,124 @@ Providers pour différents modèles de langage.
 """
 
 import importlib
+import json
 import logging
+from typing import List, Optional
+
+from ...utils.file_handler import loads_json
 
 logger = logging.getLogger(__name__)
 
+class JsonStreamScanner:
+    """
+    Suit la profondeur des accolades d'un flux de texte pour détecter la fin
+    du premier objet JSON, sans attendre la fin de la génération.
+    
+    Les accolades situées dans des chaînes JSON sont ignorées, ainsi que le
+    texte avant l'objet.
+    """
+
+    def __init__(self):
+        self.parts: List[str] = []
+        self.depth = 0
+        self.started = False
+        self.in_string = False
+        self.escaped = False
+        self.complete = False
+        # Position de l'accolade ouvrante de l'objet dans le texte reçu
+        self.start = -1
+        self._length = 0
+
+    def feed(self, text: str) -> bool:
+        """
+        Ajoute un fragment de texte reçu.
+
+        Args:
+            text (str): Fragment de la réponse
+
+        Returns:
+            bool: True dès que l'objet JSON de premier niveau est refermé
+        """
+        for i, char in enumerate(text):
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif char == "\\":
+                    self.escaped = True
+                elif char == '"':
+                    self.in_string = False
+            elif char == '"':
+                self.in_string = self.started
+            elif char == "{":
+                if not self.started:
+                    self.start = self._length + i
+                self.depth += 1
+                self.started = True
+            elif char == "}" and self.started:
+                self.depth -= 1
+                if self.depth == 0:
+                    self.parts.append(text[:i + 1])
+                    self.complete = True
+                    return True
+        self.parts.append(text)
+        self._length += len(text)
+        return False
+
+    @property
+    def text(self) -> str:
+        return "".join(self.parts)
+
+    @property
+    def json_text(self) -> Optional[str]:
+        """Texte de l'objet JSON, ou None tant qu'il n'est pas refermé."""
+        if not self.complete:
+            return None
+        return self.text[self.start:]
+
+def extract_json_object(text: str) -> Optional[str]:
+    """
+    Renvoie le premier objet JSON complet d'un texte (accolades équilibrées).
+    
+    Args:
+        text (str): Réponse brute du LLM
+        
+    Returns:
+        str or None: Texte de l'objet JSON, ou None si aucun objet n'est refermé
+    """
+    scanner = JsonStreamScanner()
+    scanner.feed(text)
+    return scanner.json_text
+
+def parse_json_response(text: str):
+    """
+    Analyse une réponse JSON de LLM, éventuellement entourée de texte ou d'un bloc de code.
+    
+    Args:
+        text (str): Réponse brute du LLM
+        
+    Returns:
+        Objet Python correspondant
+        
+    Raises:
+        json.JSONDecodeError: Si la réponse ne contient pas d'objet JSON valide
+    """
+    try:
+        return loads_json(text)
+    except json.JSONDecodeError:
+        candidate = extract_json_object(text)
+        if candidate is None or candidate == text:
+            raise
+    return loads_json(candidate)
+
+# Nom de la classe de chaque provider, par nom de provider
+PROVIDER_CLASSES = {
+    "openai": "OpenAIProvider",
+    "ollama": "OllamaProvider",
+    "huggingface": "HuggingFaceProvider",
+    "lmstudio": "LMStudioProvider",
+    "openrouter": "OpenRouterProvider"
+}
+
 def get_llm_provider(provider_name="openai", **config):
     """
     Renvoie un provider LLM selon le nom spécifié.
@@ -18,19 +132,11 @@ def get_llm_provider(provider_name="openai", **config):
     Returns:
         object: Instance du provider LLM
     """
-    provider_mapping = {
-        "openai": "OpenAIProvider",
-        "ollama": "OllamaProvider",
-        "huggingface": "HuggingFaceProvider",
-        "lmstudio": "LMStudioProvider",
-        "openrouter": "OpenRouterProvider"  # Ajout du nouveau provider
-    }
-    
-    if provider_name not in provider_mapping:
+    if provider_name not in PROVIDER_CLASSES:
         logger.error(f"Provider '{provider_name}' non supporté. Utilisation d'OpenAI par défaut.")
         provider_name = "openai"
     
-    provider_class_name = provider_mapping[provider_name]
+    provider_class_name = PROVIDER_CLASSES[provider_name]
     
     try:
         # Importer dynamiquement le module du provider
@@ -9,6 +9,8 @@ import logging
 import requests
 from typing import Dict, List, Any, Optional, Union
 
+from . import loads_json
+
 logger = logging.getLogger(__name__)
 
 class LMStudioProvider:
@@ -262,7 +264,7 @@ class LMStudioProvider:
         
         try:
             # Tenter de parser le JSON
-            parsed_json = json.loads(json_str)
+            parsed_json = loads_json(json_str)
             logger.info("JSON parsé avec succès")
             return parsed_json
         except json.JSONDecodeError as e:
@@ -282,7 +284,7 @@ class LMStudioProvider:
                 # Réparer les guillemets non fermés
                 fixed_json = re.sub(r'": "([^"]*?)(\s*[,}])', r'": "\1"\2', fixed_json)
                 
-                parsed_json = json.loads(fixed_json)
+                parsed_json = loads_json(fixed_json)
                 logger.info("JSON réparé et parsé avec succès")
                 return parsed_json
             except Exception:
@@ -0,0 +1,254 @@
+"""
+Cache sémantique des réponses LLM.
+
+Contrairement à ExtractionCache, qui ne retrouve que les chunks strictement
+identiques, ce cache retrouve les contenus paraphrasés (menus, mentions légales
+répétées d'une page à l'autre) par similarité cosinus de leurs embeddings.
+Une réponse n'est réutilisée que pour la même instruction.
+"""
+
+import os
+import copy
+import json
+import atexit
+import hashlib
+import logging
+import threading
+import importlib.util
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+
+# Import conditionnel de FAISS ; sentence-transformers n'est chargé qu'au premier embedding
+try:
+    import faiss
+    SEMANTIC_CACHE_AVAILABLE = importlib.util.find_spec("sentence_transformers") is not None
+except ImportError:
+    SEMANTIC_CACHE_AVAILABLE = False
+
+from .extraction_cache import DEFAULT_CACHE_DIR
+
+logger = logging.getLogger(__name__)
+
+# Similarité cosinus minimale pour considérer deux contenus comme équivalents
+DEFAULT_SIMILARITY_THRESHOLD = 0.87
+
+# Nombre maximum d'entrées conservées (les moins récemment utilisées sont retirées)
+DEFAULT_MAX_ENTRIES = 10000
+
+# Nombre d'ajouts entre deux sauvegardes sur disque
+SAVE_EVERY = 50
+
+# Nombre de voisins examinés pour trouver une entrée de même instruction
+SEARCH_NEIGHBORS = 4
+
+# Taille des fenêtres de texte encodées séparément ; leur moyenne représente tout
+# le contenu (le modèle tronque lui-même les textes plus longs qu'une fenêtre)
+EMBED_WINDOW_CHARS = 1000
+
+class SemanticCache:
+    """
+    Cache des réponses LLM indexé par embedding du contenu (FAISS IndexFlatIP).
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        threshold: float = DEFAULT_SIMILARITY_THRESHOLD,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        model_name: str = 'all-MiniLM-L6-v2'
+    ):
+        """
+        Initialise le cache et recharge les entrées sauvegardées.
+
+        Args:
+            path (str, optional): Préfixe des fichiers de sauvegarde, complété par .npy
+                (embeddings) et .json (entrées) (défaut: sem_cache dans le répertoire
+                du cache d'extraction)
+            threshold (float): Similarité cosinus minimale pour un succès
+            max_entries (int): Nombre maximum d'entrées conservées
+            model_name (str): Modèle sentence-transformers utilisé pour les embeddings
+        """
+        cache_dir = os.environ.get("AI_SCRAPPING_CACHE_DIR", DEFAULT_CACHE_DIR)
+        self.path = path or os.path.join(cache_dir, "sem_cache")
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.model_name = model_name
+
+        self._lock = threading.RLock()
+        self._model = None
+        self._index = None
+        self._embeddings: List[np.ndarray] = []
+        self._entries: List[Dict[str, Any]] = []
+        self._clock = 0
+        self._unsaved = 0
+        self._load()
+        atexit.register(self.save)
+
+    @staticmethod
+    def _scope(instruction: str, model: str) -> str:
+        """Empreinte de l'instruction et du modèle, qui doivent correspondre exactement."""
+        digest = hashlib.blake2b(digest_size=16)
+        for part in (model, instruction):
+            digest.update(part.encode("utf-8", errors="replace"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def _encode(self, content: str) -> np.ndarray:
+        """Encode tout le contenu : moyenne normalisée des embeddings de ses fenêtres."""
+        if self._model is None:
+            from ..embeddings.vector_db import load_embedding_model
+            self._model = load_embedding_model(self.model_name)
+        windows = [
+            content[start:start + EMBED_WINDOW_CHARS]
+            for start in range(0, max(len(content), 1), EMBED_WINDOW_CHARS)
+        ]
+        embeddings = np.asarray(self._model.encode(windows, normalize_embeddings=True), dtype=np.float32)
+        embedding = embeddings.mean(axis=0, keepdims=True)
+        norm = np.linalg.norm(embedding)
+        if norm > 0:
+            embedding /= norm
+        return embedding
+
+    def _rebuild_index(self) -> None:
+        if not self._embeddings:
+            self._index = None
+            return
+        matrix = np.vstack(self._embeddings)
+        self._index = faiss.IndexFlatIP(matrix.shape[1])
+        self._index.add(matrix)
+
+    def get(self, instruction: str, content: str, model: str = "") -> Optional[Dict[str, Any]]:
+        """
+        Renvoie la réponse enregistrée pour un contenu équivalent et la même instruction.
+
+        Args:
+            instruction (str): Instruction d'extraction
+            content (str): Contenu analysé
+            model (str): Identifiant du modèle LLM
+
+        Returns:
+            Optional[Dict[str, Any]]: Réponse en cache ou None
+        """
+        if self._index is None:
+            return None
+        # Inférence hors verrou : les recherches concurrentes ne s'attendent pas
+        embedding = self._encode(content)
+        scope = self._scope(instruction, model)
+        
+        with self._lock:
+            if self._index is None:
+                return None
+            similarities, indices = self._index.search(
+                embedding, min(SEARCH_NEIGHBORS, len(self._entries))
+            )
+            for similarity, idx in zip(similarities[0], indices[0]):
+                if idx == -1 or similarity < self.threshold:
+                    break
+                entry = self._entries[idx]
+                if entry["scope"] == scope:
+                    self._clock += 1
+                    entry["last_used"] = self._clock
+                    logger.debug(f"Succès du cache sémantique (similarité: {similarity:.3f})")
+                    # Copie : l'appelant ne peut pas modifier l'entrée en cache
+                    return copy.deepcopy(entry["response"])
+            return None
+
+    def put(self, instruction: str, content: str, response: Dict[str, Any], model: str = "") -> None:
+        """
+        Enregistre la réponse obtenue pour un contenu et une instruction.
+
+        Args:
+            instruction (str): Instruction d'extraction
+            content (str): Contenu analysé
+            response (Dict[str, Any]): Réponse du LLM
+            model (str): Identifiant du modèle LLM
+        """
+        embedding = self._encode(content)
+        response = copy.deepcopy(response)
+        
+        with self._lock:
+            self._clock += 1
+            self._embeddings.append(embedding[0])
+            self._entries.append({
+                "scope": self._scope(instruction, model),
+                "response": response,
+                "last_used": self._clock
+            })
+
+            if len(self._entries) > self.max_entries:
+                self._evict()
+            elif self._index is None:
+                self._rebuild_index()
+            else:
+                self._index.add(embedding)
+
+            self._unsaved += 1
+            if self._unsaved >= SAVE_EVERY:
+                self.save()
+
+    def _evict(self) -> None:
+        """Retire les 10% d'entrées les moins récemment utilisées et reconstruit l'index."""
+        keep = max(1, int(self.max_entries * 0.9))
+        order = sorted(range(len(self._entries)), key=lambda i: self._entries[i]["last_used"])
+        kept = sorted(order[-keep:])
+        self._embeddings = [self._embeddings[i] for i in kept]
+        self._entries = [self._entries[i] for i in kept]
+        self._rebuild_index()
+
+    def _load(self) -> None:
+        try:
+            embeddings = np.load(f"{self.path}.npy", allow_pickle=False)
+            with open(f"{self.path}.json", "r", encoding="utf-8") as f:
+                entries = json.load(f)
+            if len(embeddings) != len(entries):
+                raise ValueError("embeddings et entrées de tailles différentes")
+            self._embeddings = list(embeddings.astype(np.float32, copy=False))
+            self._entries = entries
+            self._clock = max((entry["last_used"] for entry in self._entries), default=0)
+            self._rebuild_index()
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.debug(f"Cache sémantique illisible ({self.path}): {e}")
+            self._embeddings = []
+            self._entries = []
+
+    def save(self) -> None:
+        """
+        Sauvegarde les entrées sur disque (embeddings en .npy, entrées en JSON).
+        """
+        with self._lock:
+            if not self._unsaved:
+                return
+            try:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                suffix = f"{os.getpid()}.tmp"
+                entries_json = json.dumps(self._entries, ensure_ascii=False)
+                with open(f"{self.path}.npy.{suffix}", "wb") as f:
+                    np.save(f, np.vstack(self._embeddings) if self._embeddings
+                            else np.empty((0, 0), dtype=np.float32), allow_pickle=False)
+                with open(f"{self.path}.json.{suffix}", "w", encoding="utf-8") as f:
+                    f.write(entries_json)
+                os.replace(f"{self.path}.npy.{suffix}", f"{self.path}.npy")
+                os.replace(f"{self.path}.json.{suffix}", f"{self.path}.json")
+                self._unsaved = 0
+            except (OSError, TypeError, ValueError) as e:
+                logger.debug(f"Impossible de sauvegarder le cache sémantique: {e}")
+
+_default_cache = None
+
+def get_semantic_cache() -> Optional[SemanticCache]:
+    """
+    Renvoie l'instance de cache sémantique partagée par le processus.
+
+    Returns:
+        Optional[SemanticCache]: Cache sémantique, ou None si FAISS ou
+            sentence-transformers ne sont pas installés
+    """
+    global _default_cache
+    if not SEMANTIC_CACHE_AVAILABLE:
+        return None
+    if _default_cache is None:
+        _default_cache = SemanticCache()
+    return _default_cache
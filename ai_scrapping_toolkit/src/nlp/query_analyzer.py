@@ -19,6 +19,8 @@ except ImportError:
 
 # Import des modules d'embeddings
 from ..embeddings import chunks_to_embeddings, search_similar
+from ..embeddings.vector_db import load_embedding_model
+from ..llm.model_registry import get_model
 from sentence_transformers import SentenceTransformer
 
 # Configuration du logger
@@ -43,6 +45,12 @@ ENTITY_PATTERNS = {
     "image": r"\b(image|photo|illustration|figure)\b"
 }
 
+def _create_ner_pipeline(model_name: str):
+    # Pipeline NER construit à partir du tokenizer et du modèle associés
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    model = AutoModelForTokenClassification.from_pretrained(model_name)
+    return pipeline("ner", model=model, tokenizer=tokenizer)
+
 def load_nlp_model(task: str = "ner", model_name: Optional[str] = None):
     """
     Charge un modèle NLP pour une tâche spécifique.
@@ -60,23 +68,21 @@ def load_nlp_model(task: str = "ner", model_name: Optional[str] = None):
             if not model_name:
                 model_name = "Jean-Baptiste/camembert-ner"
             
-            tokenizer = AutoTokenizer.from_pretrained(model_name)
-            model = AutoModelForTokenClassification.from_pretrained(model_name)
-            return pipeline("ner", model=model, tokenizer=tokenizer)
+            return get_model(_create_ner_pipeline, model_name)
         
         elif task == "intent":
             # Modèle de classification d'intentions
             if not model_name:
                 model_name = "distilbert-base-uncased-finetuned-sst-2-english"
                 
-            return pipeline("text-classification", model=model_name)
+            return get_model(pipeline, "text-classification", model=model_name)
         
         elif task == "qa":
             # Modèle de question-réponse
             if not model_name:
                 model_name = "etalab-ia/camembert-base-squadFR-fquad-piaf"
                 
-            return pipeline("question-answering", model=model_name)
+            return get_model(pipeline, "question-answering", model=model_name)
         
         else:
             logger.error(f"Tâche '{task}' non reconnue.")
@@ -195,7 +201,7 @@ def analyze_query(query: str,
         model = embedding_model
     else:
         try:
-            model = SentenceTransformer('all-MiniLM-L6-v2')
+            model = load_embedding_model('all-MiniLM-L6-v2')
         except Exception as e:
             logger.error(f"Erreur lors du chargement du modèle d'embedding: {str(e)}")
             analysis["embedding"] = None
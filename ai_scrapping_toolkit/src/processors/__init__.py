@@ -3,7 +3,7 @@ Package pour le traitement et la transformation de contenu HTML et PDF.
 """
 
 from .html_preprocessor import preprocess_html
-from .content_extractor import extract_main_content, get_page_title
+from .content_extractor import extract_main_content, get_page_title, extract_title_and_content
 from .html_chunker import html_to_chunks
 from .pdf_processor import pdf_to_chunks, extract_text_from_pdf
 from .semantic_chunker import semantic_html_to_chunks, SemanticChunk, SemanticChunker
@@ -12,6 +12,7 @@ __all__ = [
     'preprocess_html',
     'extract_main_content',
     'get_page_title',
+    'extract_title_and_content',
     'html_to_chunks',
     'pdf_to_chunks',
     'extract_text_from_pdf',
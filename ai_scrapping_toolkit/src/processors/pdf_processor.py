@@ -3,6 +3,7 @@ Module pour extraire et traiter le contenu des fichiers PDF.
 """
 
 import os
+import mmap
 import logging
 import re
 from typing import List, Dict, Any, Optional, Tuple, Union
@@ -11,12 +12,41 @@ import tempfile
 # Configuration du logger
 logger = logging.getLogger(__name__)
 
-def extract_text_from_pdf(pdf_path: str) -> str:
+# Séparateur de paragraphes (lignes vides)
+PARAGRAPH_BREAK_RE = re.compile(r'\n{2,}')
+
+def _join_pages(page_texts, max_chars: Optional[int] = None) -> str:
+    """
+    Concatène le texte des pages, en s'arrêtant dès que max_chars est atteint.
+    
+    Args:
+        page_texts: Itérable (paresseux) des textes de pages
+        max_chars: Nombre de caractères au-delà duquel les pages suivantes
+            ne sont plus extraites (None pour tout extraire)
+        
+    Returns:
+        str: Texte des pages, chacune suivie d'un séparateur
+    """
+    if max_chars is None:
+        return "".join(page_text + "\n\n" for page_text in page_texts)
+    
+    parts = []
+    length = 0
+    for page_text in page_texts:
+        parts.append(page_text + "\n\n")
+        length += len(parts[-1])
+        if length >= max_chars:
+            break
+    return "".join(parts)
+
+def extract_text_from_pdf(pdf_path: str, max_chars: Optional[int] = None) -> str:
     """
     Extrait le texte d'un fichier PDF.
     
     Args:
         pdf_path: Chemin du fichier PDF
+        max_chars: Arrêter l'extraction une fois ce nombre de caractères atteint,
+            utile pour n'analyser qu'un échantillon du début du document
         
     Returns:
         str: Contenu textuel du PDF
@@ -30,14 +60,14 @@ def extract_text_from_pdf(pdf_path: str) -> str:
         import fitz  # PyMuPDF
         logger.info(f"Extraction du texte avec PyMuPDF: {pdf_path}")
         
+        # MuPDF lit le fichier directement depuis son chemin, sans copie côté Python
         doc = fitz.open(pdf_path)
-        text = ""
         
-        # Extraire le texte de chaque page
-        for page_num in range(len(doc)):
-            page = doc.load_page(page_num)
-            text += page.get_text()
-            text += "\n\n"  # Séparateur entre les pages
+        # Extraire le texte de chaque page (séparateur entre les pages)
+        text = _join_pages(
+            (doc.load_page(page_num).get_text() for page_num in range(len(doc))),
+            max_chars
+        )
         
         doc.close()
         return text
@@ -52,17 +82,26 @@ def extract_text_from_pdf(pdf_path: str) -> str:
         import PyPDF2
         logger.info(f"Extraction du texte avec PyPDF2: {pdf_path}")
         
+        # Projeter le fichier en mémoire: PyPDF2 lit alors directement le cache
+        # de pages du système au lieu de copier le fichier via des read() bufferisés
         with open(pdf_path, 'rb') as file:
-            reader = PyPDF2.PdfReader(file)
-            text = ""
-            
-            # Extraire le texte de chaque page
-            for page_num in range(len(reader.pages)):
-                page = reader.pages[page_num]
-                text += page.extract_text() or ""
-                text += "\n\n"  # Séparateur entre les pages
+            try:
+                pdf_map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            except (ValueError, OSError):
+                # Fichier vide ou non projetable : lecture directe du fichier
+                pdf_map = None
             
-            return text
+            try:
+                reader = PyPDF2.PdfReader(pdf_map if pdf_map is not None else file)
+                
+                # Extraire le texte de chaque page (séparateur entre les pages)
+                return _join_pages(
+                    ((page.extract_text() or "") for page in reader.pages),
+                    max_chars
+                )
+            finally:
+                if pdf_map is not None:
+                    pdf_map.close()
     
     except ImportError:
         logger.error("Ni PyMuPDF ni PyPDF2 ne sont disponibles. Impossible d'extraire le texte du PDF.")
@@ -79,13 +118,10 @@ def extract_text_from_pdf(pdf_path: str) -> str:
         
         with tempfile.TemporaryDirectory() as path:
             images = pdf2image.convert_from_path(pdf_path, output_folder=path)
-            text = ""
-            
-            for i, image in enumerate(images):
-                text += pytesseract.image_to_string(image)
-                text += "\n\n"
-            
-            return text
+            return _join_pages(
+                (pytesseract.image_to_string(image) for image in images),
+                max_chars
+            )
     
     except ImportError:
         logger.error("pdf2image et/ou pytesseract ne sont pas disponibles.")
@@ -195,7 +231,7 @@ def pdf_to_chunks(
     
     elif method == 'paragraphs':
         # Découper par paragraphes
-        paragraphs = [p.strip() for p in re.split(r'\n{2,}', text) if p.strip()]
+        paragraphs = [p.strip() for p in PARAGRAPH_BREAK_RE.split(text) if p.strip()]
         
         # Regrouper les paragraphes courts
         chunks = []
@@ -2,6 +2,6 @@
 Package de fonctions pour le scraping web.
 """
 
-from .scraper import fetch_content
+from .scraper import fetch_content, fetch_content_to_file
 
-__all__ = ['fetch_content']
+__all__ = ['fetch_content', 'fetch_content_to_file']
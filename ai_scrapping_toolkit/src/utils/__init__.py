@@ -2,7 +2,10 @@
 Utilitaires pour le projet AI Scrapping.
 """
 
-from .file_handler import save_chunks, save_file, load_file, ensure_directory_exists
+from .file_handler import (
+    save_chunks, save_file, load_file, ensure_directory_exists, index_base_path,
+    dumps_json, dump_json, dump_jsonl_line, loads_json
+)
 
 # Ajout de l'utilitaire d'export CSV pour l'utilisation programmatique
 try:
@@ -39,5 +42,6 @@ except ImportError:
 
 __all__ = [
     'save_chunks', 'save_file', 'load_file', 
-    'ensure_directory_exists', 'export_to_csv'
+    'ensure_directory_exists', 'export_to_csv', 'index_base_path',
+    'dumps_json', 'dump_json', 'dump_jsonl_line', 'loads_json'
 ]
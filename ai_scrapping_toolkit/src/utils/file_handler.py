@@ -4,6 +4,14 @@ Module pour la gestion des fichiers dans le projet AI Scrapping.
 
 import os
 import json
+import functools
+
+# Import conditionnel d'orjson (sérialisation et analyse JSON rapides)
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
 def ensure_directory_exists(filepath):
     """
@@ -16,6 +24,103 @@ def ensure_directory_exists(filepath):
     if directory and not os.path.exists(directory):
         os.makedirs(directory)
 
+@functools.lru_cache(maxsize=None)
+def _json_encoder(indent, sort_keys, default):
+    """Encodeur json standard, instancié une seule fois par combinaison d'options."""
+    return json.JSONEncoder(
+        ensure_ascii=False,
+        indent=2 if indent else None,
+        separators=(',', ': ') if indent else (',', ':'),
+        sort_keys=sort_keys,
+        default=default
+    ).encode
+
+def dumps_json(data, indent=False, sort_keys=False, default=None):
+    """
+    Sérialise des données en JSON UTF-8, avec orjson si disponible.
+    
+    Les types non pris en charge par orjson sont sérialisés par le module json standard.
+    
+    Args:
+        data: Données à sérialiser
+        indent (bool): Indenter le JSON (2 espaces)
+        sort_keys (bool): Trier les clés des objets
+        default (callable, optional): Conversion des objets non sérialisables
+    
+    Returns:
+        bytes: Représentation JSON des données
+    """
+    if ORJSON_AVAILABLE:
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        try:
+            return orjson.dumps(data, default=default, option=option)
+        except TypeError:
+            # Types non pris en charge par orjson: repli sur json standard
+            pass
+    return _json_encoder(indent, sort_keys, default)(data).encode('utf-8')
+
+def dump_json(data, filepath):
+    """
+    Écrit des données dans un fichier JSON indenté.
+    
+    Args:
+        data: Données à sauvegarder
+        filepath (str): Chemin du fichier de destination
+    """
+    raw = dumps_json(data, indent=True)
+    with open(filepath, 'wb') as f:
+        f.write(raw)
+
+def dump_jsonl_line(data, file):
+    """
+    Ajoute une ligne JSON (format JSONL) à un fichier ouvert en mode binaire.
+    
+    Args:
+        data: Données de la ligne
+        file: Fichier ouvert en écriture binaire
+    """
+    file.write(dumps_json(data) + b"\n")
+
+def loads_json(raw):
+    """
+    Désérialise un contenu JSON, avec orjson si disponible.
+    
+    Args:
+        raw (bytes | str): Contenu JSON
+    
+    Returns:
+        Objet Python correspondant
+    
+    Raises:
+        json.JSONDecodeError: Si le contenu n'est pas du JSON valide
+    """
+    if ORJSON_AVAILABLE:
+        try:
+            return orjson.loads(raw)
+        except orjson.JSONDecodeError:
+            # NaN, Infinity... : acceptés par le module json standard
+            pass
+    return json.loads(raw)
+
+def index_base_path(index_path):
+    """
+    Renvoie le chemin de base d'un index FAISS (sans extension .index ou .meta).
+    
+    Args:
+        index_path (str): Chemin de l'index, avec ou sans extension
+    
+    Returns:
+        str: Chemin de base, auquel ajouter ".index" ou ".meta"
+    """
+    for suffix in ('.index', '.meta'):
+        if index_path.endswith(suffix):
+            return index_path[:-len(suffix)]
+    return index_path
+
 def save_file(content, filepath, encoding='utf-8'):
     """
     Sauvegarde du contenu dans un fichier.
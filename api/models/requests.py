@@ -46,7 +46,7 @@ class VectorizationRequest(BaseModel):
     model_name: str = Field(
         "all-MiniLM-L6-v2", description="Modèle sentence-transformers à utiliser"
     )
-    index_type: Literal["L2", "IP", "IVF"] = Field(
+    index_type: Literal["L2", "IP", "IVF", "HNSW", "IVFPQ"] = Field(
         "L2", description="Type d'index FAISS à créer"
     )
 
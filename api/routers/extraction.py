@@ -20,6 +20,91 @@ from src.processors import html_to_chunks, pdf_to_chunks
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+# Termes identifiant chaque type de document dans le nom du fichier puis dans le
+# début de son contenu, par ordre de priorité
+DOCUMENT_TYPE_TERMS = {
+    "resume": (
+        ("resume", "cv", "curriculum"),
+        ("resume", "cv", "skills", "experience", "education", "compétences", "expérience"),
+    ),
+    "invoice": (
+        ("invoice", "facture", "receipt"),
+        ("invoice", "facture", "total", "payment", "tax", "tva", "montant"),
+    ),
+    "article": (
+        ("article", "paper", "publication"),
+        ("abstract", "introduction", "conclusion", "references", "keywords"),
+    ),
+}
+
+# Requêtes d'extraction utilisées à la place d'une requête générique, par type de document
+DOCUMENT_TYPE_QUERIES = {
+    "resume": """Extraire et structurer les informations suivantes du CV:
+- informations_personnelles: nom complet, email, téléphone, adresse, site web, profil LinkedIn
+- résumé_professionnel: texte du résumé ou introduction
+- compétences: liste des compétences techniques et personnelles
+- expérience_professionnelle: liste des postes avec entreprise, période, titre, description
+- formation: liste des formations avec établissement, diplôme, période, description
+- langues: langues parlées et niveau
+- certifications: liste des certifications pertinentes
+- projets: projets significatifs mentionnés
+
+Regroupe ces informations dans une structure JSON cohérente.""",
+
+    "invoice": """Extraire et structurer les informations suivantes de la facture:
+- informations_émetteur: nom, adresse, numéro de téléphone, email
+- informations_client: nom, adresse, identifiant client
+- détails_facture: numéro de facture, date d'émission, date d'échéance
+- articles: liste des articles/services avec description, quantité, prix unitaire et total
+- montants: sous-total, taxes (TVA ou autres), frais supplémentaires, total
+- modalités_paiement: méthode de paiement, coordonnées bancaires
+
+Regroupe ces informations dans une structure JSON cohérente.""",
+
+    "article": """Extraire et structurer les informations suivantes de l'article:
+- méta_informations: titre, auteurs, date de publication, journal/conférence
+- résumé: résumé ou abstract complet
+- structure_principale: introduction, méthodologie, résultats, discussion, conclusion
+- mots_clés: liste des mots-clés
+- références: liste des références bibliographiques principales
+
+Regroupe ces informations dans une structure JSON cohérente.""",
+
+    "general": """Analyse ce document et extrait les informations clés suivantes:
+- titre: titre principal du document
+- auteur: auteur ou créateur du document
+- date: date de création ou de publication
+- type_document: type de document détecté
+- sections_principales: liste des principales sections avec leur contenu résumé
+- points_clés: liste des informations importantes extraites
+- entités: personnes, organisations, lieux et dates mentionnés
+
+Regroupe ces informations dans une structure JSON cohérente et détaillée.""",
+}
+
+def _detect_document_type(filename: str, read_sample) -> str:
+    """
+    Détecte le type d'un document à partir de son nom puis de son contenu.
+    
+    Args:
+        filename: Nom du fichier
+        read_sample: Fonction renvoyant le début du contenu en minuscules, appelée
+            seulement si le nom du fichier ne suffit pas
+        
+    Returns:
+        str: Clé de DOCUMENT_TYPE_QUERIES
+    """
+    filename = filename.lower()
+    sample_text = None
+    for document_type, (filename_terms, content_terms) in DOCUMENT_TYPE_TERMS.items():
+        if any(term in filename for term in filename_terms):
+            return document_type
+        if sample_text is None:
+            sample_text = read_sample()
+        if any(term in sample_text for term in content_terms):
+            return document_type
+    return "general"
+
 
 @router.post(
     "/",
@@ -190,70 +275,14 @@ async def extract_from_pdf(
         # Améliorer la requête si elle est générique et que l'auto-amélioration est activée
         original_query = query
         if auto_enhance and (query.lower() in ["string", "extract", "extraire", "information", ""]):
-            # Détecter le type de document en fonction du contenu et du nom de fichier
-            is_resume = any(term in file.filename.lower() for term in ["resume", "cv", "curriculum"])
-            is_invoice = any(term in file.filename.lower() for term in ["invoice", "facture", "receipt"])
-            is_article = any(term in file.filename.lower() for term in ["article", "paper", "publication"])
-            
-            # Extraire un échantillon du contenu pour détection
+            # Détecter le type de document en fonction du nom de fichier, puis d'un
+            # échantillon du contenu (premières pages seulement)
             from src.processors.pdf_processor import extract_text_from_pdf
-            sample_text = extract_text_from_pdf(temp_file_path)[:1000].lower()
-            
-            # Affiner la détection basée sur le contenu
-            if not is_resume and any(term in sample_text for term in ["resume", "cv", "skills", "experience", "education", "compétences", "expérience"]):
-                is_resume = True
-            if not is_invoice and any(term in sample_text for term in ["invoice", "facture", "total", "payment", "tax", "tva", "montant"]):
-                is_invoice = True
-            if not is_article and any(term in sample_text for term in ["abstract", "introduction", "conclusion", "references", "keywords"]):
-                is_article = True
-            
-            # Construire une requête améliorée en fonction du type détecté
-            if is_resume:
-                query = """Extraire et structurer les informations suivantes du CV:
-                - informations_personnelles: nom complet, email, téléphone, adresse, site web, profil LinkedIn
-                - résumé_professionnel: texte du résumé ou introduction
-                - compétences: liste des compétences techniques et personnelles
-                - expérience_professionnelle: liste des postes avec entreprise, période, titre, description
-                - formation: liste des formations avec établissement, diplôme, période, description
-                - langues: langues parlées et niveau
-                - certifications: liste des certifications pertinentes
-                - projets: projets significatifs mentionnés
-                
-                Regroupe ces informations dans une structure JSON cohérente."""
-                
-            elif is_invoice:
-                query = """Extraire et structurer les informations suivantes de la facture:
-                - informations_émetteur: nom, adresse, numéro de téléphone, email
-                - informations_client: nom, adresse, identifiant client
-                - détails_facture: numéro de facture, date d'émission, date d'échéance
-                - articles: liste des articles/services avec description, quantité, prix unitaire et total
-                - montants: sous-total, taxes (TVA ou autres), frais supplémentaires, total
-                - modalités_paiement: méthode de paiement, coordonnées bancaires
-                
-                Regroupe ces informations dans une structure JSON cohérente."""
-                
-            elif is_article:
-                query = """Extraire et structurer les informations suivantes de l'article:
-                - méta_informations: titre, auteurs, date de publication, journal/conférence
-                - résumé: résumé ou abstract complet
-                - structure_principale: introduction, méthodologie, résultats, discussion, conclusion
-                - mots_clés: liste des mots-clés
-                - références: liste des références bibliographiques principales
-                
-                Regroupe ces informations dans une structure JSON cohérente."""
-                
-            else:
-                # Requête générale pour tout type de document
-                query = """Analyse ce document et extrait les informations clés suivantes:
-                - titre: titre principal du document
-                - auteur: auteur ou créateur du document
-                - date: date de création ou de publication
-                - type_document: type de document détecté
-                - sections_principales: liste des principales sections avec leur contenu résumé
-                - points_clés: liste des informations importantes extraites
-                - entités: personnes, organisations, lieux et dates mentionnés
-                
-                Regroupe ces informations dans une structure JSON cohérente et détaillée."""
+            document_type = _detect_document_type(
+                file.filename,
+                lambda: extract_text_from_pdf(temp_file_path, max_chars=1000)[:1000].lower()
+            )
+            query = DOCUMENT_TYPE_QUERIES[document_type]
                 
             logger.info(f"Requête améliorée automatiquement: '{query[:50]}...' (basée sur la détection de type de document)")
         
@@ -4,17 +4,174 @@ Script pour organiser des données extraites/traitées en DataFrame pandas et le
 """
 
 import os
+import csv
 import sys
 import json
+import hashlib
 import argparse
+import numpy as np
 import pandas as pd
-from typing import Dict, List, Any, Optional, Union
+from typing import Dict, List, Any, Optional, Union, Tuple
 import logging
 
+from src.utils.file_handler import dumps_json
+
 # Configuration du logger
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Import conditionnel d'orjson (lecture JSON rapide), repli sur json standard
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Import conditionnel d'ijson (lecture JSON en flux pour les gros fichiers)
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+    JSON_DECODE_ERRORS = (json.JSONDecodeError, ijson.JSONError)
+except ImportError:
+    IJSON_AVAILABLE = False
+    JSON_DECODE_ERRORS = (json.JSONDecodeError,)
+
+# Import conditionnel de pyarrow (écriture CSV en C++ depuis la mémoire colonnaire)
+try:
+    import pyarrow as pa
+    from pyarrow import csv as pacsv
+    PYARROW_AVAILABLE = True
+    # Avant pyarrow 12, toutes les chaînes sont entre guillemets (pandas ne les met que si nécessaire)
+    PYARROW_QUOTING_NEEDED = tuple(int(part) for part in pa.__version__.split('.')[:2]) >= (12, 0)
+except ImportError:
+    PYARROW_AVAILABLE = False
+    PYARROW_QUOTING_NEEDED = False
+
+# Taille du tampon d'écriture des fichiers CSV
+CSV_WRITE_BUFFER_SIZE = 1 << 20
+
+# Taille à partir de laquelle une liste JSON est lue en flux plutôt qu'en une fois
+STREAMING_THRESHOLD_BYTES = 100 * 1024 * 1024
+
+# Décodeur json standard instancié une seule fois (repli sans orjson)
+_json_decode = json.JSONDecoder().decode
+
+def _json_dumps(value: Any) -> str:
+    """
+    Sérialise une valeur en chaîne JSON, avec orjson si disponible.
+    
+    Args:
+        value: Valeur à sérialiser
+        
+    Returns:
+        str: Représentation JSON de la valeur
+    """
+    return dumps_json(value).decode('utf-8')
+
+def _json_loads(raw: Union[bytes, str]) -> Any:
+    """
+    Désérialise un contenu JSON, avec orjson si disponible.
+    
+    Args:
+        raw: Contenu JSON (bytes ou str)
+        
+    Returns:
+        Any: Données désérialisées
+    """
+    if ORJSON_AVAILABLE:
+        return orjson.loads(raw)
+    if isinstance(raw, bytes):
+        raw = raw.decode(json.detect_encoding(raw))
+    return _json_decode(raw)
+
+# Test de type vectorisé (ufunc objet) pour détecter les dict/list d'une colonne
+_is_complex_ufunc = np.frompyfunc(lambda x: isinstance(x, (dict, list)), 1, 1)
+_COMPLEX_PROBE_SIZE = 64
+
+def _dedup_key(value: Any) -> Optional[bytes]:
+    """
+    Calcule une empreinte courte (64 bits) d'une valeur complexe pour la déduplication.
+    
+    Args:
+        value: Valeur à hacher (dict, liste ou scalaire)
+        
+    Returns:
+        Optional[bytes]: Empreinte BLAKE2b de la forme JSON canonique, None si la valeur est None
+    """
+    if value is None:
+        return None
+    
+    raw = dumps_json(value, sort_keys=True, default=str)
+    
+    return hashlib.blake2b(raw, digest_size=8).digest()
+
+def _has_complex_values(series: pd.Series) -> bool:
+    """
+    Indique si une colonne contient au moins un objet complexe (dict ou liste).
+    
+    Args:
+        series: Colonne à inspecter
+        
+    Returns:
+        bool: True dès qu'un objet complexe est trouvé
+    """
+    # Les colonnes de type numérique/datetime ne peuvent pas contenir de dict/list
+    if series.dtype != object:
+        return False
+    values = series.to_numpy()
+    # Les objets complexes apparaissent en général dès les premières lignes:
+    # sonder d'abord un court préfixe avec arrêt au premier objet trouvé
+    if any(isinstance(v, (dict, list)) for v in values[:_COMPLEX_PROBE_SIZE]):
+        return True
+    # Puis tester le reste de la colonne dans la boucle C du ufunc
+    return bool(_is_complex_ufunc(values[_COMPLEX_PROBE_SIZE:]).any())
+
+def _is_json_list_file(path: str) -> bool:
+    """
+    Vérifie si un fichier JSON contient une liste en lisant son premier caractère significatif.
+    
+    Args:
+        path: Chemin du fichier JSON
+        
+    Returns:
+        bool: True si le document JSON commence par '['
+    """
+    with open(path, 'rb') as f:
+        head = f.read(4096).lstrip()
+    # Ignorer un éventuel BOM UTF-8
+    if head.startswith(b'\xef\xbb\xbf'):
+        head = head[3:].lstrip()
+    return head[:1] == b'['
+
+def iter_json_records(path: str, chunksize: int = 10000):
+    """
+    Lit en flux une liste JSON d'enregistrements et la renvoie par lots.
+    
+    Args:
+        path: Chemin d'un fichier JSON contenant une liste
+        chunksize: Nombre d'enregistrements par lot
+        
+    Yields:
+        List[Any]: Lot d'enregistrements
+    """
+    if not IJSON_AVAILABLE:
+        # Sans ijson, charger le fichier en une fois puis découper
+        data = load_data(path)
+        records = data if isinstance(data, list) else [data]
+        for start in range(0, len(records), chunksize):
+            yield records[start:start + chunksize]
+        return
+    
+    batch = []
+    with open(path, 'rb') as f:
+        for record in ijson.items(f, 'item', use_float=True):
+            batch.append(record)
+            if len(batch) >= chunksize:
+                yield batch
+                batch = []
+    if batch:
+        yield batch
+
 def load_data(source: Union[str, Dict[str, Any], List[Dict[str, Any]]]) -> Dict[str, Any]:
     """
     Charge des données à partir d'un fichier JSON ou d'un dictionnaire/liste.
@@ -32,9 +189,20 @@ def load_data(source: Union[str, Dict[str, Any], List[Dict[str, Any]]]) -> Dict[
     # Si source est un chemin de fichier
     if isinstance(source, str):
         try:
-            with open(source, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except json.JSONDecodeError:
+            # Les grosses listes JSON sont lues en flux pour éviter de garder
+            # en mémoire à la fois le contenu brut et les objets décodés
+            if (IJSON_AVAILABLE
+                    and os.path.getsize(source) >= STREAMING_THRESHOLD_BYTES
+                    and _is_json_list_file(source)):
+                records = []
+                for batch in iter_json_records(source):
+                    records.extend(batch)
+                return records
+            
+            # Lecture en binaire: orjson parse directement les bytes UTF-8
+            with open(source, 'rb') as f:
+                return _json_loads(f.read())
+        except JSON_DECODE_ERRORS:
             logger.error(f"Le fichier '{source}' n'est pas un JSON valide")
             sys.exit(1)
         except FileNotFoundError:
@@ -44,23 +212,70 @@ def load_data(source: Union[str, Dict[str, Any], List[Dict[str, Any]]]) -> Dict[
     logger.error("Format de source non pris en charge")
     sys.exit(1)
 
-def create_dataframe(data: Union[Dict[str, Any], List[Dict[str, Any]]]) -> pd.DataFrame:
+_NUMERIC_PROBE_SIZE = 8
+
+def _as_numeric_array(values: Any) -> Any:
+    """
+    Convertit une liste de nombres en tableau NumPy, sinon la renvoie telle quelle.
+    
+    Args:
+        values: Valeurs d'une colonne
+        
+    Returns:
+        np.ndarray ou la valeur d'origine si la colonne n'est pas purement numérique
+    """
+    if not isinstance(values, list) or not values:
+        return values
+    # Sonder les premiers éléments avant de tenter la conversion complète
+    probe = values[:_NUMERIC_PROBE_SIZE]
+    if not all(isinstance(x, (int, float)) for x in probe):
+        return values
+    arr = np.asarray(values)
+    # Le type final confirme que toute la colonne est numérique (sinon 'U' ou 'O')
+    if arr.ndim == 1 and arr.dtype.kind in 'biuf':
+        return arr
+    return values
+
+def _all_instances(items: List[Any], types, strict: bool = False) -> bool:
+    """
+    Vérifie que les éléments d'une liste sont du type attendu.
+    
+    Args:
+        items: Éléments à vérifier
+        types: Type ou tuple de types attendus
+        strict: Vérifier tous les éléments plutôt qu'un échantillon
+        
+    Returns:
+        bool: True si les éléments (ou l'échantillon) sont du type attendu
+    """
+    if strict or len(items) <= 3:
+        return all(isinstance(item, types) for item in items)
+    # Échantillon premier/milieu/dernier: évite un parcours complet pour le routage
+    return (isinstance(items[0], types)
+            and isinstance(items[len(items) // 2], types)
+            and isinstance(items[-1], types))
+
+def create_dataframe(data: Union[Dict[str, Any], List[Dict[str, Any]]], strict: bool = False) -> pd.DataFrame:
     """
     Crée un DataFrame pandas à partir de données structurées.
     
     Args:
         data: Données structurées (dict avec listes ou liste de dicts)
+        strict: Vérifier le type de tous les éléments pour choisir le format
+            (par défaut, seul un échantillon est inspecté)
         
     Returns:
         pd.DataFrame: DataFrame créé
     """
     # Cas 1: data est un dict avec des listes (format de sortie d'aggregate_extraction_results)
     # Ex: {"titres": ["titre1", "titre2"], "dates": ["date1", "date2"]}
-    if isinstance(data, dict) and all(isinstance(v, list) for v in data.values() if v):
+    if isinstance(data, dict) and _all_instances([v for v in data.values() if v], list, strict):
         # Vérifier si toutes les listes ont la même longueur
         list_lengths = [len(v) for v in data.values() if isinstance(v, list)]
         if list_lengths and all(x == list_lengths[0] for x in list_lengths):
-            return pd.DataFrame(data)
+            # Passer directement des tableaux NumPy pour les colonnes numériques:
+            # pandas n'a alors plus à inférer leur type
+            return pd.DataFrame({key: _as_numeric_array(value) for key, value in data.items()}, copy=False)
         else:
             # Si les listes ont des longueurs différentes, on les aligne
             max_length = max(list_lengths) if list_lengths else 0
@@ -78,12 +293,12 @@ def create_dataframe(data: Union[Dict[str, Any], List[Dict[str, Any]]]) -> pd.Da
     
     # Cas 2: data est une liste de dictionnaires
     # Ex: [{"titre": "titre1", "date": "date1"}, {"titre": "titre2", "date": "date2"}]
-    elif isinstance(data, list) and all(isinstance(item, dict) for item in data):
+    elif isinstance(data, list) and _all_instances(data, dict, strict):
         return pd.DataFrame(data)
     
     # Cas 3: data est un dictionnaire de dictionnaires
     # Ex: {"item1": {"titre": "titre1", "date": "date1"}, "item2": {"titre": "titre2", "date": "date2"}}
-    elif isinstance(data, dict) and all(isinstance(item, dict) for item in data.values()):
+    elif isinstance(data, dict) and _all_instances(list(data.values()), dict, strict):
         # Convertir en liste de dictionnaires avec une colonne d'ID
         items = []
         for key, value in data.items():
@@ -109,6 +324,104 @@ def create_dataframe(data: Union[Dict[str, Any], List[Dict[str, Any]]]) -> pd.Da
     logger.warning("Format de données non standard, conversion en DataFrame simplifiée")
     return pd.DataFrame([data] if not isinstance(data, list) else data)
 
+def _guess_date_format(series: pd.Series) -> Optional[str]:
+    """
+    Devine le format strftime d'une colonne de dates à partir de sa première valeur.
+    
+    Args:
+        series: Colonne de dates sous forme de chaînes
+        
+    Returns:
+        Optional[str]: Format deviné, ou None si aucun format n'a pu être déterminé
+    """
+    try:
+        from pandas.tseries.api import guess_datetime_format
+    except ImportError:
+        try:
+            from pandas._libs.tslibs.parsing import guess_datetime_format
+        except ImportError:
+            return None
+    
+    first_value = next((v for v in series.to_numpy() if isinstance(v, str) and v.strip()), None)
+    if first_value is None:
+        return None
+    try:
+        return guess_datetime_format(first_value.strip())
+    except Exception:
+        return None
+
+def _parse_date_column(series: pd.Series, input_format: Optional[str] = None) -> pd.Series:
+    """
+    Convertit une colonne en datetime avec un format explicite si possible.
+    
+    Avec un format connu, pandas utilise son parseur C au lieu de dateutil.
+    Les valeurs qui ne correspondent pas au format sont reparsées sans format.
+    
+    Args:
+        series: Colonne à convertir
+        input_format: Format strftime des dates en entrée
+        
+    Returns:
+        pd.Series: Colonne convertie (NaT pour les valeurs invalides)
+    """
+    return _parse_date_column_exact(series, input_format)[0]
+
+def _parse_date_column_exact(
+    series: pd.Series,
+    input_format: Optional[str] = None
+) -> Tuple[pd.Series, pd.Series]:
+    """
+    Comme _parse_date_column, en indiquant aussi les valeurs lues avec le format explicite.
+    
+    Args:
+        series: Colonne à convertir
+        input_format: Format strftime des dates en entrée
+        
+    Returns:
+        Tuple[pd.Series, pd.Series]: Colonne convertie et masque des valeurs
+            correspondant exactement à input_format
+    """
+    parsed = pd.to_datetime(series, format=input_format, errors='coerce', cache=True)
+    
+    if not input_format:
+        return parsed, pd.Series(False, index=series.index)
+    
+    exact = parsed.notna()
+    unparsed = ~exact & series.notna()
+    if unparsed.any():
+        parsed[unparsed] = pd.to_datetime(series[unparsed], errors='coerce', cache=True)
+    
+    return parsed, exact
+
+_CATEGORY_MIN_ROWS = 1000
+_CATEGORY_SAMPLE_SIZE = 10000
+
+def _categorize_low_cardinality(df: pd.DataFrame, preserve: Any = ()) -> List[str]:
+    """
+    Convertit sur place en type 'category' les colonnes texte comportant beaucoup de répétitions.
+    
+    Args:
+        df: DataFrame à convertir
+        preserve: Colonnes à laisser en type object
+        
+    Returns:
+        List[str]: Colonnes converties, à repasser en type object après usage
+    """
+    if len(df) < _CATEGORY_MIN_ROWS:
+        return []
+    
+    converted = []
+    for col in df.select_dtypes(include='object').columns:
+        if col in preserve:
+            continue
+        # Estimer la cardinalité sur un échantillon plutôt que sur toute la colonne
+        sample = df[col].iloc[:_CATEGORY_SAMPLE_SIZE]
+        if sample.nunique(dropna=False) / len(sample) < 0.5:
+            df[col] = df[col].astype('category')
+            converted.append(col)
+    
+    return converted
+
 def clean_dataframe(df: pd.DataFrame, options: Dict[str, Any] = None) -> pd.DataFrame:
     """
     Nettoie et formate un DataFrame.
@@ -116,6 +429,16 @@ def clean_dataframe(df: pd.DataFrame, options: Dict[str, Any] = None) -> pd.Data
     Args:
         df: DataFrame à nettoyer
         options: Options de nettoyage
+            - rename_columns (dict): Colonnes à renommer
+            - drop_na_threshold (float): Proportion minimale de valeurs renseignées par ligne
+            - remove_duplicates (bool): Supprimer les doublons (défaut: True)
+            - preserve_object (list): Colonnes à ne pas convertir temporairement en type
+              'category' pendant la déduplication (utile pour les colonnes presque uniques)
+            - date_columns (list): Colonnes de dates à convertir
+            - date_input_format (str): Format des dates en entrée (deviné sinon)
+            - date_format (str): Format de sortie des dates
+            - sort_by (str), sort_ascending (bool): Tri des lignes
+            - columns (list): Colonnes à conserver, dans cet ordre
         
     Returns:
         pd.DataFrame: DataFrame nettoyé
@@ -140,41 +463,57 @@ def clean_dataframe(df: pd.DataFrame, options: Dict[str, Any] = None) -> pd.Data
         # Vérifier si des objets non hashables sont présents
         non_hashable_columns = []
         for col in df_clean.columns:
-            if df_clean[col].apply(lambda x: isinstance(x, (dict, list))).any():
+            if _has_complex_values(df_clean[col]):
                 non_hashable_columns.append(col)
         
         if non_hashable_columns:
-            # Créer des versions stringifiées des colonnes non hashables
+            # Créer des empreintes hashables des colonnes non hashables
             temp_df = df_clean.copy()
             for col in non_hashable_columns:
-                temp_df[f"{col}_str"] = temp_df[col].apply(lambda x: json.dumps(x) if x is not None else None)
+                temp_df[f"{col}_h"] = [_dedup_key(x) for x in temp_df[col].to_numpy()]
             
-            # Supprimer les doublons en utilisant les colonnes stringifiées
-            string_cols = [f"{col}_str" for col in non_hashable_columns]
+            # Supprimer les doublons en utilisant les colonnes d'empreintes
+            hash_cols = [f"{col}_h" for col in non_hashable_columns]
             other_cols = [col for col in df_clean.columns if col not in non_hashable_columns]
-            subset_cols = other_cols + string_cols
+            subset_cols = other_cols + hash_cols
             
-            # Trouver les indices à conserver après déduplication
-            keep_indices = ~temp_df.duplicated(subset=subset_cols, keep='first')
+            # Dédupliquer directement puis retirer les colonnes d'empreintes
+            df_clean = temp_df.drop_duplicates(
+                subset=subset_cols, keep='first', ignore_index=True
+            ).drop(columns=hash_cols)
             
-            # Appliquer le filtre sur le DataFrame original
-            df_clean = df_clean.loc[keep_indices].reset_index(drop=True)
-            
-            logging.info(f"Suppression des doublons effectuée en utilisant les conversions JSON pour {len(non_hashable_columns)} colonnes non hashables")
+            logging.info(f"Suppression des doublons effectuée en utilisant des empreintes pour {len(non_hashable_columns)} colonnes non hashables")
         else:
             # Si aucun objet non hashable n'est présent, utiliser drop_duplicates() standard
+            # sur des colonnes catégorielles (codes entiers) pour les chaînes répétitives
+            categorized = _categorize_low_cardinality(df_clean, options.get('preserve_object', ()))
             df_clean = df_clean.drop_duplicates()
+            # Rendre des colonnes object : le type 'category' ne sert qu'à la déduplication
+            if categorized:
+                df_clean[categorized] = df_clean[categorized].astype(object)
     
     # Convertir les dates si des colonnes de date sont spécifiées
     if 'date_columns' in options:
         for col in options['date_columns']:
             if col in df_clean.columns:
                 try:
-                    df_clean[col] = pd.to_datetime(df_clean[col], errors='coerce')
+                    input_format = options.get('date_input_format') or _guess_date_format(df_clean[col])
+                    parsed, exact = _parse_date_column_exact(df_clean[col], input_format)
                     
                     # Formater la date si un format est spécifié
                     if 'date_format' in options:
-                        df_clean[col] = df_clean[col].dt.strftime(options['date_format'])
+                        if input_format and options['date_format'] == input_format:
+                            # Même format en entrée et en sortie: conserver les chaînes lues
+                            # avec ce format, reformater celles reparsées sans format
+                            formatted = df_clean[col].astype(object).where(exact)
+                            reparsed = parsed.notna() & ~exact
+                            if reparsed.any():
+                                formatted[reparsed] = parsed[reparsed].dt.strftime(options['date_format'])
+                            df_clean[col] = formatted
+                        else:
+                            df_clean[col] = parsed.dt.strftime(options['date_format'])
+                    else:
+                        df_clean[col] = parsed
                 except Exception as e:
                     logger.warning(f"Erreur lors de la conversion de la colonne date '{col}': {str(e)}")
     
@@ -194,10 +533,67 @@ def clean_dataframe(df: pd.DataFrame, options: Dict[str, Any] = None) -> pd.Data
     
     return df_clean
 
+_PRIMITIVE_TYPES = (str, int, float, bool, type(None))
+
+def _is_primitive_list(values: List[Any]) -> bool:
+    """
+    Indique si une liste ne contient que des valeurs simples (str, nombres, booléens, None).
+    
+    Args:
+        values: Liste à inspecter
+        
+    Returns:
+        bool: True si tous les éléments sont des valeurs simples
+    """
+    # Chemin rapide: l'inférence de type de NumPy (en C) reconnaît les listes
+    # homogènes de nombres/chaînes sans boucle Python
+    try:
+        arr = np.asarray(values)
+        if arr.ndim == 1 and arr.dtype.kind in 'biufSU':
+            return True
+    except (ValueError, TypeError):
+        pass
+    # Listes hétérogènes (None, dicts, sous-listes...): vérification élément par élément
+    return all(isinstance(x, _PRIMITIVE_TYPES) for x in values)
+
+def _records_to_frame(records: List[Dict[str, Any]], index: pd.Index) -> pd.DataFrame:
+    """
+    Construit un DataFrame à partir d'une liste de dictionnaires aplatis.
+    
+    Les colonnes sont d'abord regroupées (union des clés dans l'ordre d'apparition),
+    puis l'inférence des types est confiée à pyarrow si disponible.
+    
+    Args:
+        records: Dictionnaires aplatis, un par ligne
+        index: Index à appliquer au DataFrame résultant
+        
+    Returns:
+        pd.DataFrame: DataFrame construit
+    """
+    columns = list(dict.fromkeys(key for record in records for key in record))
+    if not columns:
+        return pd.DataFrame(index=index)
+    
+    data = {key: [record.get(key) for record in records] for key in columns}
+    
+    if PYARROW_AVAILABLE:
+        try:
+            frame = pa.table(data).to_pandas()
+            frame.index = index
+            return frame
+        except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+            # Colonnes aux types mixtes: repli sur la construction pandas
+            pass
+    
+    return pd.DataFrame(data, index=index, columns=columns)
+
 def flatten_complex_data(df: pd.DataFrame, max_depth: int = 2) -> pd.DataFrame:
     """
     Aplatit les structures de données complexes (dictionnaires, listes) dans un DataFrame.
     
+    Les listes de valeurs simples et les structures restant au-delà de max_depth sont
+    écrites en JSON compact, caractères non ASCII conservés (ex: ["a","é"], {"x":1}).
+    
     Args:
         df: DataFrame à aplatir
         max_depth: Profondeur maximale d'aplatissement
@@ -207,62 +603,190 @@ def flatten_complex_data(df: pd.DataFrame, max_depth: int = 2) -> pd.DataFrame:
     """
     flat_df = df.copy()
     
-    # Fonction récursive pour aplatir une valeur
-    def flatten_value(value, prefix='', depth=0):
+    # Fonction récursive qui écrit les valeurs aplaties directement dans `out`
+    # (pas de dictionnaire intermédiaire ni de update() à chaque niveau)
+    def flatten_into(value, prefix, depth, out):
         if depth >= max_depth:
-            return {prefix: str(value) if value is not None else None}
+            # Sérialiser directement les structures résiduelles: aucune seconde
+            # passe de conversion n'est alors nécessaire après l'aplatissement
+            if isinstance(value, (dict, list)):
+                out[prefix] = _json_dumps(value)
+            else:
+                out[prefix] = str(value) if value is not None else None
+            return
         
         if isinstance(value, dict):
-            result = {}
             for k, v in value.items():
                 key = f"{prefix}_{k}" if prefix else k
-                result.update(flatten_value(v, key, depth + 1))
-            return result
+                flatten_into(v, key, depth + 1, out)
         elif isinstance(value, list):
             if not value:
-                return {prefix: "[]"}
+                out[prefix] = "[]"
+                return
             
-            if all(isinstance(x, (str, int, float, bool, type(None))) for x in value):
-                return {prefix: json.dumps(value)}
+            if _is_primitive_list(value):
+                out[prefix] = _json_dumps(value)
+                return
             
-            result = {}
             for i, v in enumerate(value[:5]):  # Limiter à 5 éléments pour éviter explosion
                 key = f"{prefix}_{i}" if prefix else f"item_{i}"
-                result.update(flatten_value(v, key, depth + 1))
+                flatten_into(v, key, depth + 1, out)
             
             if len(value) > 5:
-                result[f"{prefix}_more"] = f"et {len(value) - 5} autres éléments"
-                
-            return result
+                out[f"{prefix}_more"] = f"et {len(value) - 5} autres éléments"
         else:
-            return {prefix: value}
+            out[prefix] = value
+    
+    def flatten_value(value, prefix=''):
+        out = {}
+        flatten_into(value, prefix, 0, out)
+        return out
     
     # Détecter et aplatir les colonnes avec des structures complexes
     complex_columns = []
     for col in flat_df.columns:
-        if flat_df[col].apply(lambda x: isinstance(x, (dict, list))).any():
+        if _has_complex_values(flat_df[col]):
             complex_columns.append(col)
     
     if complex_columns:
         logging.info(f"Aplatissement de {len(complex_columns)} colonnes avec structures de données complexes")
-        flat_data = []
         
-        for _, row in flat_df.iterrows():
-            row_dict = {}
-            for col in flat_df.columns:
-                if col in complex_columns:
-                    flattened = flatten_value(row[col], col)
-                    row_dict.update(flattened)
-                else:
-                    row_dict[col] = row[col]
-            flat_data.append(row_dict)
+        # Aplatir colonne par colonne (sans itérer ligne par ligne avec iterrows)
+        # en conservant l'ordre d'origine des colonnes
+        frames = []
+        for col in flat_df.columns:
+            if col in complex_columns:
+                flattened = [flatten_value(value, col) for value in flat_df[col].to_numpy()]
+                frames.append(_records_to_frame(flattened, flat_df.index))
+            else:
+                frames.append(flat_df[[col]])
         
-        # Créer un nouveau DataFrame à partir des données aplaties
-        return pd.DataFrame(flat_data)
+        # Créer un nouveau DataFrame à partir des colonnes aplaties
+        return pd.concat(frames, axis=1).reset_index(drop=True)
     
     # Si aucune colonne complexe, retourner le DataFrame original
     return flat_df
 
+def prepare_dataframe(df: pd.DataFrame, options: Dict[str, Any]) -> pd.DataFrame:
+    """
+    Nettoie, aplatit et rend exportable en CSV un DataFrame.
+    
+    Args:
+        df: DataFrame à préparer
+        options: Options de nettoyage et d'exportation
+        
+    Returns:
+        pd.DataFrame: DataFrame prêt pour l'export CSV
+    """
+    # Nettoyer et formater le DataFrame
+    df_clean = clean_dataframe(df, options)
+    logger.info(f"DataFrame nettoyé: {len(df_clean)} lignes restantes")
+    
+    # Aplatir les structures complexes si l'option est activée
+    if options.get('flatten_complex', True):
+        # L'aplatissement sérialise déjà toute structure résiduelle en JSON
+        df_clean = flatten_complex_data(df_clean)
+        logger.info(f"Structures de données complexes aplaties pour faciliter l'exportation CSV")
+        return df_clean
+    
+    # Sans aplatissement, vérifier s'il y a des objets non exportables en CSV
+    for col in df_clean.columns:
+        if _has_complex_values(df_clean[col]):
+            logger.warning(f"La colonne '{col}' contient des objets complexes qui seront convertis en chaînes")
+            
+            # Convertir les objets complexes en chaînes JSON
+            df_clean[col] = df_clean[col].apply(
+                lambda x: _json_dumps(x) if isinstance(x, (dict, list)) else x
+            )
+    
+    return df_clean
+
+def _can_use_arrow_writer(csv_options: Dict[str, Any], include_index: bool) -> bool:
+    """
+    Indique si les options CSV demandées sont prises en charge par l'écrivain pyarrow.
+    
+    Args:
+        csv_options: Options passées à l'export CSV
+        include_index: Inclure l'index du DataFrame
+        
+    Returns:
+        bool: True si pyarrow peut produire le fichier demandé
+    """
+    if not PYARROW_QUOTING_NEEDED or include_index:
+        return False
+    # pyarrow n'écrit qu'en UTF-8 et ne gère que le délimiteur parmi les options pandas
+    if set(csv_options) - {'sep', 'encoding', 'chunksize'}:
+        return False
+    encoding = (csv_options.get('encoding') or 'utf-8').lower().replace('_', '-')
+    return encoding in ('utf-8', 'utf8') and len(csv_options.get('sep', ',')) == 1
+
+def _arrow_writes_like_pandas(df: pd.DataFrame) -> bool:
+    """
+    Indique si pyarrow écrit chaque colonne exactement comme pandas.
+    
+    Seuls les entiers et les chaînes sont rendus à l'identique : pyarrow écrit les
+    booléens en minuscules et formate différemment les flottants et les dates.
+    
+    Args:
+        df: DataFrame à écrire
+        
+    Returns:
+        bool: True si toutes les colonnes sont des entiers ou des chaînes
+    """
+    for col in df.columns:
+        dtype = df[col].dtype
+        if pd.api.types.is_integer_dtype(dtype) and isinstance(dtype, np.dtype):
+            continue
+        if dtype == object and pd.api.types.infer_dtype(df[col], skipna=True) in ('string', 'empty'):
+            continue
+        return False
+    return True
+
+def _write_csv(df: pd.DataFrame, output_file: str, options: Dict[str, Any], append: bool = False) -> None:
+    """
+    Écrit un DataFrame dans un fichier CSV.
+    
+    pyarrow n'est utilisé que lorsque le fichier produit est identique à celui de
+    pandas (colonnes d'entiers et de chaînes, pyarrow >= 12) ; sinon pandas l'écrit.
+    
+    Args:
+        df: DataFrame à écrire
+        output_file: Chemin du fichier CSV
+        options: Options d'exportation
+        append: Ajouter à la fin du fichier existant (sans en-tête)
+    """
+    csv_options = options.get('csv_options', {})
+    include_index = options.get('include_index', False)
+    file_mode = 'ab' if append else 'wb'
+    
+    if _can_use_arrow_writer(csv_options, include_index) and _arrow_writes_like_pandas(df):
+        try:
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            write_options = pacsv.WriteOptions(
+                include_header=not append,
+                delimiter=csv_options.get('sep', ','),
+                quoting_style='needed'
+            )
+            with open(output_file, file_mode, buffering=CSV_WRITE_BUFFER_SIZE) as f:
+                pacsv.write_csv(table, f, write_options=write_options)
+            return
+        except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError) as e:
+            # Colonnes aux types mixtes ou non convertibles: repli sur pandas
+            logger.debug(f"Écriture CSV avec pyarrow impossible, repli sur pandas: {str(e)}")
+    
+    # Fichier binaire avec un grand tampon: moins d'appels système d'écriture
+    csv_options = dict(csv_options)
+    chunksize = csv_options.pop('chunksize', 50000)
+    with open(output_file, file_mode, buffering=CSV_WRITE_BUFFER_SIZE) as f:
+        df.to_csv(
+            f,
+            index=include_index,
+            mode=file_mode,
+            header=not append,
+            chunksize=chunksize,
+            **csv_options
+        )
+
 def export_dataframe(
     data: Union[str, Dict[str, Any], List[Dict[str, Any]]],
     output_file: str = 'donnees.csv',
@@ -271,6 +795,10 @@ def export_dataframe(
     """
     Exporte des données structurées en fichier CSV via pandas DataFrame.
     
+    Si l'option 'chunksize' est définie et que la source est un fichier JSON contenant
+    une liste, les enregistrements sont lus et exportés par lots (la déduplication et
+    le tri s'appliquent alors lot par lot).
+    
     Args:
         data: Données à exporter (chemin de fichier JSON ou données Python)
         output_file: Chemin du fichier CSV à générer
@@ -282,6 +810,15 @@ def export_dataframe(
     if options is None:
         options = {}
     
+    # Assurer que le répertoire de sortie existe
+    output_dir = os.path.dirname(output_file)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    
+    chunksize = options.get('chunksize')
+    if chunksize and isinstance(data, str) and os.path.exists(data) and _is_json_list_file(data):
+        return _export_in_chunks(data, output_file, options, chunksize)
+    
     # Charger les données
     loaded_data = load_data(data)
     
@@ -289,42 +826,73 @@ def export_dataframe(
     df = create_dataframe(loaded_data)
     logger.info(f"DataFrame créé avec {len(df)} lignes et {len(df.columns)} colonnes")
     
-    # Nettoyer et formater le DataFrame
-    df_clean = clean_dataframe(df, options)
-    logger.info(f"DataFrame nettoyé: {len(df_clean)} lignes restantes")
-    
-    # Aplatir les structures complexes si l'option est activée
-    if options.get('flatten_complex', True):
-        df_clean = flatten_complex_data(df_clean)
-        logger.info(f"Structures de données complexes aplaties pour faciliter l'exportation CSV")
-    
-    # Assurer que le répertoire de sortie existe
-    output_dir = os.path.dirname(output_file)
-    if output_dir and not os.path.exists(output_dir):
-        os.makedirs(output_dir)
-    
-    # Vérifier s'il y a des objets non exportables en CSV
-    has_complex_objects = False
-    for col in df_clean.columns:
-        if df_clean[col].apply(lambda x: isinstance(x, (dict, list))).any():
-            has_complex_objects = True
-            logger.warning(f"La colonne '{col}' contient des objets complexes qui seront convertis en chaînes")
-            
-            # Convertir les objets complexes en chaînes JSON
-            df_clean[col] = df_clean[col].apply(
-                lambda x: json.dumps(x, ensure_ascii=False) if isinstance(x, (dict, list)) else x
-            )
+    # Nettoyer, aplatir et convertir les objets complexes
+    df_clean = prepare_dataframe(df, options)
     
     # Exporter en CSV
     try:
-        csv_options = options.get('csv_options', {})
-        df_clean.to_csv(output_file, index=options.get('include_index', False), **csv_options)
+        _write_csv(df_clean, output_file, options)
         logger.info(f"Données exportées avec succès dans {output_file}")
         return os.path.abspath(output_file)
     except Exception as e:
         logger.error(f"Erreur lors de l'exportation en CSV: {str(e)}")
         return ""
 
+def _export_in_chunks(source: str, output_file: str, options: Dict[str, Any], chunksize: int) -> str:
+    """
+    Exporte une liste JSON en CSV lot par lot, sans charger tout le fichier en mémoire.
+    
+    Args:
+        source: Chemin du fichier JSON (liste d'enregistrements)
+        output_file: Chemin du fichier CSV à générer
+        options: Options de nettoyage et d'exportation
+        chunksize: Nombre d'enregistrements par lot
+        
+    Returns:
+        str: Chemin du fichier CSV généré
+    """
+    columns = None
+    total_rows = 0
+    
+    try:
+        for batch in iter_json_records(source, chunksize):
+            df_clean = prepare_dataframe(create_dataframe(batch), options)
+            first_batch = columns is None
+            
+            # Aligner les lots suivants sur les colonnes du premier lot (en-tête unique)
+            if columns is None:
+                columns = list(df_clean.columns)
+            else:
+                extra_columns = [col for col in df_clean.columns if col not in columns]
+                if extra_columns:
+                    logger.warning(f"Colonnes absentes du premier lot ignorées: {extra_columns}")
+                df_clean = df_clean.reindex(columns=columns)
+            
+            _write_csv(df_clean, output_file, options, append=not first_batch)
+            total_rows += len(df_clean)
+        
+        logger.info(f"{total_rows} lignes exportées par lots de {chunksize} dans {output_file}")
+        return os.path.abspath(output_file)
+    except Exception as e:
+        logger.error(f"Erreur lors de l'exportation en CSV: {str(e)}")
+        return ""
+
+def count_csv_rows(path: str, delimiter: str = ',', encoding: str = 'utf-8') -> int:
+    """
+    Compte les lignes de données d'un fichier CSV sans le charger en DataFrame.
+    
+    Args:
+        path: Chemin du fichier CSV
+        delimiter: Délimiteur CSV
+        encoding: Encodage du fichier
+        
+    Returns:
+        int: Nombre de lignes de données (en-tête exclu)
+    """
+    # csv.reader gère les champs entre guillemets contenant des retours à la ligne
+    with open(path, 'r', encoding=encoding, newline='', buffering=1 << 20) as f:
+        return max(sum(1 for _ in csv.reader(f, delimiter=delimiter)) - 1, 0)
+
 def main():
     parser = argparse.ArgumentParser(description="Organise et exporte des données en format CSV")
     
@@ -335,6 +903,7 @@ def main():
     parser.add_argument("--no-duplicates", action="store_true", help="Supprimer les doublons")
     parser.add_argument("--date-columns", nargs="+", help="Colonnes à convertir en dates")
     parser.add_argument("--date-format", default="%Y-%m-%d", help="Format des dates à la sortie")
+    parser.add_argument("--date-input-format", help="Format des dates en entrée (deviné si absent)")
     parser.add_argument("--sort-by", help="Colonne pour trier les données")
     parser.add_argument("--desc", action="store_true", help="Trier par ordre décroissant")
     parser.add_argument("--columns", nargs="+", help="Colonnes à inclure dans le résultat")
@@ -353,6 +922,7 @@ def main():
     # Options de formatage avancées
     parser.add_argument("--flatten", action="store_true", help="Aplatir les structures de données complexes")
     parser.add_argument("--max-flatten-depth", type=int, default=2, help="Profondeur maximale d'aplatissement")
+    parser.add_argument("--chunksize", type=int, help="Traiter les listes JSON par lots de N enregistrements (gros fichiers)")
     
     args = parser.parse_args()
     
@@ -371,6 +941,8 @@ def main():
     if args.date_columns:
         options['date_columns'] = args.date_columns
         options['date_format'] = args.date_format
+        if args.date_input_format:
+            options['date_input_format'] = args.date_input_format
     
     if args.sort_by:
         options['sort_by'] = args.sort_by
@@ -379,6 +951,9 @@ def main():
     if args.columns:
         options['columns'] = args.columns
     
+    if args.chunksize:
+        options['chunksize'] = args.chunksize
+    
     # Exporter les données
     output_path = export_dataframe(args.input_file, args.output, options)
     
@@ -387,10 +962,11 @@ def main():
     
     if preview_enabled and output_path:
         try:
-            df = pd.read_csv(output_path)
+            # Ne parser que les premières lignes pour l'aperçu
+            head_df = pd.read_csv(output_path, nrows=args.num_rows, sep=args.delimiter, encoding=args.encoding)
             print("\nAperçu des données exportées:")
-            print(df.head(args.num_rows))
-            print(f"\nTotal: {len(df)} lignes, {len(df.columns)} colonnes")
+            print(head_df)
+            print(f"\nTotal: {count_csv_rows(output_path, args.delimiter, args.encoding)} lignes, {len(head_df.columns)} colonnes")
         except Exception as e:
             logger.error(f"Impossible d'afficher l'aperçu: {str(e)}")
 
@@ -10,9 +10,14 @@ import os
 from typing import List, Dict, Any, Optional
 
 from src.llm import get_llm_provider, extract_data_from_chunks, aggregate_extraction_results
+from src.llm.data_extractor import default_parallelism
 from src.utils.file_handler import load_file
 from src.processors import html_to_chunks
 
+# Nombre d'appels LLM simultanés imposé par l'environnement ; par défaut, il dépend
+# du provider (un serveur Ollama local ne traite qu'une requête à la fois)
+LLM_MAX_WORKERS = int(os.environ['LLM_MAX_WORKERS']) if os.environ.get('LLM_MAX_WORKERS') else None
+
 def extract_from_file(
     file_path: str,
     query: str,
@@ -24,7 +29,8 @@ def extract_from_file(
     api_key: Optional[str] = None,
     output_file: Optional[str] = None,
     temperature: float = 0.0,
-    verbose: bool = False
+    verbose: bool = False,
+    max_chunk_tokens: Optional[int] = None
 ) -> Dict[str, Any]:
     """
     Extrait des données d'un fichier HTML en utilisant un modèle de langage.
@@ -41,6 +47,7 @@ def extract_from_file(
         output_file (str, optional): Fichier de sortie pour les résultats
         temperature (float): Température pour la génération
         verbose (bool): Afficher des informations détaillées
+        max_chunk_tokens (int, optional): Tronquer les chunks dépassant ce nombre de tokens
         
     Returns:
         Dict[str, Any]: Données extraites
@@ -83,7 +90,8 @@ def extract_from_file(
         chunks=chunks,
         query=query,
         llm_provider=llm_provider,
-        max_workers=min(4, len(chunks))
+        max_workers=min(LLM_MAX_WORKERS or default_parallelism(llm_provider), max(1, len(chunks))),
+        max_chunk_tokens=max_chunk_tokens
     )
     
     # Agréger les résultats
@@ -148,6 +156,12 @@ def main():
         default=None,
         help="Nombre maximum de chunks à traiter"
     )
+    parser.add_argument(
+        "--max-chunk-tokens",
+        type=int,
+        default=None,
+        help="Tronquer les chunks dépassant ce nombre de tokens avant l'envoi au LLM (nécessite tiktoken)"
+    )
     parser.add_argument(
         "--chunk-method",
         choices=["tags", "length", "hybrid"],
@@ -294,7 +308,8 @@ def main():
         api_key=args.api_key,
         output_file=args.output,
         temperature=args.temperature,
-        verbose=args.verbose
+        verbose=args.verbose,
+        max_chunk_tokens=args.max_chunk_tokens
     )
     
     # Ajouter un bloc de gestion des erreurs et retry pour LM Studio
@@ -312,7 +327,8 @@ def main():
                 api_key=args.api_key,
                 output_file=args.output,
                 temperature=args.temperature,
-                verbose=args.verbose
+                verbose=args.verbose,
+                max_chunk_tokens=args.max_chunk_tokens
             )
         except Exception as e:
             print(f"Erreur lors de l'extraction avec LM Studio: {e}")
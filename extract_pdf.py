@@ -6,12 +6,16 @@ Script pour extraire des données structurées de fichiers PDF en utilisant des
 import argparse
 import os
 import sys
+import glob
 import json
 import logging
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from typing import Dict, Any, List, Optional
 
 from src.processors import extract_text_from_pdf, pdf_to_chunks, extract_pdf_metadata
 from src.llm import get_llm_provider, extract_data_from_chunks, aggregate_extraction_results
+from src.llm.data_extractor import default_parallelism
+from src.utils.file_handler import dump_json, dump_jsonl_line
 
 # Configuration du logger
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -32,7 +36,11 @@ def extract_from_pdf(
     extract_metadata: bool = False,
     host: Optional[str] = None,
     timeout: int = 180,
-    max_retries: int = 3
+    max_retries: int = 3,
+    chunk_results_file: Optional[str] = None,
+    parallelism: Optional[int] = None,
+    chunks_per_request: int = 1,
+    max_chunk_tokens: Optional[int] = None
 ) -> Dict[str, Any]:
     """
     Extrait des données structurées à partir d'un fichier PDF.
@@ -52,7 +60,11 @@ def extract_from_pdf(
         extract_metadata: Extraire également les métadonnées du PDF
         host: URL du serveur API (pour lmstudio et ollama)
         timeout: Délai d'attente pour les requêtes LLM en secondes
-        max_retries: Nombre maximum de tentatives en cas d'erreur
+        max_retries: Nombre de nouvelles tentatives par chunk après un échec transitoire
+        chunk_results_file: Fichier JSONL recevant le résultat de chaque chunk dès qu'il est obtenu
+        parallelism: Nombre de requêtes LLM simultanées (défaut: selon le provider)
+        chunks_per_request: Nombre de chunks regroupés dans une même requête LLM
+        max_chunk_tokens: Tronquer les chunks dépassant ce nombre de tokens (nécessite tiktoken)
     
     Returns:
         Dict[str, Any]: Données extraites
@@ -115,7 +127,9 @@ def extract_from_pdf(
         llm_config["timeout"] = timeout
     
     if provider == "lmstudio":
-        llm_config["max_retries"] = max_retries
+        # Les nouvelles tentatives sont gérées par extract_data_from_chunks (échecs
+        # transitoires uniquement) : le provider n'essaie qu'une fois par appel
+        llm_config["max_retries"] = 0
     
     try:
         llm_provider = get_llm_provider(provider, **llm_config)
@@ -127,12 +141,27 @@ def extract_from_pdf(
     logger.info(f"Extraction des données avec {provider} ({model})")
     logger.info(f"Requête: {query}")
     
-    extraction_results = extract_data_from_chunks(
-        chunks=chunks,
-        query=query,
-        llm_provider=llm_provider,
-        max_workers=min(4, len(chunks))
-    )
+    chunk_results = open(chunk_results_file, 'wb') if chunk_results_file else None
+    
+    def write_chunk_result(index: int, result: Dict[str, Any]) -> None:
+        # Une ligne JSON par chunk, écrite dès la fin de son traitement
+        dump_jsonl_line({"chunk": index, "result": result}, chunk_results)
+    
+    try:
+        extraction_results = extract_data_from_chunks(
+            chunks=chunks,
+            query=query,
+            llm_provider=llm_provider,
+            max_workers=min(parallelism or default_parallelism(llm_provider), len(chunks)),
+            max_retries=max_retries,
+            on_result=write_chunk_result if chunk_results else None,
+            chunks_per_request=chunks_per_request,
+            max_chunk_tokens=max_chunk_tokens
+        )
+    finally:
+        if chunk_results:
+            chunk_results.close()
+            logger.info(f"Résultats par chunk sauvegardés dans {chunk_results_file}")
     
     # Agréger les résultats
     logger.info("Agrégation des résultats")
@@ -159,19 +188,84 @@ def extract_from_pdf(
     
     # Sauvegarder les résultats dans un fichier si demandé
     if output_file:
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(extracted_data, f, ensure_ascii=False, indent=2)
+        dump_json(extracted_data, output_file)
         logger.info(f"Résultats sauvegardés dans {output_file}")
     
     return extracted_data
 
+def batch_extract_from_pdf(
+    pdf_paths: List[str],
+    query: str,
+    workers: Optional[int] = None,
+    output_file: Optional[str] = None,
+    **kwargs
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Extrait des données de plusieurs fichiers PDF en parallèle (un processus par fichier).
+    
+    Chaque processus a son propre pool de requêtes LLM : le parallélisme du provider
+    (ou l'argument parallelism) est réparti entre les processus, dont le nombre est
+    par défaut limité à ce parallélisme (un seul processus pour Ollama).
+    
+    Args:
+        pdf_paths: Chemins des fichiers PDF
+        query: Requête d'extraction
+        workers: Nombre de processus (défaut: nombre de cœurs, borné par le parallélisme)
+        output_file: Fichier JSONL recevant une ligne par PDF, au fur et à mesure
+        **kwargs: Arguments transmis à extract_from_pdf (sauf chunk_results_file et output_file)
+    
+    Returns:
+        Dict[str, Dict[str, Any]]: Données extraites pour chaque fichier
+    """
+    if not pdf_paths:
+        return {}
+    
+    # Nombre total de requêtes LLM simultanées, partagé entre les processus
+    budget = kwargs.get('parallelism') or default_parallelism(kwargs.get('provider', 'openai'))
+    workers = min(workers or min(os.cpu_count() or 1, budget), len(pdf_paths))
+    kwargs['parallelism'] = max(1, budget // workers)
+    logger.info(
+        f"Traitement de {len(pdf_paths)} fichiers PDF avec {workers} processus "
+        f"({kwargs['parallelism']} requêtes LLM simultanées par processus)"
+    )
+    
+    results = {}
+    output = open(output_file, 'wb') if output_file else None
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            future_to_path = {
+                executor.submit(extract_from_pdf, pdf_path, query, **kwargs): pdf_path
+                for pdf_path in pdf_paths
+            }
+            
+            for future in as_completed(future_to_path):
+                pdf_path = future_to_path[future]
+                try:
+                    data = future.result()
+                except Exception as e:
+                    logger.error(f"Erreur lors du traitement de {pdf_path}: {e}")
+                    data = {"error": "extraction_failed", "message": str(e)}
+                results[pdf_path] = data
+                
+                # Écrire chaque résultat dès qu'il est disponible
+                if output:
+                    dump_jsonl_line({"pdf_path": pdf_path, "data": data}, output)
+                    output.flush()
+    finally:
+        if output:
+            output.close()
+    
+    if output_file:
+        logger.info(f"Résultats sauvegardés dans {output_file}")
+    return results
+
 def main():
     parser = argparse.ArgumentParser(
         description="Extrait des données structurées à partir d'un fichier PDF en utilisant des modèles de langage"
     )
     parser.add_argument(
         "pdf_path",
-        help="Chemin du fichier PDF à analyser"
+        help="Chemin du fichier PDF à analyser (ou d'un répertoire de PDF)"
     )
     parser.add_argument(
         "query",
@@ -213,7 +307,8 @@ def main():
     )
     parser.add_argument(
         "--output", "-o",
-        help="Fichier de sortie pour les données extraites (JSON)"
+        help="Fichier de sortie pour les données extraites (JSON ; pour un répertoire, "
+             "fichier JSONL avec une ligne par PDF)"
     )
     parser.add_argument(
         "--temperature",
@@ -248,7 +343,37 @@ def main():
         "--max-retries",
         type=int,
         default=3,
-        help="Nombre maximum de tentatives en cas d'erreur"
+        help="Nombre de nouvelles tentatives par chunk après un échec transitoire (délai, limite de débit...)"
+    )
+    advanced_group.add_argument(
+        "--parallelism",
+        type=int,
+        default=None,
+        help="Nombre de requêtes LLM simultanées (défaut: 1 pour ollama, 2 pour lmstudio, 16 pour openai...)"
+    )
+    advanced_group.add_argument(
+        "--chunks-per-request",
+        type=int,
+        default=1,
+        help="Nombre de chunks regroupés dans une même requête LLM (réduit le nombre d'appels)"
+    )
+    advanced_group.add_argument(
+        "--max-chunk-tokens",
+        type=int,
+        default=None,
+        help="Tronquer les chunks dépassant ce nombre de tokens avant l'envoi au LLM (nécessite tiktoken)"
+    )
+    advanced_group.add_argument(
+        "--chunk-results",
+        help="Fichier JSONL où écrire le résultat de chaque chunk au fil de l'extraction "
+             "(un seul PDF, non disponible pour un répertoire)"
+    )
+    advanced_group.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Nombre de processus pour traiter un répertoire de PDF (défaut: nombre de cœurs, "
+             "borné par --parallelism ; les requêtes simultanées sont réparties entre les processus)"
     )
     
     args = parser.parse_args()
@@ -256,23 +381,44 @@ def main():
     # Joindre tous les arguments de la requête en une seule chaîne
     query = " ".join(args.query)
     
-    # Extraire les données
-    extract_from_pdf(
-        pdf_path=args.pdf_path,
-        query=query,
+    options = dict(
         provider=args.provider,
         model=args.model,
         chunk_size=args.chunk_size,
         max_chunks=args.max_chunks,
         chunk_method=args.chunk_method,
         api_key=args.api_key,
-        output_file=args.output,
         temperature=args.temperature,
         verbose=args.verbose,
         extract_metadata=args.metadata,
         host=args.host,
         timeout=args.timeout,
-        max_retries=args.max_retries
+        max_retries=args.max_retries,
+        parallelism=args.parallelism,
+        chunks_per_request=args.chunks_per_request,
+        max_chunk_tokens=args.max_chunk_tokens
+    )
+    
+    # Répertoire : traiter chaque PDF dans un processus séparé (sortie JSONL)
+    if os.path.isdir(args.pdf_path):
+        if args.chunk_results:
+            parser.error("--chunk-results n'est disponible que pour un seul fichier PDF")
+        pdf_paths = sorted(glob.glob(os.path.join(args.pdf_path, "*.pdf")))
+        if not pdf_paths:
+            logger.error(f"Aucun fichier PDF trouvé dans {args.pdf_path}")
+            sys.exit(1)
+        batch_extract_from_pdf(
+            pdf_paths, query, workers=args.workers, output_file=args.output, **options
+        )
+        return
+    
+    # Extraire les données
+    extract_from_pdf(
+        pdf_path=args.pdf_path,
+        query=query,
+        output_file=args.output,
+        chunk_results_file=args.chunk_results,
+        **options
     )
 
 if __name__ == "__main__":
@@ -10,6 +10,14 @@ import json
 import logging
 from typing import Dict, List, Any, Optional
 
+# Import conditionnel d'orjson (lecture JSON rapide)
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+from src.utils.file_handler import dump_json
 from src.processors.data_processor import (
     filter_by_date, 
     analyze_sentiment, 
@@ -35,6 +43,9 @@ def load_json_data(file_path: str) -> Dict[str, Any]:
         Dict: Données chargées
     """
     try:
+        if ORJSON_AVAILABLE:
+            with open(file_path, 'rb') as f:
+                return orjson.loads(f.read())
         with open(file_path, 'r', encoding='utf-8') as f:
             data = json.load(f)
         return data
@@ -51,8 +62,7 @@ def save_json_data(data: Dict[str, Any], file_path: str) -> None:
         file_path (str): Chemin du fichier de destination
     """
     try:
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        dump_json(data, file_path)
         logger.info(f"Données sauvegardées dans '{file_path}'")
     except Exception as e:
         logger.error(f"Erreur lors de l'enregistrement dans '{file_path}': {str(e)}")
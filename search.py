@@ -6,7 +6,30 @@ Outil de recherche sémantique dans les index vectoriels FAISS.
 import argparse
 import os
 import sys
-from src.embeddings import load_faiss_index, search_similar
+from src.utils import index_base_path, dumps_json
+from src.embeddings import load_faiss_index, iter_similar
+
+def print_result(position: int, result: dict):
+    """
+    Affiche un résultat de recherche sur la sortie standard.
+    
+    Args:
+        position (int): Rang du résultat (à partir de 1)
+        result (dict): Résultat renvoyé par iter_similar
+    """
+    print(f"{position}. Score: {result['score']:.4f}")
+    print(f"   Index: {result['index']}")
+    
+    # Afficher les métadonnées si présentes
+    if result['metadata']:
+        print(f"   Métadonnées: {result['metadata']}")
+        
+    # Affichage du chunk (limité pour la lisibilité)
+    chunk_text = result['chunk']
+    if len(chunk_text) > 300:
+        chunk_text = chunk_text[:297] + "..."
+    print(f"   Texte: {chunk_text}")
+    print("-" * 80, flush=True)
 
 def main():
     parser = argparse.ArgumentParser(description="Rechercher dans une base de données vectorielle")
@@ -16,6 +39,10 @@ def main():
                         help="Nombre de résultats à retourner")
     parser.add_argument("--model", default="all-MiniLM-L6-v2",
                         help="Modèle sentence-transformers à utiliser")
+    parser.add_argument("--nprobe", type=int, default=None,
+                        help="Nombre de cellules explorées pour les index IVF/IVFPQ (précision/vitesse)")
+    parser.add_argument("--json", action="store_true",
+                        help="Écrire les résultats en JSON sur la sortie standard (pour les scripts)")
     
     args = parser.parse_args()
     
@@ -23,7 +50,7 @@ def main():
     query = " ".join(args.query)
     
     # Vérifier que les fichiers d'index existent
-    index_path = args.index_path.rstrip(".index").rstrip(".meta")
+    index_path = index_base_path(args.index_path)
     if not os.path.exists(f"{index_path}.index"):
         print(f"Erreur: Le fichier d'index '{index_path}.index' n'existe pas.")
         sys.exit(1)
@@ -33,33 +60,32 @@ def main():
         sys.exit(1)
     
     try:
+        # Les messages de progression ne doivent pas polluer la sortie JSON
+        log = (lambda message: print(message, file=sys.stderr)) if args.json else print
+        
         # Charger l'index FAISS
-        print(f"Chargement de l'index vectoriel depuis '{index_path}'...")
+        log(f"Chargement de l'index vectoriel depuis '{index_path}'...")
         index, index_metadata = load_faiss_index(index_path)
         
         # Effectuer la recherche
-        print(f"Recherche: \"{query}\"")
-        results = search_similar(query, index, index_metadata, 
-                                model_name=args.model, top_k=args.top_k)
+        log(f"Recherche: \"{query}\"")
+        results = iter_similar(query, index, index_metadata,
+                               model_name=args.model, top_k=args.top_k,
+                               nprobe=args.nprobe)
+        
+        if args.json:
+            # Sortie structurée : les résultats sont rassemblés avant sérialisation
+            results = list(results)
+            sys.stdout.buffer.write(dumps_json(results, default=str) + b"\n")
+            return
         
-        # Afficher les résultats
-        print(f"\n{len(results)} résultats trouvés:")
+        # Afficher les résultats au fur et à mesure
         print("-" * 80)
+        count = 0
+        for count, result in enumerate(results, start=1):
+            print_result(count, result)
         
-        for i, result in enumerate(results):
-            print(f"{i+1}. Score: {result['score']:.4f}")
-            print(f"   Index: {result['index']}")
-            
-            # Afficher les métadonnées si présentes
-            if result['metadata']:
-                print(f"   Métadonnées: {result['metadata']}")
-                
-            # Affichage du chunk (limité pour la lisibilité)
-            chunk_text = result['chunk']
-            if len(chunk_text) > 300:
-                chunk_text = chunk_text[:297] + "..."
-            print(f"   Texte: {chunk_text}")
-            print("-" * 80)
+        print(f"{count} résultats trouvés")
             
     except Exception as e:
         print(f"Erreur lors de la recherche: {str(e)}")
@@ -8,9 +8,14 @@ import argparse
 import os
 import sys
 import json
+import logging
+from src.utils import index_base_path
 from src.embeddings import load_faiss_index
 from src.nlp import search_with_query, analyze_query
 
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
 def main():
     parser = argparse.ArgumentParser(
         description="Recherche intelligente avec analyse de requêtes en langage naturel"
@@ -49,6 +54,11 @@ def main():
         "--output", "-o", 
         help="Fichier de sortie pour les résultats (format JSON)"
     )
+    parser.add_argument(
+        "--verbose", "-v",
+        action="store_true",
+        help="Afficher la trace complète en cas d'erreur"
+    )
     
     args = parser.parse_args()
     
@@ -56,7 +66,7 @@ def main():
     query = " ".join(args.query)
     
     # Vérifier que les fichiers d'index existent
-    index_path = args.index_path.rstrip(".index").rstrip(".meta")
+    index_path = index_base_path(args.index_path)
     if not os.path.exists(f"{index_path}.index"):
         print(f"Erreur: Le fichier d'index '{index_path}.index' n'existe pas.")
         sys.exit(1)
@@ -136,9 +146,11 @@ def main():
             print(f"\nRésultats sauvegardés dans {args.output}")
                 
     except Exception as e:
-        print(f"Erreur lors de la recherche: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        # La trace complète n'est formatée qu'à la demande
+        if args.verbose:
+            logger.exception("Erreur lors de la recherche")
+        else:
+            logger.error(f"Erreur lors de la recherche: {e}")
         sys.exit(1)
 
 if __name__ == "__main__":
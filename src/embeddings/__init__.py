@@ -7,7 +7,8 @@ from .vector_db import (
     create_faiss_index, 
     save_faiss_index, 
     load_faiss_index,
-    search_similar
+    search_similar,
+    iter_similar
 )
 
 __all__ = [
@@ -15,5 +16,6 @@ __all__ = [
     'create_faiss_index', 
     'save_faiss_index', 
     'load_faiss_index',
-    'search_similar'
+    'search_similar',
+    'iter_similar'
 ]
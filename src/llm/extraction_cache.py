@@ -0,0 +1,232 @@
+"""
+Cache disque des résultats d'extraction LLM par chunk.
+
+Chaque résultat est stocké dans un fichier JSON dont le nom est une empreinte
+de (provider, modèle, température, version du prompt, requête, chunk), ce qui
+permet d'éviter de rappeler le LLM pour un chunk déjà traité avec la même
+requête. Les entrées expirent après une durée configurable. Les entrées
+récemment lues ou écrites sont aussi gardées en mémoire (LRU) pour éviter
+les accès disque répétés au sein d'un même processus.
+"""
+
+import os
+import hashlib
+import logging
+import time
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+
+from ..utils.file_handler import dumps_json, loads_json
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "ai-scrapping")
+
+# Durée de vie par défaut d'une entrée (7 jours)
+DEFAULT_CACHE_TTL = 7 * 24 * 3600
+
+# Nombre d'entrées gardées en mémoire par défaut
+DEFAULT_MEMORY_SIZE = 4096
+
+class ExtractionCache:
+    """
+    Cache clé/valeur sur disque pour les résultats d'extraction.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Optional[str] = None,
+        enabled: Optional[bool] = None,
+        ttl: Optional[float] = None,
+        memory_size: int = DEFAULT_MEMORY_SIZE
+    ):
+        """
+        Initialise le cache.
+
+        Args:
+            cache_dir (str, optional): Répertoire du cache (défaut: AI_SCRAPPING_CACHE_DIR
+                ou ~/.cache/ai-scrapping)
+            enabled (bool, optional): Activer le cache (défaut: désactivé si AI_SCRAPPING_CACHE=0)
+            ttl (float, optional): Durée de vie des entrées en secondes, 0 pour ne jamais
+                expirer (défaut: AI_SCRAPPING_CACHE_TTL ou 7 jours)
+            memory_size (int): Nombre d'entrées gardées en mémoire (0 pour désactiver)
+        """
+        self.cache_dir = cache_dir or os.environ.get("AI_SCRAPPING_CACHE_DIR", DEFAULT_CACHE_DIR)
+        if enabled is None:
+            enabled = os.environ.get("AI_SCRAPPING_CACHE", "1") != "0"
+        self.enabled = enabled
+        if ttl is None:
+            ttl = float(os.environ.get("AI_SCRAPPING_CACHE_TTL", DEFAULT_CACHE_TTL))
+        self.ttl = ttl
+        self.memory_size = memory_size
+
+        # Entrées sérialisées : chaque lecture renvoie une copie indépendante
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0}
+
+    @staticmethod
+    def make_key(
+        chunk: str,
+        query: str,
+        model: str = "",
+        temperature: Any = None,
+        prompt_version: str = ""
+    ) -> str:
+        """
+        Calcule la clé de cache d'un chunk pour une requête et un modèle donnés.
+
+        Args:
+            chunk (str): Contenu du chunk
+            query (str): Requête d'extraction
+            model (str): Identifiant du modèle (et du provider)
+            temperature: Température de génération
+            prompt_version (str): Version du gabarit de prompt utilisé
+
+        Returns:
+            str: Empreinte hexadécimale BLAKE2b
+        """
+        digest = hashlib.blake2b(digest_size=32)
+        for part in (model, str(temperature), prompt_version, query, chunk):
+            digest.update(part.encode("utf-8", errors="replace"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    @classmethod
+    def key_for_provider(cls, chunk: str, query: str, llm_provider, prompt_version: str = "") -> str:
+        """
+        Calcule la clé de cache en utilisant la configuration d'un provider LLM.
+
+        Args:
+            chunk (str): Contenu du chunk
+            query (str): Requête d'extraction
+            llm_provider: Instance du provider LLM
+            prompt_version (str): Version du gabarit de prompt utilisé
+
+        Returns:
+            str: Clé de cache
+        """
+        model = f"{type(llm_provider).__name__}:{getattr(llm_provider, 'model', '')}"
+        return cls.make_key(
+            chunk, query, model, getattr(llm_provider, "temperature", None), prompt_version
+        )
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Renvoie le résultat en cache pour une clé.
+
+        Args:
+            key (str): Clé de cache
+
+        Returns:
+            Optional[Dict[str, Any]]: Résultat en cache ou None
+        """
+        if not self.enabled:
+            return None
+
+        with self._lock:
+            cached = self._memory.get(key)
+            if cached is not None:
+                created, raw = cached
+                if not self.ttl or time.time() - created <= self.ttl:
+                    self._memory.move_to_end(key)
+                    self._stats["memory_hits"] += 1
+                    return self._decode(raw)
+                del self._memory[key]
+
+        path = self._path(key)
+        try:
+            mtime = os.path.getmtime(path)
+            if self.ttl and time.time() - mtime > self.ttl:
+                # Entrée expirée : la supprimer pour qu'elle soit recalculée
+                os.remove(path)
+                self._count("misses")
+                return None
+            with open(path, "rb") as f:
+                raw = f.read()
+            value = self._decode(raw)
+        except FileNotFoundError:
+            self._count("misses")
+            return None
+        except (OSError, ValueError) as e:
+            logger.debug(f"Entrée de cache illisible ({key}): {e}")
+            self._count("misses")
+            return None
+
+        self._count("disk_hits")
+        self._remember(key, raw, mtime)
+        return value
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        """
+        Enregistre un résultat dans le cache.
+
+        Args:
+            key (str): Clé de cache
+            value (Dict[str, Any]): Résultat à enregistrer
+        """
+        if not self.enabled:
+            return
+        path = self._path(key)
+        try:
+            raw = dumps_json(value)
+        except (TypeError, ValueError) as e:
+            logger.debug(f"Impossible de sérialiser l'entrée de cache ({key}): {e}")
+            return
+        self._remember(key, raw, time.time())
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Écriture atomique pour ne jamais exposer une entrée partielle
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(raw)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.debug(f"Impossible d'écrire l'entrée de cache ({key}): {e}")
+
+    def cache_info(self) -> Dict[str, int]:
+        """
+        Renvoie les statistiques d'utilisation du cache.
+
+        Returns:
+            Dict[str, int]: Succès en mémoire, succès sur disque, échecs et nombre
+                d'entrées en mémoire
+        """
+        with self._lock:
+            return dict(self._stats, memory_size=len(self._memory))
+
+    @staticmethod
+    def _decode(raw: bytes) -> Dict[str, Any]:
+        return loads_json(raw)
+
+    def _count(self, stat: str) -> None:
+        with self._lock:
+            self._stats[stat] += 1
+
+    def _remember(self, key: str, raw: bytes, created: float) -> None:
+        """Garde une entrée sérialisée en mémoire, en retirant la moins récemment utilisée."""
+        if self.memory_size <= 0:
+            return
+        with self._lock:
+            self._memory[key] = (created, raw)
+            self._memory.move_to_end(key)
+            if len(self._memory) > self.memory_size:
+                self._memory.popitem(last=False)
+
+_default_cache = None
+
+def get_extraction_cache() -> ExtractionCache:
+    """
+    Renvoie l'instance de cache partagée par le processus.
+
+    Returns:
+        ExtractionCache: Cache d'extraction par défaut
+    """
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = ExtractionCache()
+    return _default_cache
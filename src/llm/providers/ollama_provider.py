@@ -8,6 +8,8 @@ import logging
 import requests
 from typing import Dict, List, Any, Optional, Union
 
+from . import loads_json
+
 logger = logging.getLogger(__name__)
 
 class OllamaProvider:
@@ -81,7 +83,7 @@ class OllamaProvider:
                         result = result[3:-3].strip()
                     
                     # Parser le JSON
-                    return json.loads(result)
+                    return loads_json(result)
                 except json.JSONDecodeError as e:
                     logger.warning(f"Erreur de décodage JSON: {str(e)}. Retour de la réponse brute.")
                     return {"raw_response": result, "error": "parsing_error"}
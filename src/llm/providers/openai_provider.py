@@ -4,17 +4,80 @@ Provider pour l'API OpenAI.
 
 import os
 import json
+import asyncio
 import logging
+import contextlib
+import threading
+import importlib.util
 from typing import Dict, List, Any, Optional, Union
 
+# Import conditionnel de httpx (pool de connexions partagé par les clients OpenAI)
+try:
+    import httpx
+    HTTPX_AVAILABLE = True
+    # HTTP/2 nécessite le paquet h2
+    HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+except ImportError:
+    HTTPX_AVAILABLE = False
+    HTTP2_AVAILABLE = False
+
+from . import loads_json, JsonStreamScanner
+from ..semantic_cache import get_semantic_cache
+
 logger = logging.getLogger(__name__)
 
+# Correspondance entre les exceptions de la bibliothèque OpenAI (0.x et 1.x) et les codes d'erreur
+OPENAI_ERROR_CODES = {
+    "InvalidRequestError": "invalid_request",
+    "BadRequestError": "invalid_request",
+    "AuthenticationError": "authentication_error",
+    "RateLimitError": "rate_limit",
+    "ServiceUnavailableError": "service_unavailable",
+    "InternalServerError": "service_unavailable",
+    "Timeout": "timeout",
+    "APITimeoutError": "timeout",
+    "APIConnectionError": "connection_error",
+}
+
+# Modèles acceptant response_format={"type": "json_object"} (mode JSON garanti par l'API)
+JSON_MODE_MODEL_PREFIXES = (
+    "gpt-4o", "gpt-4.1", "gpt-4-turbo", "gpt-4-1106", "gpt-4-0125",
+    "gpt-3.5-turbo-1106", "gpt-3.5-turbo-0125", "o1", "o3", "o4",
+)
+
+_http_client = None
+_http_client_lock = threading.Lock()
+
+def get_http_client():
+    """
+    Renvoie le client HTTP partagé par les clients OpenAI synchrones du processus.
+
+    Les connexions (HTTP/2 si h2 est installé) sont gardées ouvertes et réutilisées
+    entre les requêtes et entre les threads, ce qui évite une poignée de main
+    TCP/TLS par appel.
+
+    Returns:
+        httpx.Client partagé, ou None si httpx n'est pas installé
+    """
+    global _http_client
+    if not HTTPX_AVAILABLE:
+        return None
+    with _http_client_lock:
+        if _http_client is None:
+            _http_client = httpx.Client(
+                http2=HTTP2_AVAILABLE,
+                timeout=httpx.Timeout(600.0, connect=5.0),
+                limits=httpx.Limits(max_connections=64, max_keepalive_connections=32)
+            )
+        return _http_client
+
 class OpenAIProvider:
     """
     Provider pour l'API OpenAI.
     """
 
-    def __init__(self, api_key=None, model="gpt-3.5-turbo", temperature=0.0, **kwargs):
+    def __init__(self, api_key=None, model="gpt-3.5-turbo", temperature=0.0, semantic_cache=None,
+                 stream=True, **kwargs):
         """
         Initialise le provider OpenAI.
 
@@ -22,6 +85,10 @@ class OpenAIProvider:
             api_key (str, optional): Clé API OpenAI
             model (str): Modèle à utiliser (gpt-3.5-turbo, gpt-4, etc.)
             temperature (float): Température pour la génération (0.0-2.0)
+            semantic_cache (bool, optional): Réutiliser les réponses obtenues pour des contenus
+                paraphrasés (défaut: activé si AI_SCRAPPING_SEMANTIC_CACHE=1)
+            stream (bool): Recevoir les réponses JSON en flux et couper la génération dès que
+                l'objet JSON est complet
             **kwargs: Arguments supplémentaires pour l'API
         """
         self.api_key = api_key or os.environ.get("OPENAI_API_KEY")
@@ -31,16 +98,34 @@ class OpenAIProvider:
         self.model = model
         self.temperature = temperature
         self.extra_params = kwargs
+        self.stream = stream
+        if semantic_cache is None:
+            semantic_cache = os.environ.get("AI_SCRAPPING_SEMANTIC_CACHE", "0") == "1"
+        self.semantic_cache = get_semantic_cache() if semantic_cache else None
+        # Clients asynchrones (openai>=1.0) des sessions en cours, par boucle d'événements :
+        # boucle -> [client, nombre de sessions qui l'utilisent]
+        self._async_clients: Dict[Any, list] = {}
+        self._async_clients_lock = threading.Lock()
 
         # Tenter d'importer la bibliothèque OpenAI
         try:
             import openai
             self.openai = openai
-            self.openai.api_key = self.api_key
         except ImportError:
             logger.error("La bibliothèque OpenAI n'est pas installée. Exécutez 'pip install openai'.")
             raise
 
+        # Client propre à l'instance (openai>=1.0) : la clé API n'est jamais écrite dans
+        # l'état global du module, que plusieurs providers peuvent partager entre threads
+        self.client = None
+        client_class = getattr(self.openai, "OpenAI", None)
+        if client_class is not None and self.api_key:
+            http_client = get_http_client()
+            if http_client is not None:
+                self.client = client_class(api_key=self.api_key, http_client=http_client)
+            else:
+                self.client = client_class(api_key=self.api_key)
+
     def extract(self, content: str, instruction: str, output_format: str = "json") -> Dict[str, Any]:
         """
         Extrait des informations du contenu selon l'instruction.
@@ -58,7 +143,252 @@ class OpenAIProvider:
             logger.error(error_msg)
             raise ValueError(error_msg)
 
-        # Construire le système de messages
+        if self.semantic_cache is not None:
+            cached = self.semantic_cache.get(instruction, content, self.model)
+            if cached is not None:
+                return cached
+
+        messages = self._build_messages(content, instruction, output_format)
+
+        try:
+            # Faire la requête API
+            logger.debug(f"Envoi de la requête à l'API OpenAI (modèle: {self.model}, température: {self.temperature})")
+            stream = self._use_stream(output_format)
+            if self.client is not None:
+                response = self.client.chat.completions.create(
+                    model=self.model,
+                    messages=messages,
+                    temperature=self.temperature,
+                    stream=stream,
+                    **self._request_params(output_format)
+                )
+            else:
+                # Bibliothèque OpenAI 0.x : la clé est passée à chaque requête
+                response = self.openai.ChatCompletion.create(
+                    model=self.model,
+                    messages=messages,
+                    temperature=self.temperature,
+                    stream=stream,
+                    api_key=self.api_key,
+                    **self._request_params(output_format)
+                )
+            text = self._read_stream(response) if stream else response.choices[0].message.content
+
+            return self._cache_response(instruction, content, self._parse_response(text, output_format))
+
+        except Exception as e:
+            error_code = OPENAI_ERROR_CODES.get(type(e).__name__)
+            if error_code is None:
+                error_msg = f"Erreur lors de l'appel à l'API OpenAI: {str(e)}"
+                logger.error(error_msg)
+                import traceback
+                logger.error(f"Détails de l'erreur: {traceback.format_exc()}")
+                return {"error": "api_error", "message": str(e), "content_preview": content[:100] + "..."}
+
+            logger.error(f"Erreur de l'API OpenAI ({error_code}): {str(e)}")
+            if error_code == "invalid_request":
+                return {"error": error_code, "message": str(e), "content_length": len(content)}
+            return {"error": error_code, "message": str(e)}
+
+    async def extract_async(self, content: str, instruction: str, output_format: str = "json") -> Dict[str, Any]:
+        """
+        Version asynchrone de extract, pour lancer de nombreuses requêtes sur une seule boucle d'événements.
+
+        Args:
+            content (str): Contenu HTML/texte à analyser
+            instruction (str): Instruction d'extraction
+            output_format (str): Format de sortie souhaité (json, markdown, text)
+
+        Returns:
+            Dict[str, Any]: Résultat de l'extraction
+        """
+        if not self.api_key:
+            error_msg = "Clé API OpenAI manquante. Définissez OPENAI_API_KEY ou passez api_key."
+            logger.error(error_msg)
+            raise ValueError(error_msg)
+
+        loop = asyncio.get_running_loop()
+        if self.semantic_cache is not None:
+            # Le calcul de l'embedding est bloquant : l'exécuter hors de la boucle
+            cached = await loop.run_in_executor(
+                None, self.semantic_cache.get, instruction, content, self.model
+            )
+            if cached is not None:
+                return cached
+
+        messages = self._build_messages(content, instruction, output_format)
+
+        try:
+            logger.debug(f"Envoi asynchrone de la requête à l'API OpenAI (modèle: {self.model})")
+            stream = self._use_stream(output_format)
+            async with self.async_session() as client:
+                if client is not None:
+                    response = await client.chat.completions.create(
+                        model=self.model,
+                        messages=messages,
+                        temperature=self.temperature,
+                        stream=stream,
+                        **self._request_params(output_format)
+                    )
+                    text = await self._aread_stream(response) if stream else response.choices[0].message.content
+            if client is None:
+                # Bibliothèque OpenAI 0.x : pas de client asynchrone, mais acreate
+                response = await self.openai.ChatCompletion.acreate(
+                    model=self.model,
+                    messages=messages,
+                    temperature=self.temperature,
+                    stream=stream,
+                    api_key=self.api_key,
+                    **self._request_params(output_format)
+                )
+                text = await self._aread_stream(response) if stream else response.choices[0].message.content
+
+            result = self._parse_response(text, output_format)
+            return await loop.run_in_executor(None, self._cache_response, instruction, content, result)
+
+        except Exception as e:
+            error_code = OPENAI_ERROR_CODES.get(type(e).__name__, "api_error")
+            logger.error(f"Erreur lors de l'appel asynchrone à l'API OpenAI ({error_code}): {str(e)}")
+            return {"error": error_code, "message": str(e), "content_length": len(content)}
+
+    def _cache_response(self, instruction: str, content: str, result: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Enregistre une réponse valide dans le cache sémantique.
+
+        Args:
+            instruction (str): Instruction d'extraction
+            content (str): Contenu analysé
+            result (Dict[str, Any]): Réponse parsée
+
+        Returns:
+            Dict[str, Any]: La réponse, inchangée
+        """
+        if self.semantic_cache is not None and "error" not in result:
+            self.semantic_cache.put(instruction, content, result, self.model)
+        return result
+
+    def _supports_json_mode(self) -> bool:
+        """Indique si le modèle accepte le mode JSON de l'API."""
+        return self.model == "gpt-3.5-turbo" or self.model.startswith(JSON_MODE_MODEL_PREFIXES)
+
+    def _request_params(self, output_format: str) -> Dict[str, Any]:
+        """
+        Construit les paramètres supplémentaires de la requête.
+
+        Pour les réponses JSON, active le mode JSON de l'API lorsque le modèle le
+        permet : la réponse est alors toujours un objet JSON valide.
+
+        Args:
+            output_format (str): Format de sortie souhaité (json, markdown, text)
+
+        Returns:
+            Dict[str, Any]: Paramètres à passer à l'API
+        """
+        if (output_format.lower() != "json" or "response_format" in self.extra_params
+                or not self._supports_json_mode()):
+            return self.extra_params
+        return dict(self.extra_params, response_format={"type": "json_object"})
+
+    def _use_stream(self, output_format: str) -> bool:
+        """Le flux n'est utile que pour les réponses JSON, dont on sait détecter la fin."""
+        return self.stream and output_format.lower() == "json" and "stream" not in self.extra_params
+
+    @staticmethod
+    def _delta_text(chunk) -> str:
+        """Renvoie le texte apporté par un fragment de réponse en flux."""
+        if not chunk.choices:
+            return ""
+        return getattr(chunk.choices[0].delta, "content", None) or ""
+
+    def _read_stream(self, stream) -> str:
+        """
+        Lit une réponse en flux jusqu'à la fin de l'objet JSON.
+
+        Args:
+            stream: Itérateur des fragments de réponse
+
+        Returns:
+            str: Texte reçu, arrêté à la fin de l'objet JSON s'il est complet
+        """
+        scanner = JsonStreamScanner()
+        try:
+            for chunk in stream:
+                if scanner.feed(self._delta_text(chunk)):
+                    # Inutile d'attendre la suite de la génération
+                    break
+        finally:
+            close = getattr(stream, "close", None)
+            if close is not None:
+                close()
+        return scanner.text
+
+    async def _aread_stream(self, stream) -> str:
+        """
+        Version asynchrone de _read_stream.
+
+        Args:
+            stream: Itérateur asynchrone des fragments de réponse
+
+        Returns:
+            str: Texte reçu, arrêté à la fin de l'objet JSON s'il est complet
+        """
+        scanner = JsonStreamScanner()
+        try:
+            async for chunk in stream:
+                if scanner.feed(self._delta_text(chunk)):
+                    break
+        finally:
+            # AsyncStream (openai>=1.0) expose close(), les générateurs 0.x aclose()
+            close = getattr(stream, "close", None) or getattr(stream, "aclose", None)
+            if close is not None:
+                await close()
+        return scanner.text
+
+    @contextlib.asynccontextmanager
+    async def async_session(self):
+        """
+        Partage un client AsyncOpenAI entre les requêtes lancées sur la boucle
+        d'événements courante, puis le ferme à la fin de la dernière session.
+
+        extract_async ouvre sa propre session : sans session englobante (comme celle
+        de extract_data_from_chunks), chaque appel utilise donc un client fermé aussitôt.
+
+        Yields:
+            Client AsyncOpenAI, ou None si la bibliothèque installée est antérieure à la version 1.0
+        """
+        # Le client HTTP sous-jacent est lié à la boucle qui l'a créé
+        loop = asyncio.get_running_loop()
+        with self._async_clients_lock:
+            entry = self._async_clients.get(loop)
+            if entry is None:
+                async_client_class = getattr(self.openai, "AsyncOpenAI", None)
+                client = async_client_class(api_key=self.api_key) if async_client_class else None
+                entry = self._async_clients[loop] = [client, 0]
+            entry[1] += 1
+
+        try:
+            yield entry[0]
+        finally:
+            with self._async_clients_lock:
+                entry[1] -= 1
+                last_session = entry[1] == 0
+                if last_session:
+                    del self._async_clients[loop]
+            if last_session and entry[0] is not None:
+                await entry[0].close()
+
+    def _build_messages(self, content: str, instruction: str, output_format: str) -> List[Dict[str, str]]:
+        """
+        Construit les messages système et utilisateur de la requête d'extraction.
+
+        Args:
+            content (str): Contenu HTML/texte à analyser
+            instruction (str): Instruction d'extraction
+            output_format (str): Format de sortie souhaité (json, markdown, text)
+
+        Returns:
+            List[Dict[str, str]]: Messages à envoyer à l'API
+        """
         if output_format.lower() == "json":
             system_prompt = (
                 "Tu es un assistant spécialisé dans l'extraction de données à partir de contenu HTML. "
@@ -82,80 +412,58 @@ class OpenAIProvider:
 
         user_prompt = f"### Instruction:\n{instruction}\n\n### Contenu HTML à analyser:\n{content}"
 
-        try:
-            # Faire la requête API
-            logger.debug(f"Envoi de la requête à l'API OpenAI (modèle: {self.model}, température: {self.temperature})")
-            response = self.openai.ChatCompletion.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                temperature=self.temperature,
-                **self.extra_params
-            )
+        return [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt}
+        ]
 
-            # Extraire la réponse
-            result = response.choices[0].message.content.strip()
-            logger.debug(f"Réponse reçue de l'API OpenAI ({len(result)} caractères)")
-
-            # Si format JSON demandé, parser la réponse
-            if output_format.lower() == "json":
-                try:
-                    # Essayer d'extraire un bloc JSON s'il est entouré de ```
-                    if result.startswith("```json") and result.endswith("```"):
-                        result = result[7:-3].strip()
-                        logger.debug("Bloc de code JSON détecté et extrait")
-                    elif result.startswith("```") and result.endswith("```"):
-                        result = result[3:-3].strip()
-                        logger.debug("Bloc de code générique détecté et extrait")
-
-                    # Trouver le premier { et le dernier } au cas où il y aurait du texte avant/après
-                    first_brace = result.find("{")
-                    last_brace = result.rfind("}")
-                    if first_brace != -1 and last_brace != -1 and last_brace > first_brace:
-                        result = result[first_brace:last_brace+1].strip()
-                        logger.debug("JSON extrait des accolades")
-
-                    # Parser le JSON
-                    parsed_result = json.loads(result)
-                    logger.debug("JSON parsé avec succès")
-                    return parsed_result
-                except json.JSONDecodeError as e:
-                    error_msg = f"Erreur de décodage JSON: {str(e)}. Réponse brute: {result[:200]}..."
-                    logger.warning(error_msg)
-                    return {"raw_response": result, "error": "parsing_error", "message": str(e)}
+    def _parse_response(self, text: str, output_format: str) -> Dict[str, Any]:
+        """
+        Convertit le texte de la réponse de l'API au format demandé.
 
-            return {"raw_response": result}
+        Args:
+            text (str): Texte de la réponse de l'API OpenAI
+            output_format (str): Format de sortie souhaité (json, markdown, text)
 
-        except self.openai.error.InvalidRequestError as e:
-            error_msg = f"Requête invalide à l'API OpenAI: {str(e)}"
-            logger.error(error_msg)
-            return {"error": "invalid_request", "message": str(e), "content_length": len(content)}
+        Returns:
+            Dict[str, Any]: Données extraites
+        """
+        result = (text or "").strip()
+        logger.debug(f"Réponse reçue de l'API OpenAI ({len(result)} caractères)")
 
-        except self.openai.error.AuthenticationError as e:
-            error_msg = f"Erreur d'authentification OpenAI: {str(e)}"
-            logger.error(error_msg)
-            return {"error": "authentication_error", "message": str(e)}
+        # Si format JSON demandé, parser la réponse
+        if output_format.lower() == "json":
+            # Cas nominal (mode JSON de l'API) : la réponse est directement un objet JSON
+            try:
+                parsed_result = loads_json(result)
+                if isinstance(parsed_result, dict):
+                    return parsed_result
+            except json.JSONDecodeError:
+                pass
 
-        except self.openai.error.RateLimitError as e:
-            error_msg = f"Limite de débit OpenAI atteinte: {str(e)}"
-            logger.error(error_msg)
-            return {"error": "rate_limit", "message": str(e)}
+            try:
+                # Essayer d'extraire un bloc JSON s'il est entouré de ```
+                if result.startswith("```json") and result.endswith("```"):
+                    result = result[7:-3].strip()
+                    logger.debug("Bloc de code JSON détecté et extrait")
+                elif result.startswith("```") and result.endswith("```"):
+                    result = result[3:-3].strip()
+                    logger.debug("Bloc de code générique détecté et extrait")
 
-        except self.openai.error.ServiceUnavailableError as e:
-            error_msg = f"Service OpenAI indisponible: {str(e)}"
-            logger.error(error_msg)
-            return {"error": "service_unavailable", "message": str(e)}
+                # Trouver le premier { et le dernier } au cas où il y aurait du texte avant/après
+                first_brace = result.find("{")
+                last_brace = result.rfind("}")
+                if first_brace != -1 and last_brace != -1 and last_brace > first_brace:
+                    result = result[first_brace:last_brace+1].strip()
+                    logger.debug("JSON extrait des accolades")
 
-        except self.openai.error.Timeout as e:
-            error_msg = f"Délai d'attente dépassé pour l'API OpenAI: {str(e)}"
-            logger.error(error_msg)
-            return {"error": "timeout", "message": str(e)}
+                # Parser le JSON
+                parsed_result = loads_json(result)
+                logger.debug("JSON parsé avec succès")
+                return parsed_result
+            except json.JSONDecodeError as e:
+                error_msg = f"Erreur de décodage JSON: {str(e)}. Réponse brute: {result[:200]}..."
+                logger.warning(error_msg)
+                return {"raw_response": result, "error": "parsing_error", "message": str(e)}
 
-        except Exception as e:
-            error_msg = f"Erreur lors de l'appel à l'API OpenAI: {str(e)}"
-            logger.error(error_msg)
-            import traceback
-            logger.error(f"Détails de l'erreur: {traceback.format_exc()}")
-            return {"error": "api_error", "message": str(e), "content_preview": content[:100] + "..."}
+        return {"raw_response": result}
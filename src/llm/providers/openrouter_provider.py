@@ -8,6 +8,8 @@ import logging
 import requests
 from typing import Dict, List, Any, Optional, Union
 
+from . import parse_json_response
+
 logger = logging.getLogger(__name__)
 
 class OpenRouterProvider:
@@ -121,23 +123,15 @@ class OpenRouterProvider:
             # Si format JSON demandé, parser la réponse
             if output_format.lower() == "json":
                 try:
-                    # Essayer d'extraire un bloc JSON s'il est entouré de ```
-                    if result.startswith("```json") and result.endswith("```"):
-                        result = result[7:-3].strip()
-                    elif result.startswith("```") and result.endswith("```"):
-                        result = result[3:-3].strip()
-                    
-                    # Trouver le premier { et le dernier } au cas où il y aurait du texte avant/après
-                    first_brace = result.find("{")
-                    last_brace = result.rfind("}")
-                    if first_brace != -1 and last_brace != -1 and last_brace > first_brace:
-                        result = result[first_brace:last_brace+1].strip()
-                    
-                    # Parser le JSON
-                    return json.loads(result)
+                    # Parser le JSON, en ignorant un éventuel bloc de code ou texte autour
+                    parsed = parse_json_response(result)
                 except json.JSONDecodeError as e:
                     logger.warning(f"Erreur de décodage JSON: {str(e)}. Retour de la réponse brute.")
                     return {"raw_response": result, "error": "parsing_error"}
+                if isinstance(parsed, dict):
+                    return parsed
+                logger.warning("La réponse JSON n'est pas un objet. Retour de la réponse brute.")
+                return {"raw_response": result, "error": "parsing_error"}
             
             return {"raw_response": result}
             
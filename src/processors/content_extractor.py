@@ -2,13 +2,26 @@
 Module pour extraire le contenu principal et les informations importantes des pages HTML.
 """
 
+import os
 import logging
-from bs4 import BeautifulSoup
+import importlib.util
+from bs4 import BeautifulSoup, Tag
 import re
-from typing import Optional, Dict, List, Tuple
+from html import unescape
+from typing import Optional, Dict, List, Tuple, Union
 
 logger = logging.getLogger(__name__)
 
+# Parseur utilisé par BeautifulSoup : lxml (bibliothèque C) s'il est installé,
+# sinon html.parser ; modifiable via AI_SCRAPPING_HTML_PARSER
+HTML_PARSER = os.environ.get(
+    "AI_SCRAPPING_HTML_PARSER",
+    "lxml" if importlib.util.find_spec("lxml") else "html.parser"
+)
+
+# Balise <title> : son contenu est du texte brut, une expression régulière suffit
+TITLE_RE = re.compile(r"<title\b[^>]*>(.*?)</title\s*>", re.IGNORECASE | re.DOTALL)
+
 def get_page_title(html_content: str) -> Optional[str]:
     """
     Extrait le titre de la page HTML.
@@ -19,39 +32,73 @@ def get_page_title(html_content: str) -> Optional[str]:
     Returns:
         str or None: Titre de la page ou None si non trouvé
     """
+    if not html_content:
+        return None
+    
     try:
-        soup = BeautifulSoup(html_content, 'html.parser')
-        title_tag = soup.find('title')
-        
-        if title_tag:
-            return title_tag.text.strip()
+        # Chemin rapide : balise title trouvée sans construire l'arbre
+        match = TITLE_RE.search(html_content)
+        if match:
+            return unescape(match.group(1)).strip()
         
-        # Si pas de tag title, essayer les h1
-        h1_tag = soup.find('h1')
-        if h1_tag:
-            return h1_tag.text.strip()
-            
-        return None
+        # Si pas de tag title, essayer les h1 (qui peuvent contenir d'autres balises)
+        return _title_from_soup(BeautifulSoup(html_content, HTML_PARSER))
     except Exception as e:
         logger.error(f"Erreur lors de l'extraction du titre: {e}")
         return None
 
-def extract_main_content(html_content: str) -> Optional[str]:
+def _title_from_soup(soup: BeautifulSoup) -> Optional[str]:
+    """Renvoie le texte du premier h1 d'une page déjà analysée, ou None."""
+    h1_tag = soup.find('h1')
+    if h1_tag:
+        return h1_tag.text.strip()
+    return None
+
+def extract_title_and_content(html_content: str) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Extrait le titre et le contenu principal d'une page HTML en ne l'analysant
+    qu'une seule fois (au lieu d'appeler get_page_title puis extract_main_content).
+    
+    Args:
+        html_content: Contenu HTML brut
+        
+    Returns:
+        Tuple[str or None, str or None]: Titre de la page et contenu principal
+    """
+    if not html_content:
+        return None, None
+    
+    try:
+        soup = BeautifulSoup(html_content, HTML_PARSER)
+        match = TITLE_RE.search(html_content)
+        # Le titre est lu avant l'extraction, qui retire les en-têtes de l'arbre
+        title = unescape(match.group(1)).strip() if match else _title_from_soup(soup)
+    except Exception as e:
+        logger.error(f"Erreur lors de l'extraction du titre: {e}")
+        return None, extract_main_content(html_content)
+    
+    return title, extract_main_content(soup)
+
+def extract_main_content(html_content: Union[str, BeautifulSoup]) -> Optional[str]:
     """
     Extrait le contenu principal d'une page HTML en éliminant la navigation,
     les publicités, le footer, etc.
     
     Args:
-        html_content: Contenu HTML brut
+        html_content: Contenu HTML brut, ou page déjà analysée (BeautifulSoup) pour
+            éviter une nouvelle analyse ; celle-ci est alors modifiée sur place
         
     Returns:
         str or None: Contenu principal extrait ou None en cas d'échec
     """
-    if not html_content:
+    if html_content is None or (isinstance(html_content, str) and not html_content):
         return None
         
     try:
-        soup = BeautifulSoup(html_content, 'html.parser')
+        if isinstance(html_content, BeautifulSoup):
+            soup = html_content
+        else:
+            soup = BeautifulSoup(html_content, HTML_PARSER)
         
         # Supprimer les éléments non pertinents
         for element in soup.find_all(['nav', 'header', 'footer', 'aside', 'script', 'style', 'iframe']):
@@ -101,6 +148,23 @@ def extract_main_content(html_content: str) -> Optional[str]:
         logger.error(f"Erreur lors de l'extraction du contenu principal: {e}")
         return None
 
+def _count_descendant_tags(element: Tag) -> Tuple[int, int, int]:
+    """
+    Compte en un seul parcours les balises, paragraphes et liens descendants d'un élément.
+    
+    Returns:
+        Tuple[int, int, int]: Nombre de balises, de <p> et de <a>
+    """
+    tags_count = p_count = links_count = 0
+    for descendant in element.descendants:
+        if isinstance(descendant, Tag):
+            tags_count += 1
+            if descendant.name == 'p':
+                p_count += 1
+            elif descendant.name == 'a':
+                links_count += 1
+    return tags_count, p_count, links_count
+
 def find_main_content_div(soup: BeautifulSoup) -> Optional[BeautifulSoup]:
     """
     Trouve la div contenant probablement le contenu principal en se basant sur la densité de texte.
@@ -122,7 +186,7 @@ def find_main_content_div(soup: BeautifulSoup) -> Optional[BeautifulSoup]:
     
     for div in all_divs:
         text_length = len(div.get_text(strip=True))
-        tags_count = len(div.find_all())
+        tags_count, p_count, links_count = _count_descendant_tags(div)
         
         # Éviter la division par zéro
         if tags_count == 0:
@@ -132,12 +196,10 @@ def find_main_content_div(soup: BeautifulSoup) -> Optional[BeautifulSoup]:
         content_score = text_length / tags_count
         
         # Bonus pour les divs contenant des paragraphes
-        p_count = len(div.find_all('p'))
         if p_count > 3:
             content_score *= 1.5
         
         # Malus pour les divs avec beaucoup de liens
-        links_count = len(div.find_all('a'))
         if links_count > 5 and text_length > 0:
             content_score *= (text_length / (text_length + links_count * 50))
         
@@ -2,13 +2,20 @@
 Module pour le traitement avancé des données extraites (filtrage, tri, classification).
 """
 
+import os
 import re
+import ast
 import json
+import operator
 import logging
 import datetime
-from typing import List, Dict, Any, Union, Optional, Callable
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Union, Optional, Callable, Tuple, FrozenSet
 import pandas as pd
 
+from ..llm.model_registry import get_model
+
 # Configuration du logger
 logging.basicConfig(level=logging.INFO, 
                     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -22,6 +29,51 @@ except ImportError:
     logger.warning("Hugging Face Transformers n'est pas disponible. Les fonctions d'analyse avancées seront limitées.")
     TRANSFORMERS_AVAILABLE = False
 
+# Import conditionnel de ciso8601 (analyse rapide des dates ISO 8601)
+try:
+    import ciso8601
+    CISO8601_AVAILABLE = True
+except ImportError:
+    CISO8601_AVAILABLE = False
+
+# Taille des lots envoyés aux pipelines Hugging Face
+SENTIMENT_BATCH_SIZE = 32
+CATEGORIZE_BATCH_SIZE = 16
+
+# Nombre de lignes à partir duquel les filtres sont évalués avec numexpr
+QUERY_NUMEXPR_MIN_ROWS = 1000
+
+# Nœuds autorisés dans les filtres évalués sans pandas : comparaisons entre
+# colonnes et littéraux, combinées par and/or/not
+FILTER_AST_NODES = (
+    ast.Expression, ast.BoolOp, ast.And, ast.Or, ast.UnaryOp, ast.Not, ast.USub,
+    ast.Compare, ast.Eq, ast.NotEq, ast.Lt, ast.LtE, ast.Gt, ast.GtE,
+    ast.Name, ast.Load, ast.Constant
+)
+FILTER_CACHE_SIZE = 128
+
+# Formats de date courants (français et internationaux), essayés dans l'ordre
+DATE_FORMATS = (
+    '%d/%m/%Y', '%d-%m-%Y', '%d.%m.%Y',  # JJ/MM/AAAA
+    '%Y/%m/%d', '%Y-%m-%d', '%Y.%m.%d',  # AAAA/MM/JJ
+    '%d/%m/%Y %H:%M', '%d-%m-%Y %H:%M',  # JJ/MM/AAAA HH:MM
+    '%Y/%m/%d %H:%M', '%Y-%m-%d %H:%M',  # AAAA/MM/JJ HH:MM
+    '%d/%m/%Y %H:%M:%S', '%Y-%m-%d %H:%M:%S',  # Avec secondes
+    '%d %B %Y', '%d %b %Y',  # JJ Mois AAAA
+    '%B %d, %Y', '%b %d, %Y'  # Mois JJ, AAAA
+)
+
+# Date au format ISO 8601 (AAAA-MM-JJ, éventuellement suivie de l'heure)
+ISO_DATE_RE = re.compile(r'\d{4}-\d{2}-\d{2}(?:[T ]\d{2}:\d{2}(?::\d{2}(?:\.\d+)?)?)?$')
+
+# Forme d'une date (chiffres et mots remplacés) -> dernier format reconnu pour cette forme
+DATE_SHAPE_RE = re.compile(r'\d|[^\W\d_]+')
+_date_format_by_shape: Dict[str, str] = {}
+DATE_SHAPE_CACHE_SIZE = 256
+
+# Types de colonnes conservés à l'identique par un aller-retour dans pandas
+SIMPLE_COLUMN_TYPES = (str, int, float, bool)
+
 def convert_to_dataframe(data: Dict[str, List[Any]]) -> pd.DataFrame:
     """
     Convertit des données structurées en DataFrame pandas.
@@ -68,23 +120,34 @@ def parse_date(date_str: str) -> Optional[datetime.datetime]:
     # Nettoyage de la chaîne
     date_str = date_str.strip()
     
-    # Formats de date courants (français et internationaux)
-    formats = [
-        '%d/%m/%Y', '%d-%m-%Y', '%d.%m.%Y',  # JJ/MM/AAAA
-        '%Y/%m/%d', '%Y-%m-%d', '%Y.%m.%d',  # AAAA/MM/JJ
-        '%d/%m/%Y %H:%M', '%d-%m-%Y %H:%M',  # JJ/MM/AAAA HH:MM
-        '%Y/%m/%d %H:%M', '%Y-%m-%d %H:%M',  # AAAA/MM/JJ HH:MM
-        '%d/%m/%Y %H:%M:%S', '%Y-%m-%d %H:%M:%S',  # Avec secondes
-        '%d %B %Y', '%d %b %Y',  # JJ Mois AAAA
-        '%B %d, %Y', '%b %d, %Y'  # Mois JJ, AAAA
-    ]
+    # Dates ISO 8601 (cas le plus fréquent) : conversion directe sans essayer chaque format
+    if ISO_DATE_RE.match(date_str):
+        try:
+            if CISO8601_AVAILABLE:
+                return ciso8601.parse_datetime(date_str)
+            return datetime.datetime.fromisoformat(date_str)
+        except ValueError:
+            pass
+    
+    # Essayer d'abord le format déjà reconnu pour une date de même forme, puis chaque format
+    shape = DATE_SHAPE_RE.sub(lambda m: '9' if m.group().isdigit() else 'a', date_str)
+    known_format = _date_format_by_shape.get(shape)
+    if known_format:
+        try:
+            return datetime.datetime.strptime(date_str, known_format)
+        except ValueError:
+            pass
     
-    # Essayer chaque format
-    for fmt in formats:
+    for fmt in DATE_FORMATS:
+        if fmt == known_format:
+            continue
         try:
-            return datetime.datetime.strptime(date_str, fmt)
+            parsed = datetime.datetime.strptime(date_str, fmt)
         except ValueError:
             continue
+        if len(_date_format_by_shape) < DATE_SHAPE_CACHE_SIZE:
+            _date_format_by_shape[shape] = fmt
+        return parsed
     
     # Essayer avec dateutil.parser si disponible
     try:
@@ -161,8 +224,17 @@ def filter_by_date(
     
     date_column = date_columns[0]
     
-    # Convertir la colonne de date en datetime
-    df['parsed_date'] = df[date_column].apply(parse_date)
+    # Convertir la colonne de date en datetime, en ne parsant qu'une fois chaque valeur distincte
+    parsed_dates = {}
+    
+    def parse_cached(value):
+        if not isinstance(value, str):
+            return None
+        if value not in parsed_dates:
+            parsed_dates[value] = parse_date(value)
+        return parsed_dates[value]
+    
+    df['parsed_date'] = df[date_column].map(parse_cached)
     
     # Filtrer les entrées sans date valide
     df_valid = df.dropna(subset=['parsed_date'])
@@ -196,6 +268,11 @@ def filter_by_date(
     
     return filtered_data
 
+def _set_default_sentiment(result_data: Dict[str, List[Any]], count: int, label: str) -> None:
+    """Renseigne un score nul et le même label pour tous les textes (analyse impossible)."""
+    result_data['sentiment_score'] = [0] * count
+    result_data['sentiment'] = [label] * count
+
 def analyze_sentiment(
     data: Dict[str, List[Any]], 
     text_field: str = 'titre',
@@ -236,26 +313,21 @@ def analyze_sentiment(
     if provider.lower() == 'huggingface':
         if not TRANSFORMERS_AVAILABLE:
             logger.warning("Hugging Face Transformers n'est pas disponible. Impossible d'analyser le sentiment.")
-            result_data['sentiment_score'] = [0] * len(texts)
-            result_data['sentiment'] = ['neutre'] * len(texts)
+            _set_default_sentiment(result_data, len(texts), 'neutre')
             return result_data
         
         # Utiliser Hugging Face pour l'analyse de sentiment
         try:
-            sentiment_analyzer = pipeline('sentiment-analysis', model=model_name)
-            
-            # Analyser par lots pour éviter les problèmes de mémoire
-            batch_size = 8
-            sentiments = []
+            sentiment_analyzer = get_model(pipeline, 'sentiment-analysis', model=model_name)
             
-            for i in range(0, len(texts), batch_size):
-                batch = texts[i:i+batch_size]
-                batch_results = sentiment_analyzer(batch)
-                sentiments.extend(batch_results)
+            # Un seul appel : le pipeline découpe lui-même en lots pour le modèle
+            sentiments = sentiment_analyzer(
+                texts, batch_size=SENTIMENT_BATCH_SIZE, truncation=True
+            )
             
             # Extraire les scores et les labels
-            scores = [item['score'] for item in sentiments]
-            labels = [item['label'] for item in sentiments]
+            scores = list(map(operator.itemgetter('score'), sentiments))
+            labels = list(map(operator.itemgetter('label'), sentiments))
             
             # Ajouter les résultats
             result_data['sentiment_score'] = scores
@@ -263,8 +335,7 @@ def analyze_sentiment(
             
         except Exception as e:
             logger.error(f"Erreur lors de l'analyse de sentiment avec Hugging Face: {str(e)}")
-            result_data['sentiment_score'] = [0] * len(texts)
-            result_data['sentiment'] = ['erreur'] * len(texts)
+            _set_default_sentiment(result_data, len(texts), 'erreur')
     
     elif provider.lower() == 'openai':
         # Utiliser OpenAI pour l'analyse de sentiment
@@ -274,23 +345,26 @@ def analyze_sentiment(
             
             if not api_key:
                 logger.error("Clé API OpenAI non trouvée dans les variables d'environnement")
-                result_data['sentiment_score'] = [0] * len(texts)
-                result_data['sentiment'] = ['erreur'] * len(texts)
+                _set_default_sentiment(result_data, len(texts), 'erreur')
                 return result_data
             
-            openai.api_key = api_key
+            # Client propre à l'appel (openai>=1.0) plutôt que la clé globale du module
+            client = openai.OpenAI(api_key=api_key) if hasattr(openai, "OpenAI") else None
+            create = client.chat.completions.create if client is not None else openai.ChatCompletion.create
+            request_params = {} if client is not None else {"api_key": api_key}
             
             scores = []
             labels = []
             
             for text in texts:
-                response = openai.ChatCompletion.create(
+                response = create(
                     model="gpt-3.5-turbo",
                     messages=[
                         {"role": "system", "content": "Analyse le sentiment du texte suivant et réponds uniquement avec un des labels suivants: positif, neutre, négatif."},
                         {"role": "user", "content": text}
                     ],
-                    temperature=0
+                    temperature=0,
+                    **request_params
                 )
                 
                 sentiment = response.choices[0].message.content.strip().lower()
@@ -312,8 +386,7 @@ def analyze_sentiment(
             
         except Exception as e:
             logger.error(f"Erreur lors de l'analyse de sentiment avec OpenAI: {str(e)}")
-            result_data['sentiment_score'] = [0] * len(texts)
-            result_data['sentiment'] = ['erreur'] * len(texts)
+            _set_default_sentiment(result_data, len(texts), 'erreur')
     
     elif provider.lower() == 'ollama':
         # Utiliser Ollama pour l'analyse de sentiment
@@ -359,13 +432,11 @@ def analyze_sentiment(
             
         except Exception as e:
             logger.error(f"Erreur lors de l'analyse de sentiment avec Ollama: {str(e)}")
-            result_data['sentiment_score'] = [0] * len(texts)
-            result_data['sentiment'] = ['erreur'] * len(texts)
+            _set_default_sentiment(result_data, len(texts), 'erreur')
     
     else:
         logger.warning(f"Provider '{provider}' non reconnu pour l'analyse de sentiment")
-        result_data['sentiment_score'] = [0] * len(texts)
-        result_data['sentiment'] = ['non analysé'] * len(texts)
+        _set_default_sentiment(result_data, len(texts), 'non analysé')
     
     return result_data
 
@@ -424,27 +495,17 @@ def categorize_text(
         
         # Utiliser Hugging Face pour la classification zéro-shot
         try:
-            classifier = pipeline("zero-shot-classification", model=model_name)
+            classifier = get_model(pipeline, "zero-shot-classification", model=model_name)
             
-            # Catégoriser par lots pour éviter les problèmes de mémoire
-            batch_size = 8
-            all_results = []
-            
-            for i in range(0, len(texts), batch_size):
-                batch = texts[i:i+batch_size]
-                batch_results = []
-                
-                for text in batch:
-                    result = classifier(text, categories)
-                    top_category = result['labels'][0]
-                    top_score = result['scores'][0]
-                    batch_results.append({'category': top_category, 'score': top_score})
-                
-                all_results.extend(batch_results)
+            # Classer tous les textes en un appel, le pipeline les regroupe par lots
+            all_results = classifier(texts, categories, batch_size=CATEGORIZE_BATCH_SIZE)
+            if isinstance(all_results, dict):
+                # Un seul texte : le pipeline renvoie directement le résultat
+                all_results = [all_results]
             
-            # Extraire les catégories et les scores
-            result_categories = [item['category'] for item in all_results]
-            category_scores = [item['score'] for item in all_results]
+            # Extraire les catégories et les scores (les labels sont triés par score)
+            result_categories = [item['labels'][0] for item in all_results]
+            category_scores = [item['scores'][0] for item in all_results]
             
             # Ajouter les résultats
             result_data['catégorie'] = result_categories
@@ -457,6 +518,7 @@ def categorize_text(
     elif provider.lower() in ['openai', 'ollama']:
         # Code pour OpenAI ou Ollama
         try:
+            from src.llm.data_extractor import default_parallelism
             if provider.lower() == 'openai':
                 from src.llm.providers.openai_provider import OpenAIProvider
                 llm = OpenAIProvider(temperature=0.0)
@@ -465,11 +527,9 @@ def categorize_text(
                 llm = OllamaProvider(temperature=0.0)
             
             categories_str = ", ".join(categories)
-            result_categories = []
+            instruction = f"Catégorise le texte suivant dans une seule de ces catégories: {categories_str}. Réponds uniquement avec le nom de la catégorie."
             
-            for text in texts:
-                instruction = f"Catégorise le texte suivant dans une seule de ces catégories: {categories_str}. Réponds uniquement avec le nom de la catégorie."
-                
+            def categorize_one(text):
                 try:
                     result = llm.extract(text, instruction, output_format="text")
                     category = result.get('raw_response', 'Non classé').strip()
@@ -484,10 +544,15 @@ def categorize_text(
                         else:
                             category = 'Autre'
                     
-                    result_categories.append(category)
+                    return category
                 except Exception as e:
                     logger.error(f"Erreur lors de la catégorisation d'un texte: {str(e)}")
-                    result_categories.append('Erreur')
+                    return 'Erreur'
+            
+            # Envoyer les requêtes en parallèle selon la capacité du provider
+            # (Ollama traite une requête à la fois) ; map conserve l'ordre des textes
+            with ThreadPoolExecutor(max_workers=max(1, min(default_parallelism(llm), len(texts)))) as executor:
+                result_categories = list(executor.map(categorize_one, texts))
             
             # Ajouter les résultats
             result_data['catégorie'] = result_categories
@@ -520,13 +585,21 @@ def sort_and_filter(
     Returns:
         Dict: Données triées et filtrées
     """
+    # Tableaux simples : tri et filtre en Python, sans construire de DataFrame
+    compiled_filter = _compile_filter(filter_expr) if filter_expr else None
+    if _is_simple_table(data) and (not filter_expr or compiled_filter):
+        return _sort_and_filter_lists(data, sort_by, ascending, filter_expr, compiled_filter)
+    
     # Convertir en DataFrame pour faciliter le tri et le filtrage
     df = convert_to_dataframe(data)
     
     # Appliquer le filtrage si une expression est fournie
     if filter_expr:
         try:
-            filtered_df = df.query(filter_expr)
+            # numexpr (choisi par défaut par pandas s'il est installé) n'est rentable
+            # que sur de gros volumes : évaluation Python pour les petits DataFrames
+            engine = 'python' if len(df) < QUERY_NUMEXPR_MIN_ROWS else None
+            filtered_df = df.query(filter_expr, engine=engine)
             if len(filtered_df) == 0:
                 logger.warning(f"Le filtre '{filter_expr}' a éliminé toutes les données")
                 return data
@@ -554,6 +627,113 @@ def sort_and_filter(
     
     return result_data
 
+def _is_simple_table(data: Dict[str, List[Any]]) -> bool:
+    """
+    Indique si les données sont des colonnes de même longueur, chacune d'un seul
+    type scalaire, pour lesquelles pandas ne modifierait aucune valeur.
+    """
+    if len(data) < 2:
+        return False
+    
+    lengths = set()
+    for values in data.values():
+        if not isinstance(values, list) or not values:
+            return False
+        lengths.add(len(values))
+        column_type = type(values[0])
+        if column_type not in SIMPLE_COLUMN_TYPES:
+            return False
+        for value in values:
+            # Exclut les colonnes mixtes et les NaN (que pandas placerait en fin de tri)
+            if type(value) is not column_type or value != value:
+                return False
+    return len(lengths) == 1
+
+@functools.lru_cache(maxsize=FILTER_CACHE_SIZE)
+def _compile_filter(filter_expr: str) -> Optional[Tuple[Any, FrozenSet[str]]]:
+    """
+    Compile une expression de filtrage une seule fois par expression.
+    
+    Args:
+        filter_expr (str): Expression de filtrage (ex: "values > 15 and names != 'B'")
+        
+    Returns:
+        Optional[Tuple]: Code compilé et colonnes utilisées, ou None si l'expression
+            sort des comparaisons simples (elle est alors laissée à DataFrame.query)
+    """
+    try:
+        tree = ast.parse(filter_expr.strip(), mode='eval')
+    except SyntaxError:
+        return None
+    
+    columns = set()
+    for node in ast.walk(tree):
+        if not isinstance(node, FILTER_AST_NODES):
+            return None
+        if isinstance(node, ast.Name):
+            columns.add(node.id)
+    if not columns:
+        return None
+    return compile(tree, '<filter>', 'eval'), frozenset(columns)
+
+def _sort_and_filter_lists(
+    data: Dict[str, List[Any]],
+    sort_by: Optional[str],
+    ascending: bool,
+    filter_expr: Optional[str],
+    compiled_filter: Optional[Tuple[Any, FrozenSet[str]]] = None
+) -> Dict[str, List[Any]]:
+    """
+    Équivalent de sort_and_filter sur des colonnes simples, avec un filtre
+    précompilé par _compile_filter.
+    """
+    rows = list(range(len(next(iter(data.values())))))
+    
+    if filter_expr:
+        code, columns = compiled_filter or _compile_filter(filter_expr)
+        unknown = sorted(columns.difference(data))
+        if unknown:
+            logger.error(f"Erreur lors du filtrage avec l'expression '{filter_expr}': colonne(s) inconnue(s) {unknown}")
+        else:
+            no_builtins = {"__builtins__": {}}
+            names = sorted(columns)
+            try:
+                filtered_rows = [
+                    i for i, row in zip(rows, zip(*(data[name] for name in names)))
+                    if eval(code, no_builtins, dict(zip(names, row)))
+                ]
+            except TypeError as e:
+                logger.error(f"Erreur lors du filtrage avec l'expression '{filter_expr}': {str(e)}")
+            else:
+                if not filtered_rows:
+                    logger.warning(f"Le filtre '{filter_expr}' a éliminé toutes les données")
+                    return data
+                rows = filtered_rows
+    
+    if sort_by:
+        matching_cols = [col for col in data if sort_by.lower() in col.lower()]
+        if matching_cols:
+            sort_column = matching_cols[0]
+            values = data[sort_column]
+            rows.sort(key=values.__getitem__, reverse=not ascending)
+        else:
+            logger.warning(f"Champ de tri '{sort_by}' non trouvé dans les données")
+    
+    # Une seule sélection de lignes, appliquée à chaque colonne
+    if len(rows) == 1:
+        row = rows[0]
+        return {column: [values[row]] for column, values in data.items()}
+    take_rows = operator.itemgetter(*rows)
+    return {column: list(take_rows(values)) for column, values in data.items()}
+
+# Opérations disponibles dans process_data (type -> fonction)
+PROCESS_OPERATIONS = {
+    "filter_by_date": filter_by_date,
+    "analyze_sentiment": analyze_sentiment,
+    "categorize_text": categorize_text,
+    "sort_and_filter": sort_and_filter
+}
+
 def process_data(
     data: Dict[str, List[Any]],
     operations: List[Dict[str, Any]]
@@ -574,17 +754,10 @@ def process_data(
     # Appliquer chaque opération séquentiellement
     for operation in operations:
         op_type = operation.get('type')
-        params = operation.get('params', {})
-        
-        if op_type == 'filter_by_date':
-            result = filter_by_date(result, **params)
-        elif op_type == 'analyze_sentiment':
-            result = analyze_sentiment(result, **params)
-        elif op_type == 'categorize_text':
-            result = categorize_text(result, **params)
-        elif op_type == 'sort_and_filter':
-            result = sort_and_filter(result, **params)
-        else:
+        function = PROCESS_OPERATIONS.get(op_type)
+        if function is None:
             logger.warning(f"Type d'opération non reconnu: {op_type}")
+            continue
+        result = function(result, **operation.get('params', {}))
     
     return result
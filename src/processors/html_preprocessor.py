@@ -8,6 +8,12 @@ from bs4 import BeautifulSoup
 # Import correct des classes de commentaires et autres types spéciaux
 from bs4 import Comment, Declaration, ProcessingInstruction
 
+# Expressions régulières de normalisation, compilées une seule fois
+WHITESPACE_RUN_RE = re.compile(r'[\n \t]+')
+SPECIAL_CHARS_RE = re.compile(r'[^\w\s.,;:!?«»\'"()[\]{}€$£¥%&@#*=+\-–—/\\]')
+SPACE_BEFORE_PUNCTUATION_RE = re.compile(r'\s+([.,;:!?])')
+EMPTY_LINES_RE = re.compile(r'\n\s*\n')
+
 def preprocess_html(html_content):
     """
     Prétraite le HTML brut en supprimant les éléments inutiles et en extrayant
@@ -33,23 +39,20 @@ def preprocess_html(html_content):
     text = soup.get_text(separator=' ')
     
     # Normalisation du texte
-    # 1. Remplacement des sauts de ligne multiples par un espace
-    text = re.sub(r'\n+', ' ', text)
-    
-    # 2. Remplacement des tabulations et espaces multiples par un espace
-    text = re.sub(r'[ \t]+', ' ', text)
+    # 1-2. Remplacement des sauts de ligne, tabulations et espaces multiples par un espace
+    text = WHITESPACE_RUN_RE.sub(' ', text)
     
     # 3. Suppression des espaces au début et à la fin
     text = text.strip()
     
     # 4. Suppression des caractères spéciaux superflus
-    text = re.sub(r'[^\w\s.,;:!?«»\'"()[\]{}€$£¥%&@#*=+\-–—/\\]', '', text)
+    text = SPECIAL_CHARS_RE.sub('', text)
     
     # 5. Normalisation des espaces autour de la ponctuation
-    text = re.sub(r'\s+([.,;:!?])', r'\1', text)
+    text = SPACE_BEFORE_PUNCTUATION_RE.sub(r'\1', text)
     
     # 6. Suppression des lignes vides
-    text = re.sub(r'\n\s*\n', '\n', text)
+    text = EMPTY_LINES_RE.sub('\n', text)
     
     return text
 
@@ -11,6 +11,9 @@ from dataclasses import dataclass
 
 logger = logging.getLogger(__name__)
 
+# Fin de phrase suivie d'espaces
+SENTENCE_BOUNDARY_RE = re.compile(r'(?<=[.!?])\s+')
+
 @dataclass
 class SemanticChunk:
     """Représente un chunk avec ses métadonnées sémantiques."""
@@ -66,6 +69,36 @@ class SemanticChunker:
                 'priority': 3
             }
         }
+        
+        # Tous les mots-clés sont recherchés en une seule passe sur le texte
+        keywords = {kw for patterns in self.section_patterns.values() for kw in patterns['keywords']}
+        # Le plus long d'abord : à une position donnée, c'est lui qui est retenu
+        alternatives = '|'.join(re.escape(kw) for kw in sorted(keywords, key=len, reverse=True))
+        self._keyword_pattern = re.compile(f'(?=({alternatives}))') if keywords else None
+        # Mots-clés contenus dans un autre (ex: préfixes), présents dès que celui-ci l'est
+        self._implied_keywords = {
+            kw: {other for other in keywords if other != kw and other in kw}
+            for kw in keywords
+        }
+        # Table plate mot-clé -> types de section, construite une seule fois
+        self._keyword_sections: Dict[str, List[str]] = {}
+        for section_type, patterns in self.section_patterns.items():
+            for kw in patterns['keywords']:
+                self._keyword_sections.setdefault(kw, []).append(section_type)
+    
+    def _find_keywords(self, text: str) -> Dict[str, Set[str]]:
+        """Renvoie les mots-clés présents dans le texte (en minuscules), groupés par type de section."""
+        if self._keyword_pattern is None:
+            return {}
+        found = set(self._keyword_pattern.findall(text))
+        for kw in list(found):
+            found |= self._implied_keywords[kw]
+        
+        by_section: Dict[str, Set[str]] = {}
+        for kw in found:
+            for section_type in self._keyword_sections[kw]:
+                by_section.setdefault(section_type, set()).add(kw)
+        return by_section
     
     def semantic_chunk_html(
         self, 
@@ -150,26 +183,28 @@ class SemanticChunker:
             'html_tags': []
         }
         
-        # Obtenir le texte de l'élément
+        # Obtenir le texte de l'élément et les mots-clés qu'il contient
         text_content = element.get_text().lower()
+        keywords_by_section = self._find_keywords(text_content)
         
         # Analyser les attributs HTML
         classes = element.get('class', [])
         element_id = element.get('id', '')
         
+        # Ni mot-clé, ni classe, ni identifiant : section générale sans autre analyse
+        if not keywords_by_section and not classes and not element_id:
+            return section_info
+        
         # Vérifier chaque type de section
         for section_type, patterns in self.section_patterns.items():
             if section_type == 'general':
                 continue
                 
             importance_score = 0
-            matched_keywords = set()
             
             # Vérifier les mots-clés
-            for keyword in patterns['keywords']:
-                if keyword in text_content:
-                    importance_score += 1
-                    matched_keywords.add(keyword)
+            matched_keywords = keywords_by_section.get(section_type, set())
+            importance_score += len(matched_keywords)
             
             # Vérifier les classes HTML
             for html_class in patterns['html_classes']:
@@ -198,15 +233,14 @@ class SemanticChunker:
     def _analyze_table(self, table: Tag) -> Dict:
         """Analyse un tableau pour détecter s'il contient des spécifications."""
         table_text = table.get_text().lower()
-        specs_keywords = self.section_patterns['specs']['keywords']
-        
-        keyword_count = sum(1 for keyword in specs_keywords if keyword in table_text)
+        matched_keywords = self._find_keywords(table_text).get('specs', set())
+        keyword_count = len(matched_keywords)
         
         return {
             'element': table,
             'type': 'specs' if keyword_count >= 3 else 'general',
             'importance': keyword_count,
-            'keywords': {kw for kw in specs_keywords if kw in table_text},
+            'keywords': matched_keywords,
             'html_tags': ['table']
         }
     
@@ -302,7 +336,7 @@ class SemanticChunker:
     
     def _split_by_sentences(self, text: str, max_size: int, overlap: int) -> List[str]:
         """Divise un texte par phrases."""
-        sentences = re.split(r'(?<=[.!?])\s+', text)
+        sentences = SENTENCE_BOUNDARY_RE.split(text)
         chunks = []
         current_chunk = ""
         
@@ -3,13 +3,29 @@ Module pour vérifier et respecter les règles robots.txt des sites web.
 """
 
 import urllib.robotparser
-import urllib.parse
 import time
 import logging
+import functools
+from urllib.parse import urlparse
 from typing import Dict, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
+@functools.lru_cache(maxsize=1024)
+def _base_url(url: str) -> str:
+    """
+    Renvoie la racine (schéma et domaine) d'une URL, mise en cache car les pages
+    d'un même site sont vérifiées de nombreuses fois au cours d'une exploration.
+    
+    Args:
+        url: URL complète
+        
+    Returns:
+        str: Racine du site (ex: https://example.com)
+    """
+    parsed_url = urlparse(url)
+    return f"{parsed_url.scheme}://{parsed_url.netloc}"
+
 class RobotsChecker:
     """Gère la vérification des règles robots.txt et le rate limiting."""
     
@@ -44,8 +60,7 @@ class RobotsChecker:
         
         try:
             # Extraire le domaine
-            parsed_url = urllib.parse.urlparse(url)
-            base_url = f"{parsed_url.scheme}://{parsed_url.netloc}"
+            base_url = _base_url(url)
             
             # Obtenir ou créer le parser pour ce domaine
             if base_url not in self.parsers:
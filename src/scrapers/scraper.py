@@ -3,9 +3,12 @@ Module pour récupérer le contenu HTML de sites web.
 Fournit des fonctions pour différentes méthodes de scraping.
 """
 
+import asyncio
 import logging
+import functools
 import requests
-from typing import Optional
+from typing import Optional, Sequence
+from concurrent.futures import ThreadPoolExecutor
 import time
 import random
 import re
@@ -14,23 +17,104 @@ from urllib.parse import urlparse
 # Configuration du logger
 logger = logging.getLogger(__name__)
 
+# Délai maximum d'attente du sélecteur attendu avec Playwright (millisecondes)
+PLAYWRIGHT_TIMEOUT = 15000
+
+# Domaines connus pour nécessiter JavaScript (sous-domaines inclus)
+JS_HEAVY_DOMAINS = frozenset({
+    'twitter.com', 'facebook.com', 'instagram.com',
+    'linkedin.com', 'airbnb.com', 'booking.com'
+})
+
 def fetch_content(url: str, method: str = "auto", wait_time: int = 5,
                  respect_robots: bool = True, user_agent: Optional[str] = None,
-                 rate_limit: float = 1.0) -> Optional[str]:
+                 rate_limit: float = 1.0, wait_selector: Optional[str] = None,
+                 block_resources: Optional[Sequence[str]] = None) -> Optional[str]:
     """
     Récupère le contenu HTML d'un site web selon la méthode spécifiée.
     
     Args:
         url: URL du site à scraper
-        method: Méthode à utiliser ('requests', 'selenium', 'auto')
+        method: Méthode à utiliser ('requests', 'selenium', 'playwright', 'auto')
+        wait_time: Temps d'attente après chargement pour Selenium (secondes)
+        respect_robots: Si True, vérifie et respecte les règles robots.txt
+        user_agent: User-Agent à utiliser pour les requêtes
+        rate_limit: Délai minimum entre les requêtes en secondes
+        wait_selector: Sélecteur CSS attendu avant de lire la page (Playwright)
+        block_resources: Types de ressources non chargés, ex. 'image', 'font' (Playwright)
+        
+    Returns:
+        str or None: Contenu HTML du site ou None en cas d'échec
+    """
+    method, user_agent = _prepare_fetch(url, method, respect_robots, user_agent, rate_limit)
+    if method is None:
+        return None
+    
+    # Exécution de la méthode choisie
+    if method == "selenium":
+        return _fetch_with_selenium(url, wait_time, user_agent)
+    elif method == "playwright":
+        return _fetch_with_playwright(url, user_agent, wait_selector, block_resources)
+    else:  # method == "requests"
+        return _fetch_with_requests(url, user_agent)
+
+def fetch_content_to_file(url: str, path: str, method: str = "auto", wait_time: int = 5,
+                          respect_robots: bool = True, user_agent: Optional[str] = None,
+                          rate_limit: float = 1.0, wait_selector: Optional[str] = None,
+                          block_resources: Optional[Sequence[str]] = None) -> Optional[str]:
+    """
+    Récupère le contenu HTML d'un site web et l'enregistre dans un fichier.
+    
+    Avec requests, le corps brut de la réponse est enregistré tel quel ; le texte renvoyé
+    est décodé exactement comme par fetch_content.
+    
+    Args:
+        url: URL du site à scraper
+        path: Fichier dans lequel enregistrer le HTML brut
+        method: Méthode à utiliser ('requests', 'selenium', 'playwright', 'auto')
         wait_time: Temps d'attente après chargement pour Selenium (secondes)
         respect_robots: Si True, vérifie et respecte les règles robots.txt
         user_agent: User-Agent à utiliser pour les requêtes
         rate_limit: Délai minimum entre les requêtes en secondes
+        wait_selector: Sélecteur CSS attendu avant de lire la page (Playwright)
+        block_resources: Types de ressources non chargés, ex. 'image', 'font' (Playwright)
         
     Returns:
         str or None: Contenu HTML du site ou None en cas d'échec
     """
+    method, user_agent = _prepare_fetch(url, method, respect_robots, user_agent, rate_limit)
+    if method is None:
+        return None
+    
+    if method in ("selenium", "playwright"):
+        if method == "selenium":
+            html_content = _fetch_with_selenium(url, wait_time, user_agent)
+        else:
+            html_content = _fetch_with_playwright(url, user_agent, wait_selector, block_resources)
+        if html_content is not None:
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(html_content)
+        return html_content
+    
+    response = _get_with_requests(url, user_agent)
+    if response is None:
+        return None
+    try:
+        with open(path, "wb") as f:
+            f.write(response.content)
+    except OSError as e:
+        logger.error(f"Erreur lors de l'enregistrement de {url} dans {path}: {e}")
+        return None
+    return response.text
+
+def _prepare_fetch(url: str, method: str, respect_robots: bool,
+                   user_agent: Optional[str], rate_limit: float):
+    """
+    Vérifie robots.txt, applique le délai entre requêtes et choisit la méthode.
+    
+    Returns:
+        Tuple (méthode ou None si l'accès est interdit, User-Agent)
+    """
     # Définir un User-Agent par défaut s'il n'est pas spécifié
     if not user_agent:
         user_agent = "AI-Scrapping-Toolkit/1.0 (+https://github.com/kevyn-odjo/ai-scrapping)"
@@ -43,7 +127,7 @@ def fetch_content(url: str, method: str = "auto", wait_time: int = 5,
             can_fetch, reason = checker.can_fetch(url)
             if not can_fetch:
                 logger.error(f"Accès interdit à {url}: {reason}")
-                return None
+                return None, user_agent
         except ImportError:
             logger.warning("Module robots_checker non disponible, vérification robots.txt ignorée")
             # Ajouter un délai simple pour respecter le rate limiting de base
@@ -57,12 +141,9 @@ def fetch_content(url: str, method: str = "auto", wait_time: int = 5,
         method = _determine_best_method(url)
         logger.info(f"Méthode auto-sélectionnée: {method}")
     
-    # Exécution de la méthode choisie
-    if method == "selenium":
-        return _fetch_with_selenium(url, wait_time, user_agent)
-    else:  # method == "requests"
-        return _fetch_with_requests(url, user_agent)
+    return method, user_agent
 
+@functools.lru_cache(maxsize=1024)
 def _determine_best_method(url: str) -> str:
     """
     Détermine la meilleure méthode de scraping en fonction de l'URL.
@@ -74,16 +155,13 @@ def _determine_best_method(url: str) -> str:
     Returns:
         str: Méthode recommandée ('requests', 'selenium')
     """
-    # Liste de domaines connus pour nécessiter JavaScript
-    js_heavy_domains = ['twitter.com', 'facebook.com', 'instagram.com', 
-                       'linkedin.com', 'airbnb.com', 'booking.com']
-    
-    # Extraction du domaine de l'URL
-    domain = urlparse(url).netloc
+    # Extraction du domaine de l'URL (en minuscules, sans port)
+    domain = urlparse(url).hostname or ""
     
-    # Vérification si le domaine est dans la liste qui nécessite JavaScript
-    for js_domain in js_heavy_domains:
-        if js_domain in domain:
+    # Vérification du domaine et de ses domaines parents (www.facebook.com -> facebook.com)
+    labels = domain.split('.')
+    for i in range(len(labels) - 1):
+        if '.'.join(labels[i:]) in JS_HEAVY_DOMAINS:
             return "selenium"
     
     # Par défaut, on utilise requests qui est plus rapide
@@ -100,15 +178,22 @@ def _fetch_with_requests(url: str, user_agent: Optional[str] = None) -> Optional
     Returns:
         str or None: Contenu HTML du site ou None en cas d'échec
     """
+    response = _get_with_requests(url, user_agent)
+    return response.text if response is not None else None
+
+def _get_with_requests(url: str, user_agent: Optional[str] = None):
+    """
+    Télécharge une page avec requests et fixe l'encodage utilisé pour décoder son texte.
+    
+    Args:
+        url: URL du site à scraper
+        user_agent: User-Agent à utiliser pour les requêtes
+        
+    Returns:
+        requests.Response or None: Réponse HTTP ou None en cas d'échec
+    """
     try:
-        headers = {
-            'User-Agent': user_agent or 'AI-Scrapping-Toolkit/1.0',
-            'Accept': 'text/html,application/xhtml+xml,application/xml',
-            'Accept-Language': 'fr,fr-FR;q=0.9,en;q=0.8,en-US;q=0.7',
-            'Referer': 'https://www.google.com/'
-        }
-        
-        response = requests.get(url, headers=headers, timeout=10)
+        response = requests.get(url, headers=_request_headers(user_agent), timeout=10)
         response.raise_for_status()  # Lève une exception si statut HTTP d'erreur
         
         # Détection de l'encodage si nécessaire
@@ -117,11 +202,20 @@ def _fetch_with_requests(url: str, user_agent: Optional[str] = None) -> Optional
             encoding = response.apparent_encoding
             response.encoding = encoding
         
-        return response.text
+        return response
     except requests.exceptions.RequestException as e:
         logger.error(f"Erreur lors de la récupération avec requests: {e}")
         return None
 
+def _request_headers(user_agent: Optional[str] = None) -> dict:
+    """En-têtes HTTP envoyés par les requêtes de scraping."""
+    return {
+        'User-Agent': user_agent or 'AI-Scrapping-Toolkit/1.0',
+        'Accept': 'text/html,application/xhtml+xml,application/xml',
+        'Accept-Language': 'fr,fr-FR;q=0.9,en;q=0.8,en-US;q=0.7',
+        'Referer': 'https://www.google.com/'
+    }
+
 def _fetch_with_selenium(url: str, wait_time: int = 5, user_agent: Optional[str] = None) -> Optional[str]:
     """
     Récupère le contenu HTML d'un site web avec Selenium.
@@ -174,4 +268,95 @@ def _fetch_with_selenium(url: str, wait_time: int = 5, user_agent: Optional[str]
     
     except Exception as e:
         logger.error(f"Erreur lors de la récupération avec Selenium: {e}")
-        return None
\ No newline at end of file
+        return None
+
+def _fetch_with_playwright(url: str, user_agent: Optional[str] = None,
+                           wait_selector: Optional[str] = None,
+                           block_resources: Optional[Sequence[str]] = None) -> Optional[str]:
+    """
+    Récupère le contenu HTML d'un site web avec Playwright (Chromium headless).
+    
+    Les types de ressources bloqués (images, polices...) ne sont pas téléchargés, et
+    la page est lue dès que le sélecteur attendu est présent plutôt qu'après un délai fixe.
+    
+    Args:
+        url: URL du site à scraper
+        user_agent: User-Agent à utiliser pour les requêtes
+        wait_selector: Sélecteur CSS attendu avant de lire la page
+        block_resources: Types de ressources à ne pas charger
+        
+    Returns:
+        str or None: Contenu HTML du site ou None en cas d'échec
+    """
+    try:
+        return _run_coroutine(_fetch_with_playwright_async(url, user_agent, wait_selector, block_resources))
+    except Exception as e:
+        logger.error(f"Erreur lors de la récupération avec Playwright: {e}")
+        return None
+
+def _run_coroutine(coro):
+    """
+    Exécute une coroutine jusqu'à son terme depuis du code synchrone.
+    
+    Args:
+        coro: Coroutine à exécuter
+        
+    Returns:
+        Le résultat de la coroutine
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    
+    # Une boucle tourne déjà dans ce thread (ex: FastAPI, Jupyter) : utiliser un thread dédié
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coro).result()
+
+def _resource_blocker(blocked: frozenset):
+    """
+    Renvoie le gestionnaire de routes Playwright qui abandonne les types de ressources bloqués.
+    
+    Args:
+        blocked: Types de ressources à ne pas charger (ex. 'image', 'font')
+        
+    Returns:
+        Coroutine appelée pour chaque requête de la page
+    """
+    async def route_request(route):
+        if route.request.resource_type in blocked:
+            await route.abort()
+        else:
+            await route.continue_()
+    
+    return route_request
+
+async def _fetch_with_playwright_async(url: str, user_agent: Optional[str],
+                                       wait_selector: Optional[str],
+                                       block_resources: Optional[Sequence[str]]) -> str:
+    """Charge la page dans Chromium headless et renvoie son HTML une fois prêt."""
+    from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeoutError
+    
+    blocked = frozenset(block_resources or ())
+    
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=True)
+        try:
+            context = await browser.new_context(user_agent=user_agent)
+            if blocked:
+                await context.route("**/*", _resource_blocker(blocked))
+            page = await context.new_page()
+            await page.goto(url, wait_until="domcontentloaded", timeout=PLAYWRIGHT_TIMEOUT * 2)
+            
+            # Attendre le contenu utile, sans délai fixe
+            try:
+                if wait_selector:
+                    await page.wait_for_selector(wait_selector, timeout=PLAYWRIGHT_TIMEOUT)
+                else:
+                    await page.wait_for_load_state("networkidle", timeout=PLAYWRIGHT_TIMEOUT)
+            except PlaywrightTimeoutError:
+                logger.warning(f"Délai d'attente dépassé pour {url}, lecture de la page en l'état")
+            
+            return await page.content()
+        finally:
+            await browser.close()
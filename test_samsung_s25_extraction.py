@@ -5,26 +5,41 @@ Script de test pour extraire des informations sur le Samsung Galaxy S25 Ultra
 """
 
 import os
+import re
 import sys
 import json
+import asyncio
 import logging
+import traceback
+import functools
+import time
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlparse
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from dotenv import load_dotenv
 
+# Import conditionnel d'aiohttp (requêtes OpenRouter concurrentes sur une seule boucle)
+try:
+    import aiohttp
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    AIOHTTP_AVAILABLE = False
+
 # Configuration du logger
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-# Charger les variables d'environnement depuis .env
-load_dotenv()
-api_keys = {
-    key: os.environ.get(key) for key in ["OPENAI_API_KEY", "OPENROUTER_API_KEY", "HUGGINGFACE_API_KEY"]
-}
-logger.info(f"Variables d'environnement chargées: {', '.join([k for k, v in api_keys.items() if v])}")
-
 # Importer les modules nécessaires
-from src.scrapers import fetch_content
+from src.scrapers import fetch_content, fetch_content_to_file
 from src.processors import extract_main_content, html_to_chunks
 from src.llm import get_llm_provider, extract_data_from_chunks, aggregate_extraction_results
+from src.llm.extraction_cache import ExtractionCache
+from src.llm.providers import parse_json_response
+from src.utils.file_handler import dump_json
 
 # URLs à scraper
 URLS = {
@@ -36,12 +51,82 @@ URLS = {
 LLM_CONFIG = {
     "provider": "openrouter",  # Utiliser OpenRouter comme provider
     "model": "meta-llama/llama-4-scout",  # Modèle spécifié dans les instructions
-    "api_key": "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",  # Clé API fournie
+    "api_key": None,  # Lue au démarrage depuis la variable d'environnement du provider
     "temperature": 0.0,
     "max_tokens": 2048,
     "timeout": 180
 }
 
+# Modèle économique pour les chunks simples (routage OpenRouter uniquement : ne fait
+# pas partie de LLM_CONFIG, transmis tel quel au provider)
+CHEAP_MODEL = "meta-llama/llama-3.1-8b-instruct"
+
+# Enregistrement du HTML brut et du contenu principal (fichiers de débogage),
+# activé par SCRAPE_DEBUG_DUMP=1 et lu au démarrage du script
+DEBUG_DUMP = False
+
+# Variable d'environnement contenant la clé API de chaque provider
+API_KEY_ENV_VARS = {
+    "openrouter": "OPENROUTER_API_KEY",
+    "openai": "OPENAI_API_KEY"
+}
+
+OPENROUTER_URL = "https://openrouter.ai/api/v1/chat/completions"
+
+# Parties invariantes des requêtes OpenRouter, construites une seule fois
+OPENROUTER_SYSTEM_PROMPT = (
+    "Tu es un assistant spécialisé dans l'extraction de données à partir de contenu HTML. "
+    "Analyse le contenu et extrait les informations demandées selon l'instruction. "
+    "Réponds uniquement avec un objet JSON valide, sans texte avant ou après. "
+    "N'utilise pas de bloc de code markdown. Commence directement par { et termine par }. "
+    "Si tu ne trouves pas d'information, renvoie un objet avec des tableaux vides."
+)
+OPENROUTER_HEADERS = {
+    "Content-Type": "application/json",
+    "HTTP-Referer": "https://ai-scrapping-toolkit.com",
+    "X-Title": "AI Scrapping Toolkit"
+}
+
+# Nombre maximum de chunks envoyés à OpenRouter par site, et de connexions simultanées
+MAX_OPENROUTER_CHUNKS = 5
+OPENROUTER_CONNECTIONS = 8
+
+# Taille maximale d'un chunk, et marge laissée au découpeur au-delà des chunks
+# utilisés (seul le début du contenu est découpé quand le nombre de chunks est borné)
+CHUNK_MAX_LENGTH = 4000
+CHUNK_TAIL_CHARS = 2000
+
+# Nouvelles tentatives sur les erreurs transitoires d'OpenRouter (requests et aiohttp)
+OPENROUTER_RETRIES = 3
+OPENROUTER_RETRY_STATUSES = (429, 502, 503, 504)
+OPENROUTER_BACKOFF_FACTOR = 0.5
+OPENROUTER_RETRY_AFTER_MAX = 30.0
+
+# Délai minimum (en secondes) entre deux requêtes vers un même hôte, partagé par
+# tous les sites et tous les lots pour lisser les rafales (429, détection de bot)
+DEFAULT_DOMAIN_DELAY = 0.2
+DOMAIN_DELAYS = {
+    "www.frandroid.com": 0.5,
+    "www.cdiscount.com": 1.0
+}
+
+# Taille cumulée maximale (en caractères) des chunks regroupés dans une même requête
+MAX_BATCH_CHARS = 20000
+
+# Répertoire des fichiers de résultats (créé une fois au démarrage par main)
+OUTPUT_DIR = "resultats_samsung_s25"
+
+# Cache disque des résultats par chunk (expiration selon AI_SCRAPPING_CACHE_TTL) ;
+# la version est à incrémenter à chaque modification du prompt OpenRouter
+OPENROUTER_PROMPT_VERSION = "openrouter-1"
+extraction_cache = ExtractionCache(cache_dir=os.path.join(OUTPUT_DIR, ".cache"))
+
+# Routage vers le modèle économique : chunks courts et sans contenu rédactionnel
+# (avis, verdict...). Une réponse trop incomplète est redemandée au modèle principal.
+SIMPLE_CHUNK_MAX_CHARS = 1500
+REVIEW_MARKERS = ("verdict", "note", "avis", "test")
+MIN_COMPLETENESS = 0.5
+
 # Requêtes d'extraction pour chaque site
 EXTRACTION_QUERIES = {
     "frandroid": """
@@ -75,18 +160,457 @@ EXTRACTION_QUERIES = {
 
 def ensure_output_dir():
     """Crée le répertoire de sortie s'il n'existe pas."""
-    output_dir = "resultats_samsung_s25"
-    if not os.path.exists(output_dir):
-        os.makedirs(output_dir)
-    return output_dir
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    return OUTPUT_DIR
+
+def _build_chunk_batches(chunks, max_chars=MAX_BATCH_CHARS):
+    """
+    Regroupe les chunks en lots dont la taille cumulée reste sous max_chars.
+
+    Returns:
+        Liste de lots, chacun étant une liste de couples (index, chunk)
+    """
+    batches = []
+    batch = []
+    batch_chars = 0
+    for index, chunk in enumerate(chunks):
+        if batch and batch_chars + len(chunk) > max_chars:
+            batches.append(batch)
+            batch = []
+            batch_chars = 0
+        batch.append((index, chunk))
+        batch_chars += len(chunk)
+    if batch:
+        batches.append(batch)
+    return batches
+
+def _pick_model(batch):
+    """Choisit le modèle économique si tous les chunks du lot sont simples."""
+    for _, chunk in batch:
+        chunk_lower = chunk.lower()
+        if len(chunk) >= SIMPLE_CHUNK_MAX_CHARS or any(marker in chunk_lower for marker in REVIEW_MARKERS):
+            return LLM_CONFIG["model"]
+    return CHEAP_MODEL
+
+def _expected_keys(query):
+    """Renvoie les clés JSON demandées par la requête (lignes « - cle (...) »)."""
+    return re.findall(r"^\s*-\s*(\w+)", query, re.MULTILINE)
+
+def _completeness(result, expected_keys):
+    """Proportion des clés attendues présentes et non vides dans un résultat."""
+    if not isinstance(result, dict):
+        return 0.0
+    if not expected_keys:
+        return 1.0
+    filled = sum(1 for key in expected_keys if result.get(key) not in (None, "", [], {}))
+    return filled / len(expected_keys)
+
+@functools.lru_cache(maxsize=16)
+def _instruction_prompt(query):
+    """Partie fixe du message utilisateur pour une requête (identique pour tous les lots d'un site)."""
+    return (
+        f"### Instruction:\n{query}\n\n"
+        f"### Format de réponse:\nLes contenus sont fournis sous forme d'objet JSON dont les clés "
+        f"sont des identifiants. Applique l'instruction à chaque contenu séparément et renvoie un "
+        f"objet JSON avec les mêmes clés, chacune associée au résultat de son contenu.\n\n"
+    )
+
+def _build_openrouter_messages(model, system_prompt, instruction_prompt, contents_prompt):
+    """
+    Construit les messages en plaçant le préfixe fixe (système + instruction) en tête.
+
+    Les fournisseurs compatibles OpenAI mettent automatiquement en cache un préfixe
+    identique d'une requête à l'autre. Les modèles Anthropic exigent des points de
+    cache explicites (cache_control) sur les blocs à réutiliser.
+    """
+    if not model.startswith("anthropic/"):
+        return [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": instruction_prompt + contents_prompt}
+        ]
+
+    cache_control = {"type": "ephemeral"}
+    return [
+        {"role": "system", "content": [
+            {"type": "text", "text": system_prompt, "cache_control": cache_control}
+        ]},
+        {"role": "user", "content": [
+            {"type": "text", "text": instruction_prompt, "cache_control": cache_control},
+            {"type": "text", "text": contents_prompt}
+        ]}
+    ]
+
+def _log_cache_usage(usage, chunk_ids):
+    """Journalise le nombre de tokens d'entrée servis par le cache de prompt."""
+    if not usage:
+        return
+    cached_tokens = (usage.get("prompt_tokens_details") or {}).get("cached_tokens")
+    if cached_tokens is None:
+        cached_tokens = usage.get("cache_read_input_tokens")
+    if cached_tokens is not None:
+        logger.info(
+            f"Chunks {chunk_ids}: {cached_tokens}/{usage.get('prompt_tokens', '?')} tokens d'entrée lus depuis le cache"
+        )
+
+class DomainRateLimiter:
+    """
+    Espace les requêtes vers un même hôte, quels que soient le thread et la
+    boucle asyncio qui les émettent.
+    """
+
+    def __init__(self, delays=None, default_delay=DEFAULT_DOMAIN_DELAY):
+        """
+        Args:
+            delays (dict, optional): Délai en secondes par hôte
+            default_delay (float): Délai pour les hôtes non listés
+        """
+        self.delays = delays or {}
+        self.default_delay = default_delay
+        self._next_slot = {}
+        self._lock = threading.Lock()
+
+    def _reserve(self, host):
+        """Réserve le prochain créneau libre pour l'hôte et renvoie l'attente nécessaire."""
+        delay = self.delays.get(host, self.default_delay)
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, 0.0))
+            self._next_slot[host] = slot + delay
+        return slot - now
+
+    async def wait(self, host):
+        """Attend (sans bloquer la boucle) le créneau de la prochaine requête vers l'hôte."""
+        wait_time = self._reserve(host)
+        if wait_time > 0:
+            await asyncio.sleep(wait_time)
+
+    def wait_blocking(self, host):
+        """Attend le créneau de la prochaine requête vers l'hôte (code synchrone)."""
+        wait_time = self._reserve(host)
+        if wait_time > 0:
+            time.sleep(wait_time)
+
+rate_limiter = DomainRateLimiter(DOMAIN_DELAYS)
+OPENROUTER_HOST = urlparse(OPENROUTER_URL).hostname
+
+def _openrouter_headers():
+    """En-têtes des requêtes OpenRouter, avec la clé API chargée au démarrage."""
+    return {"Authorization": f"Bearer {LLM_CONFIG['api_key']}", **OPENROUTER_HEADERS}
+
+_openrouter_session = None
+_openrouter_session_lock = threading.Lock()
+
+def get_openrouter_session() -> requests.Session:
+    """
+    Renvoie la session requests partagée pour les appels OpenRouter.
+
+    La session garde les connexions ouvertes (keep-alive) entre les requêtes et
+    réessaie les erreurs transitoires (429, 502, 503, 504) avec un délai croissant.
+
+    Returns:
+        requests.Session: Session partagée par tous les sites
+    """
+    global _openrouter_session
+    with _openrouter_session_lock:
+        if _openrouter_session is None:
+            retry = Retry(
+                total=OPENROUTER_RETRIES,
+                backoff_factor=OPENROUTER_BACKOFF_FACTOR,
+                status_forcelist=OPENROUTER_RETRY_STATUSES,
+                allowed_methods=frozenset({"POST"}),
+                raise_on_status=False
+            )
+            adapter = HTTPAdapter(
+                pool_connections=OPENROUTER_CONNECTIONS,
+                pool_maxsize=OPENROUTER_CONNECTIONS,
+                max_retries=retry
+            )
+            session = requests.Session()
+            session.headers.update(_openrouter_headers())
+            session.mount("https://", adapter)
+            _openrouter_session = session
+    return _openrouter_session
+
+def _retry_delay(attempt, retry_after=None):
+    """
+    Délai avant une nouvelle tentative : Retry-After (en secondes) s'il est fourni,
+    sinon délai croissant comme pour la session requests.
+    """
+    try:
+        return min(float(retry_after), OPENROUTER_RETRY_AFTER_MAX)
+    except (TypeError, ValueError):
+        return OPENROUTER_BACKOFF_FACTOR * (2 ** attempt)
+
+async def _post_openrouter_aiohttp(session, payload):
+    """
+    Envoie une requête à OpenRouter avec aiohttp, en réessayant les erreurs
+    transitoires comme la session requests (mêmes statuts, même nombre de tentatives).
+
+    Returns:
+        Tuple (statut HTTP, réponse JSON si le statut est 200, texte de la réponse sinon)
+    """
+    for attempt in range(OPENROUTER_RETRIES + 1):
+        last_attempt = attempt == OPENROUTER_RETRIES
+        await rate_limiter.wait(OPENROUTER_HOST)
+        try:
+            async with session.post(OPENROUTER_URL, json=payload) as response:
+                status = response.status
+                if status == 200:
+                    return status, await response.json()
+                response_text = await response.text()
+                retry_after = response.headers.get("Retry-After")
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+            if last_attempt:
+                raise
+            logger.warning(f"Erreur de connexion à OpenRouter ({e}), nouvelle tentative...")
+            await asyncio.sleep(_retry_delay(attempt))
+            continue
+
+        if status not in OPENROUTER_RETRY_STATUSES or last_attempt:
+            return status, response_text
+        delay = _retry_delay(attempt, retry_after)
+        logger.warning(f"OpenRouter a répondu {status}, nouvelle tentative dans {delay:.1f}s")
+        await asyncio.sleep(delay)
+
+async def _call_openrouter(session, batch, query, model):
+    """
+    Envoie un lot de chunks à OpenRouter en une seule requête.
+
+    Le modèle renvoie un objet JSON dont les clés sont les identifiants des chunks.
+    Sans aiohttp (session None), la requête est faite avec requests dans un thread.
+
+    Returns:
+        Tuple (liste des résultats des chunks du lot, None pour les échecs ;
+        False si la réponse n'était pas indexée par chunk et ne doit pas être mise en cache)
+    """
+    # Partie fixe de la requête pour un site donné, suivie des contenus variables
+    keyed = {str(index): chunk for index, chunk in batch}
+    contents_prompt = f"### Contenus HTML à analyser:\n{json.dumps(keyed, ensure_ascii=False)}"
+
+    # Préparer les données de la requête (la réponse contient un résultat par chunk)
+    payload = {
+        "model": model,
+        "messages": _build_openrouter_messages(
+            model, OPENROUTER_SYSTEM_PROMPT, _instruction_prompt(query), contents_prompt
+        ),
+        "temperature": LLM_CONFIG["temperature"],
+        "max_tokens": LLM_CONFIG["max_tokens"] * len(batch),
+        "response_format": {"type": "json_object"}
+    }
+
+    chunk_ids = ", ".join(str(index + 1) for index, _ in batch)
+    logger.info(f"Traitement des chunks {chunk_ids} en une requête...")
+    try:
+        if session is not None:
+            status, response_body = await _post_openrouter_aiohttp(session, payload)
+            if status != 200:
+                response_text = response_body
+            else:
+                response_data = response_body
+        else:
+            await rate_limiter.wait(OPENROUTER_HOST)
+            loop = asyncio.get_running_loop()
+            response = await loop.run_in_executor(
+                None,
+                lambda: get_openrouter_session().post(
+                    OPENROUTER_URL, json=payload, timeout=LLM_CONFIG["timeout"]
+                )
+            )
+            status = response.status_code
+            if status != 200:
+                response_text = response.text
+            else:
+                response_data = response.json()
+
+        if status != 200:
+            logger.error(f"Erreur OpenRouter sur les chunks {chunk_ids}: {status} - {response_text}")
+            return [None] * len(batch), True
+
+        # Extraire la réponse
+        _log_cache_usage(response_data.get("usage"), chunk_ids)
+        result = response_data.get("choices", [{}])[0].get("message", {}).get("content", "").strip()
+
+        # Essayer de parser le JSON (repli sur le premier objet complet si du texte l'entoure)
+        try:
+            batch_result = parse_json_response(result)
+        except json.JSONDecodeError as e:
+            logger.error(f"Erreur de décodage JSON sur les chunks {chunk_ids}: {str(e)}")
+            return [None] * len(batch), True
+    except Exception as e:
+        logger.error(f"Erreur lors du traitement des chunks {chunk_ids}: {str(e)}")
+        return [None] * len(batch), True
+
+    if not isinstance(batch_result, dict):
+        logger.error(f"Réponse inattendue sur les chunks {chunk_ids}: {type(batch_result).__name__}")
+        return [None] * len(batch), True
+
+    if not any(key in batch_result for key in keyed):
+        # Le modèle n'a pas suivi le format par identifiant : un seul résultat pour le lot
+        logger.warning(f"Réponse non indexée pour les chunks {chunk_ids}, utilisée comme résultat du lot")
+        return [batch_result] + [None] * (len(batch) - 1), False
+
+    results = [batch_result.get(key) if isinstance(batch_result.get(key), dict) else None for key in keyed]
+    logger.info(f"Résultats des chunks {chunk_ids} obtenus ({sum(r is not None for r in results)}/{len(batch)})")
+    return results, True
+
+async def _extract_batch(session, batch, query, tiers):
+    """
+    Traite un lot avec le modèle adapté, en repassant sur le modèle principal si
+    la réponse du modèle économique est trop incomplète.
+
+    Returns:
+        Tuple (résultats des chunks du lot, modèle ayant répondu, ou None si les
+        résultats ne doivent pas être mis en cache)
+    """
+    model = _pick_model(batch)
+    results, cacheable = await _call_openrouter(session, batch, query, model)
+
+    if model != LLM_CONFIG["model"]:
+        # Un chunk ne couvre souvent qu'une partie des clés : juger sur le meilleur
+        # résultat du lot, et repasser si un chunk n'a pas de réponse exploitable
+        expected_keys = _expected_keys(query)
+        best = max(_completeness(result, expected_keys) for result in results)
+        if best < MIN_COMPLETENESS or any(result is None for result in results):
+            logger.info(f"Réponse incomplète de {model}, nouvelle tentative avec {LLM_CONFIG['model']}")
+            model = LLM_CONFIG["model"]
+            results, cacheable = await _call_openrouter(session, batch, query, model)
+
+    tiers[model] += 1
+    return results, model if cacheable else None
+
+async def _send_batches_openrouter(chunks, query):
+    """
+    Envoie les chunks à OpenRouter par lots, tous les lots en parallèle sur une
+    session HTTP partagée.
+
+    Returns:
+        Liste de tuples (résultat, modèle pour la mise en cache ou None) dans l'ordre
+        des chunks (résultat None pour les échecs)
+    """
+    batches = _build_chunk_batches(chunks)
+    logger.info(f"{len(chunks)} chunks regroupés en {len(batches)} requêtes")
+    tiers = Counter()
 
-def process_website(site_name, url, query):
-    """Traite un site web: scraping, extraction et analyse."""
+    if not AIOHTTP_AVAILABLE:
+        batch_results = await asyncio.gather(*[_extract_batch(None, batch, query, tiers) for batch in batches])
+    else:
+        connector = aiohttp.TCPConnector(limit=OPENROUTER_CONNECTIONS)
+        timeout = aiohttp.ClientTimeout(total=LLM_CONFIG["timeout"])
+        async with aiohttp.ClientSession(
+            connector=connector, timeout=timeout, headers=_openrouter_headers()
+        ) as session:
+            batch_results = await asyncio.gather(*[_extract_batch(session, batch, query, tiers) for batch in batches])
+
+    logger.info(f"Lots traités par modèle: {dict(tiers)}")
+    return [
+        (result, cache_model)
+        for results, cache_model in batch_results
+        for result in results
+    ]
+
+def _cache_key(chunk, query, model):
+    """Clé de cache d'un chunk pour le modèle OpenRouter qui l'a traité."""
+    return ExtractionCache.make_key(
+        chunk, query, f"openrouter:{model}", LLM_CONFIG["temperature"], OPENROUTER_PROMPT_VERSION
+    )
+
+def _cached_result(chunk, query):
+    """
+    Cherche le résultat d'un chunk en cache : d'abord celui du modèle principal, puis
+    celui du modèle économique si le chunk peut lui être confié.
+    """
+    models = [LLM_CONFIG["model"]]
+    if _pick_model([(0, chunk)]) != LLM_CONFIG["model"]:
+        models.append(CHEAP_MODEL)
+    for model in models:
+        cached = extraction_cache.get(_cache_key(chunk, query, model))
+        if cached is not None:
+            return cached
+    return None
+
+async def _extract_chunks_openrouter(chunks, query):
+    """
+    Extrait les données des chunks via OpenRouter, en réutilisant les résultats en
+    cache et en n'envoyant qu'une fois les chunks identiques.
+
+    Returns:
+        Liste des résultats dans l'ordre des chunks (None pour les échecs)
+    """
+    results = [None] * len(chunks)
+    pending = {}  # chunk -> positions des chunks identiques
+    cached_results = {}
+    for position, chunk in enumerate(chunks):
+        if chunk not in cached_results:
+            cached_results[chunk] = _cached_result(chunk, query)
+        if cached_results[chunk] is not None:
+            results[position] = cached_results[chunk]
+        else:
+            pending.setdefault(chunk, []).append(position)
+
+    cached_count = len(chunks) - sum(len(positions) for positions in pending.values())
+    if cached_count:
+        logger.info(f"{cached_count} chunks trouvés dans le cache")
+    if not pending:
+        return results
+
+    unique_chunks = list(pending)
+    for chunk, (result, cache_model) in zip(unique_chunks, await _send_batches_openrouter(unique_chunks, query)):
+        # Clé du modèle qui a répondu ; pas de cache pour une réponse non indexée par chunk
+        if result is not None and cache_model is not None:
+            extraction_cache.set(_cache_key(chunk, query, cache_model), result)
+        for position in pending[chunk]:
+            results[position] = result
+    return results
+
+def _fetch_main_content(site_name, url, scraping_config, output_dir):
+    """
+    Récupère une page et en extrait le contenu principal.
+
+    Avec DEBUG_DUMP, le HTML brut est enregistré tel que reçu et le contenu
+    principal est enregistré à son tour. Seul le contenu principal est renvoyé.
+
+    Returns:
+        Contenu principal de la page, ou None en cas d'échec
+    """
+    logger.info(f"Récupération du contenu depuis {url}...")
+    rate_limiter.wait_blocking(urlparse(url).hostname)
+    if DEBUG_DUMP:
+        raw_html_path = os.path.join(output_dir, f"{site_name}_raw.html")
+        html_content = fetch_content_to_file(url, raw_html_path, **scraping_config)
+    else:
+        html_content = fetch_content(url, **scraping_config)
+
+    if not html_content:
+        logger.error(f"Échec de la récupération du contenu pour {site_name}")
+        return None
+
+    logger.info(f"Contenu récupéré avec succès ({len(html_content)} caractères)")
+    if DEBUG_DUMP:
+        logger.info(f"HTML brut sauvegardé dans {raw_html_path}")
+
+    # Extraction du contenu principal
+    logger.info("Extraction du contenu principal...")
+    main_content = extract_main_content(html_content)
+    if not main_content:
+        logger.error(f"Échec de l'extraction du contenu principal pour {site_name}")
+        return None
+
+    # Sauvegarde du contenu principal
+    if DEBUG_DUMP:
+        main_content_path = os.path.join(output_dir, f"{site_name}_main.txt")
+        with open(main_content_path, "w", encoding="utf-8") as f:
+            f.write(main_content)
+        logger.info(f"Contenu principal sauvegardé dans {main_content_path}")
+
+    return main_content
+
+def process_website(site_name, url, query, output_dir=OUTPUT_DIR):
+    """Traite un site web: scraping, extraction et analyse (output_dir doit exister)."""
     logger.info(f"\n==================================================")
     logger.info(f"Traitement de {site_name}: {url}")
     logger.info(f"==================================================")
 
-    output_dir = ensure_output_dir()
+    results_path = os.path.join(output_dir, f"{site_name}_results.json")
 
     # Configuration spécifique pour chaque site
     scraping_config = {}
@@ -97,65 +621,41 @@ def process_website(site_name, url, query):
             "method": "requests"
         }
     elif site_name == "cdiscount":
-        logger.info("Utilisation de Selenium pour cdiscount.com")
+        logger.info("Utilisation de Playwright pour cdiscount.com")
         scraping_config = {
-            "method": "selenium",
-            "wait_time": 10
+            "method": "playwright",
+            "wait_selector": "article[data-navigation]",
+            "block_resources": ["image", "font", "media", "stylesheet"]
         }
 
-    # Récupération du contenu HTML
-    logger.info(f"Récupération du contenu depuis {url}...")
-    html_content = fetch_content(url, **scraping_config)
-
-    if not html_content:
-        logger.error(f"Échec de la récupération du contenu pour {site_name}")
+    # Récupération et extraction du contenu principal ; le HTML brut n'est pas
+    # conservé pendant la suite du traitement
+    main_content = _fetch_main_content(site_name, url, scraping_config, output_dir)
+    if not main_content:
         return None
 
-    logger.info(f"Contenu récupéré avec succès ({len(html_content)} caractères)")
-
-    # Sauvegarde du HTML brut
-    raw_html_path = os.path.join(output_dir, f"{site_name}_raw.html")
-    with open(raw_html_path, "w", encoding="utf-8") as f:
-        f.write(html_content)
-    logger.info(f"HTML brut sauvegardé dans {raw_html_path}")
-
-    # Extraction du contenu principal
-    logger.info("Extraction du contenu principal...")
-    main_content = extract_main_content(html_content)
-
-    # Sauvegarde du contenu principal
-    main_content_path = os.path.join(output_dir, f"{site_name}_main.txt")
-    with open(main_content_path, "w", encoding="utf-8") as f:
-        f.write(main_content)
-    logger.info(f"Contenu principal sauvegardé dans {main_content_path}")
-
     # Vérifier si le contenu principal est valide
     if site_name == "cdiscount" and "Accès non autorisé" in main_content:
         logger.error(f"Accès non autorisé à {site_name}. Le site a détecté notre scraping.")
         error_data = {"error": "access_denied", "message": "Le site a bloqué notre accès."}
-        results_path = os.path.join(output_dir, f"{site_name}_results.json")
-        with open(results_path, "w", encoding="utf-8") as f:
-            json.dump(error_data, f, ensure_ascii=False, indent=2)
+        dump_json(error_data, results_path)
         return error_data
 
     # Découpage en chunks
     logger.info("Découpage du contenu en chunks...")
-    chunks = html_to_chunks(main_content, method="hybrid", max_length=4000)
+    if LLM_CONFIG["provider"] == "openrouter":
+        # Seuls les MAX_OPENROUTER_CHUNKS premiers chunks sont envoyés : inutile de découper le reste
+        main_content = main_content[:MAX_OPENROUTER_CHUNKS * CHUNK_MAX_LENGTH + CHUNK_TAIL_CHARS]
+    chunks = html_to_chunks(main_content, method="hybrid", max_length=CHUNK_MAX_LENGTH)
     logger.info(f"{len(chunks)} chunks générés")
 
-    # Vérifier la clé API OpenAI
-    api_key = os.environ.get("OPENAI_API_KEY", "")
-    if not api_key:
-        logger.error("Clé API OpenAI non trouvée dans les variables d'environnement")
-        error_data = {"error": "api_key_missing", "message": "Clé API OpenAI manquante"}
-        results_path = os.path.join(output_dir, f"{site_name}_results.json")
-        with open(results_path, "w", encoding="utf-8") as f:
-            json.dump(error_data, f, ensure_ascii=False, indent=2)
+    # Vérifier la clé API (chargée et journalisée une seule fois au démarrage)
+    if not LLM_CONFIG["api_key"]:
+        key_env_var = API_KEY_ENV_VARS.get(LLM_CONFIG["provider"], "api_key")
+        logger.error(f"Clé API non trouvée ({key_env_var})")
+        error_data = {"error": "api_key_missing", "message": f"Clé API manquante ({key_env_var})"}
+        dump_json(error_data, results_path)
         return error_data
-    else:
-        # Afficher une version masquée de la clé API pour le débogage
-        masked_key = api_key[:4] + "..." + api_key[-4:] if len(api_key) > 8 else "***"
-        logger.info(f"Clé API OpenAI trouvée (masquée): {masked_key}")
 
     # Initialisation du provider LLM
     logger.info(f"Initialisation du provider LLM ({LLM_CONFIG['provider']}/{LLM_CONFIG['model']})...")
@@ -164,263 +664,126 @@ def process_website(site_name, url, query):
     except Exception as e:
         logger.error(f"Erreur lors de l'initialisation du provider LLM: {str(e)}")
         error_data = {"error": "llm_provider_init_failed", "message": str(e)}
-        results_path = os.path.join(output_dir, f"{site_name}_results.json")
-        with open(results_path, "w", encoding="utf-8") as f:
-            json.dump(error_data, f, ensure_ascii=False, indent=2)
+        dump_json(error_data, results_path)
         return error_data
 
     # Extraction des données avec le LLM
     logger.info(f"Extraction des données avec la requête:\n    {query[:50]}...")
     logger.info(f"Prompt d'extraction:\n    {query}")
 
-    # Utiliser un seul chunk pour tester
+    # Tester d'abord l'extraction sur le premier chunk ; son résultat est réutilisé
+    # dans l'agrégation finale plutôt que redemandé au LLM
     test_chunk = chunks[0]
     logger.info(f"Test d'extraction sur le premier chunk ({len(test_chunk)} caractères)...")
     try:
-        # Vérifier si nous utilisons OpenRouter
         if LLM_CONFIG["provider"] == "openrouter":
-            # Utiliser directement l'API OpenRouter via requests
-            import requests
-
-            # Construire le système de messages
-            system_prompt = (
-                "Tu es un assistant spécialisé dans l'extraction de données à partir de contenu HTML. "
-                "Analyse le contenu et extrait les informations demandées selon l'instruction. "
-                "Réponds uniquement avec un objet JSON valide, sans texte avant ou après. "
-                "N'utilise pas de bloc de code markdown. Commence directement par { et termine par }. "
-                "Si tu ne trouves pas d'information, renvoie un objet avec des tableaux vides."
-            )
-
-            user_prompt = f"### Instruction:\n{query}\n\n### Contenu HTML à analyser:\n{test_chunk}"
-
-            # Préparer les données de la requête
-            payload = {
-                "model": LLM_CONFIG["model"],
-                "messages": [
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                "temperature": LLM_CONFIG["temperature"],
-                "max_tokens": LLM_CONFIG["max_tokens"]
-            }
-
-            headers = {
-                "Authorization": f"Bearer {LLM_CONFIG['api_key']}",
-                "Content-Type": "application/json",
-                "HTTP-Referer": "https://ai-scrapping-toolkit.com",
-                "X-Title": "AI Scrapping Toolkit"
-            }
-
-            logger.info(f"Envoi de la requête à OpenRouter (modèle: {LLM_CONFIG['model']})...")
-            response = requests.post(
-                "https://openrouter.ai/api/v1/chat/completions",
-                headers=headers,
-                json=payload,
-                timeout=LLM_CONFIG["timeout"]
-            )
-
-            if response.status_code != 200:
-                error_msg = f"Erreur OpenRouter: {response.status_code} - {response.text}"
-                logger.error(error_msg)
-                error_data = {"error": f"openrouter_error_{response.status_code}", "message": response.text}
-                results_path = os.path.join(output_dir, f"{site_name}_results.json")
-                with open(results_path, "w", encoding="utf-8") as f:
-                    json.dump(error_data, f, ensure_ascii=False, indent=2)
-                return error_data
-
-            # Extraire la réponse
-            response_data = response.json()
-            result = response_data.get("choices", [{}])[0].get("message", {}).get("content", "").strip()
-
-            # Essayer de parser le JSON
-            try:
-                # Trouver le premier { et le dernier } au cas où il y aurait du texte avant/après
-                first_brace = result.find("{")
-                last_brace = result.rfind("}")
-                if first_brace != -1 and last_brace != -1 and last_brace > first_brace:
-                    result = result[first_brace:last_brace+1].strip()
-
-                test_result = json.loads(result)
-                logger.info(f"Résultat du test d'extraction: {json.dumps(test_result, ensure_ascii=False)[:200]}...")
-            except json.JSONDecodeError as e:
-                error_msg = f"Erreur de décodage JSON: {str(e)}. Réponse brute: {result[:200]}..."
-                logger.error(error_msg)
-                error_data = {"error": "json_decode_error", "message": str(e), "raw_response": result}
-                results_path = os.path.join(output_dir, f"{site_name}_results.json")
-                with open(results_path, "w", encoding="utf-8") as f:
-                    json.dump(error_data, f, ensure_ascii=False, indent=2)
-                return error_data
+            # Même chemin (prompt, cache, session) que l'extraction complète
+            test_result = asyncio.run(_extract_chunks_openrouter([test_chunk], query))[0]
+            if test_result is None:
+                test_result = {"error": "openrouter_error", "message": "Aucun résultat exploitable pour le premier chunk"}
         else:
             # Utiliser le provider LLM standard
             test_result = llm_provider.extract(test_chunk, query)
-            logger.info(f"Résultat du test d'extraction: {json.dumps(test_result, ensure_ascii=False)[:200]}...")
+        logger.info(f"Résultat du test d'extraction: {json.dumps(test_result, ensure_ascii=False)[:200]}...")
 
         if "error" in test_result:
             logger.error(f"Erreur lors du test d'extraction: {test_result['error']}")
-            results_path = os.path.join(output_dir, f"{site_name}_results.json")
-            with open(results_path, "w", encoding="utf-8") as f:
-                json.dump(test_result, f, ensure_ascii=False, indent=2)
+            dump_json(test_result, results_path)
             return test_result
     except Exception as e:
         logger.error(f"Exception lors du test d'extraction: {str(e)}")
-        import traceback
         logger.error(f"Détails de l'erreur: {traceback.format_exc()}")
         error_data = {"error": "extraction_test_failed", "message": str(e)}
-        results_path = os.path.join(output_dir, f"{site_name}_results.json")
-        with open(results_path, "w", encoding="utf-8") as f:
-            json.dump(error_data, f, ensure_ascii=False, indent=2)
+        dump_json(error_data, results_path)
         return error_data
 
-    # Continuer avec l'extraction complète
+    # Continuer avec l'extraction complète des chunks suivants
     try:
-        # Si nous avons déjà un résultat de test réussi, utilisons-le comme premier résultat
-        if 'test_result' in locals() and isinstance(test_result, dict) and "error" not in test_result:
-            logger.info("Utilisation du résultat de test comme premier résultat d'extraction")
-            # Créer un résultat agrégé à partir du test
-            aggregated_data = test_result
-
-            # Sauvegarde des résultats
-            results_path = os.path.join(output_dir, f"{site_name}_results.json")
-            with open(results_path, "w", encoding="utf-8") as f:
-                json.dump(aggregated_data, f, ensure_ascii=False, indent=2)
-            logger.info(f"Résultats sauvegardés dans {results_path}")
-
-            return aggregated_data
+        logger.info("Procédant à l'extraction complète...")
+        remaining_chunks = chunks[1:]
+
+        # Si nous utilisons OpenRouter, nous devons traiter chaque chunk manuellement
+        if LLM_CONFIG["provider"] == "openrouter":
+            remaining_chunks = remaining_chunks[:MAX_OPENROUTER_CHUNKS - 1]
+            logger.info(f"Extraction avec OpenRouter sur {len(remaining_chunks)} chunks supplémentaires...")
+
+            # Envoyer les requêtes de tous les chunks simultanément
+            all_results = [test_result]
+            if remaining_chunks:
+                all_results += [
+                    chunk_result
+                    for chunk_result in asyncio.run(_extract_chunks_openrouter(remaining_chunks, query))
+                    if chunk_result is not None
+                ]
         else:
-            # Sinon, procéder à l'extraction complète
-            logger.info("Procédant à l'extraction complète...")
-
-            # Si nous utilisons OpenRouter, nous devons traiter chaque chunk manuellement
-            if LLM_CONFIG["provider"] == "openrouter":
-                logger.info(f"Extraction avec OpenRouter sur {len(chunks)} chunks...")
-
-                # Traiter les chunks un par un pour éviter les erreurs
-                all_results = []
-                for i, chunk in enumerate(chunks[:min(5, len(chunks))]):  # Limiter à 5 chunks pour ce test
-                    logger.info(f"Traitement du chunk {i+1}/{min(5, len(chunks))}...")
-
-                    # Utiliser le même code que pour le test
-                    import requests
-
-                    # Construire le système de messages
-                    system_prompt = (
-                        "Tu es un assistant spécialisé dans l'extraction de données à partir de contenu HTML. "
-                        "Analyse le contenu et extrait les informations demandées selon l'instruction. "
-                        "Réponds uniquement avec un objet JSON valide, sans texte avant ou après. "
-                        "N'utilise pas de bloc de code markdown. Commence directement par { et termine par }. "
-                        "Si tu ne trouves pas d'information, renvoie un objet avec des tableaux vides."
-                    )
-
-                    user_prompt = f"### Instruction:\n{query}\n\n### Contenu HTML à analyser:\n{chunk}"
-
-                    # Préparer les données de la requête
-                    payload = {
-                        "model": LLM_CONFIG["model"],
-                        "messages": [
-                            {"role": "system", "content": system_prompt},
-                            {"role": "user", "content": user_prompt}
-                        ],
-                        "temperature": LLM_CONFIG["temperature"],
-                        "max_tokens": LLM_CONFIG["max_tokens"]
-                    }
-
-                    headers = {
-                        "Authorization": f"Bearer {LLM_CONFIG['api_key']}",
-                        "Content-Type": "application/json",
-                        "HTTP-Referer": "https://ai-scrapping-toolkit.com",
-                        "X-Title": "AI Scrapping Toolkit"
-                    }
-
-                    try:
-                        response = requests.post(
-                            "https://openrouter.ai/api/v1/chat/completions",
-                            headers=headers,
-                            json=payload,
-                            timeout=LLM_CONFIG["timeout"]
-                        )
-
-                        if response.status_code != 200:
-                            logger.error(f"Erreur OpenRouter sur le chunk {i+1}: {response.status_code} - {response.text}")
-                            continue
-
-                        # Extraire la réponse
-                        response_data = response.json()
-                        result = response_data.get("choices", [{}])[0].get("message", {}).get("content", "").strip()
-
-                        # Essayer de parser le JSON
-                        try:
-                            # Trouver le premier { et le dernier } au cas où il y aurait du texte avant/après
-                            first_brace = result.find("{")
-                            last_brace = result.rfind("}")
-                            if first_brace != -1 and last_brace != -1 and last_brace > first_brace:
-                                result = result[first_brace:last_brace+1].strip()
-
-                            chunk_result = json.loads(result)
-                            all_results.append(chunk_result)
-                            logger.info(f"Résultat du chunk {i+1} obtenu avec succès")
-                        except json.JSONDecodeError as e:
-                            logger.error(f"Erreur de décodage JSON sur le chunk {i+1}: {str(e)}")
-                    except Exception as e:
-                        logger.error(f"Erreur lors du traitement du chunk {i+1}: {str(e)}")
-
-                # Agréger les résultats manuellement
-                logger.info(f"Agrégation de {len(all_results)} résultats...")
-                if not all_results:
-                    error_data = {"error": "no_results", "message": "Aucun résultat d'extraction obtenu"}
-                    results_path = os.path.join(output_dir, f"{site_name}_results.json")
-                    with open(results_path, "w", encoding="utf-8") as f:
-                        json.dump(error_data, f, ensure_ascii=False, indent=2)
-                    return error_data
-
-                # Utiliser le premier résultat comme base
-                aggregated_data = all_results[0]
-
-                # Sauvegarde des résultats
-                results_path = os.path.join(output_dir, f"{site_name}_results.json")
-                with open(results_path, "w", encoding="utf-8") as f:
-                    json.dump(aggregated_data, f, ensure_ascii=False, indent=2)
-                logger.info(f"Résultats sauvegardés dans {results_path}")
-
-                return aggregated_data
-            else:
-                # Utiliser l'extraction standard
-                extraction_results = extract_data_from_chunks(
-                    chunks=chunks,
+            # Utiliser l'extraction standard
+            all_results = [test_result]
+            if remaining_chunks:
+                all_results += extract_data_from_chunks(
+                    chunks=remaining_chunks,
                     query=query,
                     llm_provider=llm_provider,
-                    max_workers=min(4, len(chunks))
+                    max_workers=min(4, len(remaining_chunks))
                 )
 
-                # Agrégation des résultats
-                logger.info("Agrégation des résultats...")
-                aggregated_data = aggregate_extraction_results(extraction_results)
+        # Fusionner les résultats des chunks, y compris celui du test
+        logger.info(f"Agrégation de {len(all_results)} résultats...")
+        aggregated_data = aggregate_extraction_results(all_results)
 
-                # Sauvegarde des résultats
-                results_path = os.path.join(output_dir, f"{site_name}_results.json")
-                with open(results_path, "w", encoding="utf-8") as f:
-                    json.dump(aggregated_data, f, ensure_ascii=False, indent=2)
-                logger.info(f"Résultats sauvegardés dans {results_path}")
+        # Sauvegarde des résultats
+        dump_json(aggregated_data, results_path)
+        logger.info(f"Résultats sauvegardés dans {results_path}")
 
-                return aggregated_data
+        return aggregated_data
     except Exception as e:
         logger.error(f"Exception lors de l'extraction complète: {str(e)}")
-        import traceback
         logger.error(f"Détails de l'erreur: {traceback.format_exc()}")
         error_data = {"error": "extraction_failed", "message": str(e)}
-        results_path = os.path.join(output_dir, f"{site_name}_results.json")
-        with open(results_path, "w", encoding="utf-8") as f:
-            json.dump(error_data, f, ensure_ascii=False, indent=2)
+        dump_json(error_data, results_path)
         return error_data
 
+def _bootstrap():
+    """Charge les variables d'environnement (.env compris) au lancement du script."""
+    global DEBUG_DUMP
+    load_dotenv()
+    api_keys = {
+        key: os.environ.get(key) for key in ["OPENAI_API_KEY", "OPENROUTER_API_KEY", "HUGGINGFACE_API_KEY"]
+    }
+    logger.info(f"Variables d'environnement chargées: {', '.join([k for k, v in api_keys.items() if v])}")
+    DEBUG_DUMP = os.environ.get("SCRAPE_DEBUG_DUMP") == "1"
+
+    # Clé API du provider, jamais écrite dans le code ni affichée en clair
+    key_env_var = API_KEY_ENV_VARS.get(LLM_CONFIG["provider"])
+    if key_env_var:
+        LLM_CONFIG["api_key"] = os.environ.get(key_env_var)
+    api_key = LLM_CONFIG["api_key"]
+    if api_key:
+        masked_key = api_key[:4] + "..." + api_key[-4:] if len(api_key) > 8 else "***"
+        logger.info(f"Clé API {LLM_CONFIG['provider']} trouvée (masquée): {masked_key}")
+    else:
+        logger.warning(f"Clé API {LLM_CONFIG['provider']} non trouvée ({key_env_var})")
+
 def main():
     """Fonction principale."""
     logger.info("Démarrage du test d'extraction d'informations sur le Samsung Galaxy S25 Ultra")
 
-    results = {}
+    # Créer le répertoire de sortie avant de lancer les traitements en parallèle
+    output_dir = ensure_output_dir()
 
-    # Traiter chaque site
-    for site_name, url in URLS.items():
-        results[site_name] = process_website(site_name, url, EXTRACTION_QUERIES[site_name])
+    # Traiter les sites en parallèle : ils ne partagent aucun état et passent
+    # l'essentiel de leur temps à attendre le réseau
+    results = {site_name: None for site_name in URLS}
+    with ThreadPoolExecutor(max_workers=len(URLS)) as executor:
+        futures = {
+            executor.submit(process_website, site_name, url, EXTRACTION_QUERIES[site_name], output_dir): site_name
+            for site_name, url in URLS.items()
+        }
+        for future in as_completed(futures):
+            site_name = futures[future]
+            try:
+                results[site_name] = future.result()
+            except Exception as e:
+                logger.error(f"Exception lors du traitement de {site_name}: {str(e)}")
 
     # Afficher un résumé des résultats
     logger.info("\nRÉSUMÉ DES RÉSULTATS:")
@@ -435,7 +798,8 @@ def main():
         else:
             logger.info(f"\n{site_name.upper()}: Échec de l'extraction")
 
-    logger.info("\nTest terminé. Consultez le dossier 'resultats_samsung_s25' pour les détails.")
+    logger.info(f"\nTest terminé. Consultez le dossier '{OUTPUT_DIR}' pour les détails.")
 
 if __name__ == "__main__":
+    _bootstrap()
     main()
@@ -1,20 +1,50 @@
 import unittest
 import sys
 import os
+import importlib.util
+from unittest.mock import patch
 from bs4 import BeautifulSoup
 
 # Add the project root to the Python path to ensure imports work correctly
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
+# Callers needing both the title and the main content should use
+# extract_title_and_content, which parses the page only once.
 from src.processors.content_extractor import (
     get_page_title,
     extract_main_content,
+    extract_title_and_content,
     find_main_content_div
 )
 
+# Parser used to build test trees: the C-backed lxml when installed
+SOUP_PARSER = "lxml" if importlib.util.find_spec("lxml") else "html.parser"
+
+def _soup(html):
+    """Parse test HTML with the parser shared by all tests."""
+    return BeautifulSoup(html, SOUP_PARSER)
+
 class TestContentExtractor(unittest.TestCase):
     """Test cases for the content extractor module."""
 
+    HTML_ARTICLE = """
+        <html>
+            <head><title>Test</title></head>
+            <body>
+                <header>Site Header</header>
+                <nav>Navigation</nav>
+                <article>
+                    <h1>Article Title</h1>
+                    <p>This is the main content of the article.</p>
+                    <p>It has multiple paragraphs with enough text to pass the threshold.</p>
+                    <p>This should be enough text to be considered valid content.</p>
+                    <p>Adding more text to ensure we pass the 200 character threshold for content.</p>
+                </article>
+                <footer>Footer</footer>
+            </body>
+        </html>
+        """
+
     def test_get_page_title_empty(self):
         """Test title extraction with empty input."""
         self.assertIsNone(get_page_title(""))
@@ -34,6 +64,13 @@ class TestContentExtractor(unittest.TestCase):
         """
         self.assertEqual(get_page_title(html), "Test Page Title")
 
+    def test_get_page_title_fast_path_used(self):
+        """Test the title tag is read without building a BeautifulSoup tree."""
+        html = "<html><head><title>\n  Caf&eacute; &amp; Cie </title></head><body></body></html>"
+        with patch('src.processors.content_extractor.BeautifulSoup') as mock_soup:
+            self.assertEqual(get_page_title(html), "Café & Cie")
+        mock_soup.assert_not_called()
+
     def test_get_page_title_with_h1_fallback(self):
         """Test title extraction with h1 fallback when no title tag."""
         html = """
@@ -74,23 +111,7 @@ class TestContentExtractor(unittest.TestCase):
 
     def test_extract_main_content_with_article(self):
         """Test extraction when there's an article tag."""
-        html = """
-        <html>
-            <head><title>Test</title></head>
-            <body>
-                <header>Site Header</header>
-                <nav>Navigation</nav>
-                <article>
-                    <h1>Article Title</h1>
-                    <p>This is the main content of the article.</p>
-                    <p>It has multiple paragraphs with enough text to pass the threshold.</p>
-                    <p>This should be enough text to be considered valid content.</p>
-                    <p>Adding more text to ensure we pass the 200 character threshold for content.</p>
-                </article>
-                <footer>Footer</footer>
-            </body>
-        </html>
-        """
+        html = self.HTML_ARTICLE
         result = extract_main_content(html)
         self.assertIsNotNone(result)
         self.assertIn("Article Title", result)
@@ -98,6 +119,39 @@ class TestContentExtractor(unittest.TestCase):
         self.assertNotIn("Site Header", result)
         self.assertNotIn("Footer", result)
 
+    def test_extract_main_content_with_parsed_soup(self):
+        """Test extraction from an already parsed tree gives the same result."""
+        expected = extract_main_content(self.HTML_ARTICLE)
+        self.assertEqual(extract_main_content(_soup(self.HTML_ARTICLE)), expected)
+
+    @unittest.skipUnless(importlib.util.find_spec("lxml"), "lxml is not installed")
+    def test_extract_main_content_parsers_agree(self):
+        """Test the lxml and html.parser backends extract the same content."""
+        results = []
+        for parser in ("lxml", "html.parser"):
+            with patch('src.processors.content_extractor.HTML_PARSER', parser):
+                results.append(extract_main_content(self.HTML_ARTICLE))
+        self.assertEqual(results[0], results[1])
+
+    def test_extract_title_and_content_single_parse(self):
+        """Test title and main content are extracted from a single parse."""
+        with patch('src.processors.content_extractor.BeautifulSoup', wraps=BeautifulSoup) as mock_soup:
+            title, content = extract_title_and_content(self.HTML_ARTICLE)
+
+        mock_soup.assert_called_once()
+        self.assertEqual(title, get_page_title(self.HTML_ARTICLE))
+        self.assertEqual(content, extract_main_content(self.HTML_ARTICLE))
+
+    def test_extract_title_and_content_h1_fallback(self):
+        """Test the h1 fallback title is read before headers are stripped."""
+        html = self.HTML_ARTICLE.replace("<head><title>Test</title></head>", "")
+        html = html.replace("<header>Site Header</header>", "<header><h1>Site Name</h1></header>")
+
+        title, content = extract_title_and_content(html)
+
+        self.assertEqual(title, "Site Name")
+        self.assertNotIn("Site Name", content)
+
     def test_extract_main_content_with_main(self):
         """Test extraction when there's a main tag."""
         html = """
@@ -207,12 +261,12 @@ class TestContentExtractor(unittest.TestCase):
 
     def test_find_main_content_div_empty(self):
         """Test find_main_content_div with empty soup."""
-        soup = BeautifulSoup("", "html.parser")
+        soup = _soup("")
         self.assertIsNone(find_main_content_div(soup))
 
     def test_find_main_content_div_no_divs(self):
         """Test find_main_content_div with no divs."""
-        soup = BeautifulSoup("<html><body><p>No divs here</p></body></html>", "html.parser")
+        soup = _soup("<html><body><p>No divs here</p></body></html>")
         self.assertIsNone(find_main_content_div(soup))
 
     def test_find_main_content_div_with_paragraphs(self):
@@ -234,7 +288,7 @@ class TestContentExtractor(unittest.TestCase):
             </body>
         </html>
         """
-        soup = BeautifulSoup(html, "html.parser")
+        soup = _soup(html)
         result = find_main_content_div(soup)
         self.assertIsNotNone(result)
         self.assertEqual(result.get("class"), ["content"])
@@ -267,7 +321,7 @@ class TestContentExtractor(unittest.TestCase):
             </body>
         </html>
         """
-        soup = BeautifulSoup(html, "html.parser")
+        soup = _soup(html)
         result = find_main_content_div(soup)
         self.assertIsNotNone(result)
         self.assertEqual(result.get("class"), ["main"])
@@ -0,0 +1,218 @@
+import unittest
+import sys
+import os
+from unittest.mock import patch
+
+# Add the project root to the Python path to ensure imports work correctly
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.llm import data_extractor
+from src.llm.data_extractor import (
+    CircuitBreaker,
+    aggregate_extraction_results,
+    extract_data_from_chunks,
+    _is_transient_failure,
+    _retry_delay,
+    default_parallelism,
+    RETRY_MAX_DELAY
+)
+
+CHUNK = "Un chunk avec assez de mots pour être envoyé au LLM."
+
+class FakeProvider:
+    """Async provider returning the queued replies in order (the last one repeats)."""
+
+    model = "fake-model"
+    temperature = 0.0
+
+    def __init__(self, *replies):
+        self.replies = list(replies)
+        self.calls = 0
+
+    async def extract_async(self, content, instruction, output_format="json"):
+        reply = self.replies[min(self.calls, len(self.replies) - 1)]
+        self.calls += 1
+        if isinstance(reply, Exception):
+            raise reply
+        return reply
+
+class TestRetryPolicy(unittest.TestCase):
+    """Test cases for the retry and backoff policy of data_extractor."""
+
+    def setUp(self):
+        data_extractor._circuit_breakers.clear()
+        patcher = patch('src.llm.data_extractor._retry_delay', return_value=0)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _extract(self, provider, max_retries=2):
+        return extract_data_from_chunks(
+            [CHUNK], "titres", provider, enhanced_mode=False, use_cache=False,
+            max_retries=max_retries
+        )
+
+    def test_transient_failure_codes(self):
+        """Only explicit transient error codes are retried."""
+        self.assertTrue(_is_transient_failure({"error": "rate_limit"}))
+        self.assertTrue(_is_transient_failure({"error": "service_unavailable"}))
+        self.assertTrue(_is_transient_failure({"error": "connection_error"}))
+        self.assertFalse(_is_transient_failure({"error": "api_error"}))
+        self.assertFalse(_is_transient_failure({"error": "invalid_request"}))
+        self.assertFalse(_is_transient_failure({"error": "parsing_error"}))
+        self.assertFalse(_is_transient_failure(None))
+        self.assertFalse(_is_transient_failure({"titres": ["A"]}))
+
+    def test_retry_delay_is_capped(self):
+        """Backoff grows exponentially with jitter and never exceeds the cap."""
+        for attempt in range(3):
+            delay = _retry_delay(attempt)
+            self.assertGreaterEqual(delay, data_extractor.RETRY_BASE_DELAY * 2 ** attempt / 2)
+            self.assertLessEqual(delay, data_extractor.RETRY_BASE_DELAY * 2 ** attempt)
+        self.assertLessEqual(_retry_delay(20), RETRY_MAX_DELAY)
+
+    def test_transient_failure_is_retried(self):
+        """A rate-limited chunk is retried until the provider answers."""
+        provider = FakeProvider({"error": "rate_limit"}, {"titres": ["A"]})
+
+        results = self._extract(provider)
+
+        self.assertEqual(results, [{"titres": ["A"]}])
+        self.assertEqual(provider.calls, 2)
+
+    def test_transient_failure_stops_after_max_retries(self):
+        """Retries stop after max_retries attempts."""
+        provider = FakeProvider({"error": "timeout"})
+
+        self._extract(provider, max_retries=2)
+
+        self.assertEqual(provider.calls, 3)
+
+    def test_enhanced_mode_uses_max_retries(self):
+        """The default enhanced path applies the caller's max_retries."""
+        for max_retries in (0, 4):
+            provider = FakeProvider({"error": "timeout"})
+            extract_data_from_chunks(
+                [CHUNK], "titres", provider, use_cache=False, max_retries=max_retries
+            )
+            self.assertEqual(provider.calls, max_retries + 1)
+
+    def test_max_chunk_tokens_applies_to_both_modes(self):
+        """Chunks are truncated before being sent, in enhanced and classic mode."""
+        for enhanced_mode in (True, False):
+            provider = FakeProvider({"titres": ["A"]})
+            with patch('src.llm.data_extractor._truncate_chunks_to_tokens',
+                       return_value=["Un chunk tronqué mais assez long."]) as mock_truncate:
+                extract_data_from_chunks(
+                    [CHUNK], "titres", provider, enhanced_mode=enhanced_mode,
+                    use_cache=False, max_chunk_tokens=5
+                )
+            mock_truncate.assert_called_once_with([CHUNK], 5, "fake-model")
+            self.assertEqual(provider.calls, 1)
+
+    def test_permanent_failures_are_not_retried(self):
+        """Catch-all errors, invalid requests and exceptions are attempted once."""
+        for reply in ({"error": "api_error"}, {"error": "invalid_request"}, ValueError("bad model")):
+            provider = FakeProvider(reply)
+            self._extract(provider)
+            self.assertEqual(provider.calls, 1, reply)
+
+    def test_permanent_failures_do_not_open_breaker(self):
+        """Permanent failures are not counted against the shared circuit breaker."""
+        provider = FakeProvider(ValueError("missing API key"))
+
+        extract_data_from_chunks(
+            [f"{CHUNK} ({i})" for i in range(20)], "titres", provider,
+            enhanced_mode=False, use_cache=False
+        )
+
+        self.assertEqual(provider.calls, 20)
+        breaker = data_extractor.get_circuit_breaker(provider)
+        self.assertFalse(breaker.is_open)
+        self.assertEqual(len(breaker.outcomes), 0)
+
+    def test_open_breaker_skips_calls(self):
+        """No request is sent while the provider's circuit breaker is open."""
+        provider = FakeProvider({"titres": ["A"]})
+        breaker = data_extractor.get_circuit_breaker(provider)
+        for _ in range(breaker.min_calls):
+            breaker.record(False)
+
+        results = self._extract(provider)
+
+        self.assertEqual(results, [])
+        self.assertEqual(provider.calls, 0)
+
+class TestDefaultParallelism(unittest.TestCase):
+    """Test cases for default_parallelism."""
+
+    def test_by_provider_name(self):
+        """Provider names resolve to the same limits as provider instances."""
+        self.assertEqual(default_parallelism("ollama"), 1)
+        self.assertEqual(default_parallelism("lmstudio"), 2)
+        self.assertEqual(default_parallelism("openai"), 16)
+        self.assertEqual(default_parallelism("unknown"), data_extractor.DEFAULT_PARALLELISM)
+
+    def test_by_provider_instance(self):
+        """Unknown provider classes get the default limit."""
+        self.assertEqual(default_parallelism(FakeProvider()), data_extractor.DEFAULT_PARALLELISM)
+
+class TestAggregation(unittest.TestCase):
+    """Test cases for aggregate_extraction_results."""
+
+    def test_rank_by_chunk_count(self):
+        """Items are ranked by the number of chunks mentioning them, not by repetitions."""
+        results = [
+            {"titres": ["Répété", "répété ", "Répété", "Commun"]},
+            {"titres": ["commun", "Seul"]},
+            {"titres": []}
+        ]
+
+        aggregated = aggregate_extraction_results(results, rank_by_frequency=True)
+
+        self.assertEqual(aggregated["titres"], ["Commun", "Répété", "Seul"])
+
+    def test_first_appearance_order_without_ranking(self):
+        """Without ranking, deduplicated items keep their first form and order."""
+        results = [{"prix": [10, {"a": 1}], "note": "4/5"}, {"prix": [{"a": 1}, 20], "note": ""}]
+
+        aggregated = aggregate_extraction_results(results)
+
+        self.assertEqual(aggregated, {"prix": [10, {"a": 1}, 20], "note": ["4/5"]})
+
+class TestCircuitBreaker(unittest.TestCase):
+    """Test cases for the CircuitBreaker class."""
+
+    def test_stays_closed_below_min_calls(self):
+        """Failures below min_calls never open the breaker."""
+        breaker = CircuitBreaker(min_calls=5)
+        for _ in range(4):
+            breaker.record(False)
+        self.assertFalse(breaker.is_open)
+
+    def test_opens_above_failure_threshold(self):
+        """The breaker opens once the failure rate exceeds the threshold."""
+        breaker = CircuitBreaker(min_calls=4, failure_threshold=0.5)
+        for success in (True, False, False, False):
+            breaker.record(success)
+        self.assertTrue(breaker.is_open)
+
+    def test_stays_closed_at_failure_threshold(self):
+        """A failure rate equal to the threshold keeps the breaker closed."""
+        breaker = CircuitBreaker(min_calls=4, failure_threshold=0.5)
+        for success in (True, True, False, False):
+            breaker.record(success)
+        self.assertFalse(breaker.is_open)
+
+    def test_closes_after_reset_timeout(self):
+        """After reset_timeout the breaker closes with an empty history."""
+        breaker = CircuitBreaker(min_calls=2, reset_timeout=60.0)
+        with patch('src.llm.data_extractor.time.monotonic', return_value=100.0):
+            breaker.record(False)
+            breaker.record(False)
+            self.assertTrue(breaker.is_open)
+        with patch('src.llm.data_extractor.time.monotonic', return_value=161.0):
+            self.assertFalse(breaker.is_open)
+        self.assertEqual(len(breaker.outcomes), 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -4,6 +4,7 @@ import sys
 import os
 import pandas as pd
 import datetime
+from contextlib import contextmanager
 from typing import Dict, List, Any
 
 # Add the project root to the Python path to ensure imports work correctly
@@ -16,12 +17,34 @@ from src.processors.data_processor import (
     analyze_sentiment,
     categorize_text,
     sort_and_filter,
-    process_data
+    process_data,
+    PROCESS_OPERATIONS
 )
+from src.llm.model_registry import release_model
+import src.processors.data_processor as data_processor
+
+_MISSING = object()
+
+@contextmanager
+def _swap(name, value):
+    """Temporarily replace a data_processor attribute (which may not exist, e.g. pipeline)."""
+    old = getattr(data_processor, name, _MISSING)
+    setattr(data_processor, name, value)
+    try:
+        yield value
+    finally:
+        if old is _MISSING:
+            delattr(data_processor, name)
+        else:
+            setattr(data_processor, name, old)
 
 class TestDataProcessor(unittest.TestCase):
     """Test cases for the data_processor module."""
 
+    def setUp(self):
+        # Each test starts without shared models loaded by previous tests
+        release_model()
+
     def test_convert_to_dataframe_single_key(self):
         """Test converting data with a single key to DataFrame."""
         data = {"items": [{"name": "item1", "value": 10}, {"name": "item2", "value": 20}]}
@@ -87,6 +110,14 @@ class TestDataProcessor(unittest.TestCase):
         self.assertEqual(result, data)
         mock_parse_date.assert_not_called()
 
+    @patch('src.processors.data_processor.parse_date', wraps=parse_date)
+    def test_filter_by_date_parses_each_value_once(self, mock_parse_date):
+        """Test that repeated dates are only parsed once."""
+        data = {"date": ["2023-01-15", "2023-01-15", "2023-02-01"], "title": ["A", "B", "C"]}
+        result = filter_by_date(data, date_field="date", start_date="2023-01-01", end_date="2023-01-31")
+        self.assertEqual(result["title"], ["A", "B"])
+        self.assertEqual(mock_parse_date.call_count, 4)  # 2 valeurs distinctes + 2 bornes
+
     def test_filter_by_date_with_dates(self):
         """Test filtering by date with valid dates."""
         # Skip this test for now as it requires more complex mocking
@@ -105,22 +136,20 @@ class TestDataProcessor(unittest.TestCase):
         # We'll rely on the other tests to cover the functionality
         pass
 
-    @patch('src.processors.data_processor.TRANSFORMERS_AVAILABLE', False)
     def test_analyze_sentiment_transformers_not_available(self):
         """Test sentiment analysis when transformers is not available."""
         data = {
             "titles": ["Positive text", "Negative text"]
         }
 
-        result = analyze_sentiment(data, text_field="titles")
+        with _swap('TRANSFORMERS_AVAILABLE', False):
+            result = analyze_sentiment(data, text_field="titles")
 
         # Should add default sentiment values
         self.assertEqual(result["sentiment_score"], [0, 0])
         self.assertEqual(result["sentiment"], ["neutre", "neutre"])
 
-    @patch('src.processors.data_processor.TRANSFORMERS_AVAILABLE', True)
-    @patch('src.processors.data_processor.pipeline')
-    def test_analyze_sentiment_with_huggingface(self, mock_pipeline):
+    def test_analyze_sentiment_with_huggingface(self):
         """Test sentiment analysis with Hugging Face."""
         # Setup mock
         mock_sentiment_analyzer = MagicMock()
@@ -128,27 +157,29 @@ class TestDataProcessor(unittest.TestCase):
             {"label": "positive", "score": 0.9},
             {"label": "negative", "score": 0.8}
         ]
-        mock_pipeline.return_value = mock_sentiment_analyzer
+        mock_pipeline = MagicMock(return_value=mock_sentiment_analyzer)
 
         # Test data
         data = {
             "titles": ["Positive text", "Negative text"]
         }
 
-        # Analyze sentiment
-        result = analyze_sentiment(data, text_field="titles", provider="huggingface")
+        # Analyze sentiment twice: the pipeline is loaded once and shared
+        with _swap('TRANSFORMERS_AVAILABLE', True), _swap('pipeline', mock_pipeline):
+            analyze_sentiment(data, text_field="titles", provider="huggingface")
+            result = analyze_sentiment(data, text_field="titles", provider="huggingface")
 
         # Assertions
         mock_pipeline.assert_called_once_with('sentiment-analysis', model='nlptown/bert-base-multilingual-uncased-sentiment')
+        self.assertEqual(mock_sentiment_analyzer.call_count, 2)
         self.assertEqual(result["sentiment_score"], [0.9, 0.8])
         self.assertEqual(result["sentiment"], ["positive", "negative"])
 
-    @patch('src.processors.data_processor.TRANSFORMERS_AVAILABLE', True)
-    @patch('src.processors.data_processor.pipeline')
-    def test_analyze_sentiment_huggingface_error(self, mock_pipeline):
+    def test_analyze_sentiment_huggingface_error(self):
         """Test sentiment analysis with Hugging Face when an error occurs."""
-        # Setup mock to raise an exception
-        mock_pipeline.side_effect = Exception("Test error")
+        # Pipeline factory raising an exception
+        def failing_pipeline(*args, **kwargs):
+            raise Exception("Test error")
 
         # Test data
         data = {
@@ -156,12 +187,37 @@ class TestDataProcessor(unittest.TestCase):
         }
 
         # Analyze sentiment
-        result = analyze_sentiment(data, text_field="titles", provider="huggingface")
+        with _swap('TRANSFORMERS_AVAILABLE', True), _swap('pipeline', failing_pipeline):
+            result = analyze_sentiment(data, text_field="titles", provider="huggingface")
 
         # Should add error sentiment values
         self.assertEqual(result["sentiment_score"], [0, 0])
         self.assertEqual(result["sentiment"], ["erreur", "erreur"])
 
+    def test_analyze_sentiment_with_openai_client(self):
+        """Test sentiment analysis with OpenAI through a per-call client."""
+        def reply(label):
+            return MagicMock(choices=[MagicMock(message=MagicMock(content=f" {label.capitalize()} "))])
+
+        mock_openai = MagicMock()
+        mock_create = mock_openai.OpenAI.return_value.chat.completions.create
+        mock_create.side_effect = [reply("positif"), reply("négatif")]
+
+        data = {
+            "titles": ["Positive text", "Negative text"]
+        }
+
+        with patch.dict(sys.modules, {"openai": mock_openai}), \
+             patch.dict(os.environ, {"OPENAI_API_KEY": "test-key"}):
+            result = analyze_sentiment(data, text_field="titles", provider="openai")
+
+        # Assertions
+        mock_openai.OpenAI.assert_called_once_with(api_key="test-key")
+        self.assertEqual(mock_create.call_count, 2)
+        self.assertEqual(mock_create.call_args.kwargs["messages"][1]["content"], "Negative text")
+        self.assertEqual(result["sentiment_score"], [0.9, 0.1])
+        self.assertEqual(result["sentiment"], ["positif", "négatif"])
+
     def test_analyze_sentiment_unknown_provider(self):
         """Test sentiment analysis with an unknown provider."""
         data = {
@@ -236,6 +292,46 @@ class TestDataProcessor(unittest.TestCase):
         self.assertEqual(result["names"], ["A", "B", "C"])
         self.assertEqual(result["values"], [10, 20, 30])
 
+    def test_sort_and_filter_simple_data_skips_dataframe(self):
+        """Test simple columns with a simple filter are handled without pandas."""
+        data = {
+            "names": ["A", "B", "C"],
+            "values": [10, 20, 30]
+        }
+
+        with patch('src.processors.data_processor.convert_to_dataframe') as mock_convert:
+            result = sort_and_filter(data, sort_by="values", ascending=False, filter_expr="names != 'B'")
+
+        mock_convert.assert_not_called()
+        self.assertEqual(result["names"], ["C", "A"])
+        self.assertEqual(result["values"], [30, 10])
+
+    def test_sort_and_filter_combined_filter_skips_dataframe(self):
+        """Test comparisons combined with and/or are compiled and evaluated without pandas."""
+        data = {
+            "names": ["A", "B", "C"],
+            "values": [10, 20, 30]
+        }
+
+        with patch('src.processors.data_processor.convert_to_dataframe') as mock_convert:
+            result = sort_and_filter(data, filter_expr="values > 15 and values < 30")
+
+        mock_convert.assert_not_called()
+        self.assertEqual(result["names"], ["B"])
+        self.assertEqual(result["values"], [20])
+
+    def test_sort_and_filter_complex_filter_uses_dataframe(self):
+        """Test filter expressions beyond simple comparisons still go through pandas."""
+        data = {
+            "names": ["A", "B", "C"],
+            "values": [10, 20, 30]
+        }
+
+        result = sort_and_filter(data, filter_expr="values in [10, 30]")
+
+        self.assertEqual(result["names"], ["A", "C"])
+        self.assertEqual(result["values"], [10, 30])
+
     def test_process_data_multiple_operations(self):
         """Test processing data with multiple operations."""
         data = {
@@ -254,32 +350,28 @@ class TestDataProcessor(unittest.TestCase):
             }
         ]
 
-        # Mock the individual functions
-        with patch('src.processors.data_processor.filter_by_date') as mock_filter, \
-             patch('src.processors.data_processor.sort_and_filter') as mock_sort:
-
-            # Setup return values
-            filtered_data = {
-                "titles": ["Good product", "Bad service"],
-                "dates": ["2023-01-01", "2023-02-01"],
-                "dates_parsées": ["2023-01-01", "2023-02-01"]
-            }
-            mock_filter.return_value = filtered_data
+        filtered_data = {
+            "titles": ["Good product", "Bad service"],
+            "dates": ["2023-01-01", "2023-02-01"],
+            "dates_parsées": ["2023-01-01", "2023-02-01"]
+        }
+        sorted_data = {
+            "titles": ["Bad service", "Good product"],
+            "dates": ["2023-02-01", "2023-01-01"],
+            "dates_parsées": ["2023-02-01", "2023-01-01"]
+        }
 
-            sorted_data = {
-                "titles": ["Bad service", "Good product"],
-                "dates": ["2023-02-01", "2023-01-01"],
-                "dates_parsées": ["2023-02-01", "2023-01-01"]
-            }
-            mock_sort.return_value = sorted_data
+        mock_filter = Mock(return_value=filtered_data)
+        mock_sort = Mock(return_value=sorted_data)
 
-            # Process data
+        # Replace the individual functions in the operation table
+        with patch.dict(PROCESS_OPERATIONS, {"filter_by_date": mock_filter, "sort_and_filter": mock_sort}):
             result = process_data(data, operations)
 
-            # Assertions
-            mock_filter.assert_called_once_with(data, date_field="dates", days=60)
-            mock_sort.assert_called_once_with(filtered_data, sort_by="titles")
-            self.assertEqual(result, sorted_data)
+        # Assertions
+        mock_filter.assert_called_once_with(data, date_field="dates", days=60)
+        mock_sort.assert_called_once_with(filtered_data, sort_by="titles")
+        self.assertEqual(result, sorted_data)
 
     def test_process_data_unknown_operation(self):
         """Test processing data with an unknown operation type."""
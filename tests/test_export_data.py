@@ -0,0 +1,92 @@
+import unittest
+import tempfile
+import shutil
+import sys
+import os
+from unittest.mock import patch
+
+import pandas as pd
+
+# Add the project root to the Python path to ensure imports work correctly
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import export_data
+from export_data import _write_csv, clean_dataframe, flatten_complex_data
+
+class TestWriteCsv(unittest.TestCase):
+    """Test cases for the CSV writer of export_data."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def _assert_same_as_pandas(self, df):
+        written = os.path.join(self.tmp_dir, "written.csv")
+        expected = os.path.join(self.tmp_dir, "expected.csv")
+        _write_csv(df, written, {})
+        df.to_csv(expected, index=False)
+        with open(written, "rb") as f_written, open(expected, "rb") as f_expected:
+            self.assertEqual(f_written.read(), f_expected.read())
+
+    def test_mixed_types_match_pandas(self):
+        """Booleans, floats, dates and missing values are written as pandas writes them."""
+        df = pd.DataFrame({
+            "nom": ["a, b", 'dit "oui"', None],
+            "quantite": [1, 2, 3],
+            "actif": [True, False, True],
+            "prix": [1.0, 2.5, float("nan")],
+            "date": pd.to_datetime(["2024-01-05", "2024-02-01", None])
+        })
+        self._assert_same_as_pandas(df)
+
+    def test_int_and_string_columns_match_pandas(self):
+        """Integer and string columns give the same file with either writer."""
+        df = pd.DataFrame({
+            "nom": ["simple", "a, b", 'dit "oui"', None],
+            "quantite": [1, 20, 300, 4000]
+        })
+        self._assert_same_as_pandas(df)
+
+    @unittest.skipUnless(export_data.PYARROW_QUOTING_NEEDED, "pyarrow >= 12 is not installed")
+    def test_arrow_writer_only_for_identical_output(self):
+        """pyarrow writes integer/string frames and leaves other dtypes to pandas."""
+        path = os.path.join(self.tmp_dir, "out.csv")
+        with patch('export_data.pacsv.write_csv', wraps=export_data.pacsv.write_csv) as mock_write:
+            _write_csv(pd.DataFrame({"nom": ["a"], "quantite": [1]}), path, {})
+            _write_csv(pd.DataFrame({"nom": ["a"], "actif": [True]}), path, {})
+        self.assertEqual(mock_write.call_count, 1)
+
+class TestCleanDataframe(unittest.TestCase):
+    """Test cases for clean_dataframe."""
+
+    def test_repetitive_columns_stay_object(self):
+        """Columns categorized for deduplication are returned as object columns."""
+        df = pd.DataFrame({
+            "categorie": ["a", "b"] * 1000,
+            "valeur": list(range(2000))
+        })
+
+        result = clean_dataframe(df)
+
+        self.assertEqual(result["categorie"].dtype, object)
+        self.assertEqual(len(result), 2000)
+        self.assertEqual(df["categorie"].dtype, object)
+
+class TestFlattenComplexData(unittest.TestCase):
+    """Test cases for flatten_complex_data."""
+
+    def test_residual_structures_are_compact_json(self):
+        """Primitive lists and structures past max_depth become compact, non-escaped JSON."""
+        df = pd.DataFrame({
+            "infos": [{"tags": ["a", "é"], "detail": {"x": {"y": 1, "z": "ü"}}}]
+        })
+
+        result = flatten_complex_data(df)
+
+        self.assertEqual(result.loc[0, "infos_tags"], '["a","é"]')
+        self.assertEqual(result.loc[0, "infos_detail_x"], '{"y":1,"z":"ü"}')
+
+if __name__ == '__main__':
+    unittest.main()
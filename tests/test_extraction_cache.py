@@ -0,0 +1,60 @@
+import unittest
+import tempfile
+import shutil
+import sys
+import os
+
+# Add the project root to the Python path to ensure imports work correctly
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.llm.extraction_cache import ExtractionCache
+
+class TestExtractionCache(unittest.TestCase):
+    """Test cases for the extraction_cache module."""
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.cache = ExtractionCache(cache_dir=self.cache_dir, enabled=True, ttl=0)
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir)
+
+    def test_get_missing_key(self):
+        """A missing key returns None and counts as a miss."""
+        self.assertIsNone(self.cache.get("missing"))
+        self.assertEqual(self.cache.cache_info()["misses"], 1)
+
+    def test_set_then_get_from_memory(self):
+        """A freshly written entry is served from memory."""
+        self.cache.set("key", {"titres": ["A"]})
+
+        self.assertEqual(self.cache.get("key"), {"titres": ["A"]})
+        self.assertEqual(self.cache.cache_info()["memory_hits"], 1)
+
+    def test_get_returns_independent_copies(self):
+        """Mutating a returned result does not alter the cached entry."""
+        self.cache.set("key", {"titres": ["A"]})
+        self.cache.get("key")["titres"].append("B")
+
+        self.assertEqual(self.cache.get("key"), {"titres": ["A"]})
+
+    def test_get_from_disk(self):
+        """Entries written by another instance are read from disk."""
+        self.cache.set("key", {"titres": ["A"]})
+        other = ExtractionCache(cache_dir=self.cache_dir, enabled=True, ttl=0)
+
+        self.assertEqual(other.get("key"), {"titres": ["A"]})
+        self.assertEqual(other.cache_info()["disk_hits"], 1)
+
+    def test_memory_eviction(self):
+        """The in-memory layer never holds more than memory_size entries."""
+        cache = ExtractionCache(cache_dir=self.cache_dir, enabled=True, ttl=0, memory_size=2)
+        for i in range(3):
+            cache.set(f"key{i}", {"i": i})
+
+        self.assertEqual(cache.cache_info()["memory_size"], 2)
+        # The evicted entry is still available on disk
+        self.assertEqual(cache.get("key0"), {"i": 0})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+import unittest
+import sys
+import os
+import io
+import json
+from unittest.mock import patch
+
+# Add the project root to the Python path to ensure imports work correctly
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.utils import file_handler
+from src.utils.file_handler import dumps_json, dump_jsonl_line, index_base_path
+
+class TestFileHandler(unittest.TestCase):
+    """Test cases for the file_handler module."""
+
+    def test_index_base_path_strips_known_suffixes(self):
+        """The .index and .meta extensions are removed."""
+        self.assertEqual(index_base_path("data/foo.index"), "data/foo")
+        self.assertEqual(index_base_path("data/foo.meta"), "data/foo")
+
+    def test_index_base_path_without_suffix(self):
+        """A base path is returned unchanged."""
+        self.assertEqual(index_base_path("data/foo"), "data/foo")
+
+    def test_index_base_path_strips_single_suffix(self):
+        """Only one trailing extension is removed."""
+        self.assertEqual(index_base_path("foo.index.index"), "foo.index")
+        self.assertEqual(index_base_path("foo.meta.index"), "foo.meta")
+
+    def test_index_base_path_keeps_similar_characters(self):
+        """Trailing characters of the extensions are not stripped one by one."""
+        self.assertEqual(index_base_path("foo.iiinnndex"), "foo.iiinnndex")
+        self.assertEqual(index_base_path("vectors_indexed"), "vectors_indexed")
+
+    def test_dumps_json_falls_back_on_unsupported_types(self):
+        """Values orjson rejects are serialized by the standard json module."""
+        self.assertEqual(json.loads(dumps_json({"n": 2 ** 70})), {"n": 2 ** 70})
+
+    def test_dumps_json_without_orjson(self):
+        """Without orjson the output is UTF-8 JSON with sorted keys when requested."""
+        with patch.object(file_handler, 'ORJSON_AVAILABLE', False):
+            raw = dumps_json({"b": "é", "a": 1}, sort_keys=True)
+        self.assertEqual(raw, '{"a":1,"b":"é"}'.encode('utf-8'))
+
+    def test_dump_jsonl_line_round_trip(self):
+        """Each call writes one JSON object followed by a newline."""
+        buffer = io.BytesIO()
+        dump_jsonl_line({"chunk": 0, "result": {"titres": ["A"]}}, buffer)
+        dump_jsonl_line({"chunk": 1, "result": {}}, buffer)
+        lines = buffer.getvalue().splitlines()
+        self.assertEqual([json.loads(line) for line in lines], [
+            {"chunk": 0, "result": {"titres": ["A"]}},
+            {"chunk": 1, "result": {}}
+        ])
+
+if __name__ == '__main__':
+    unittest.main()
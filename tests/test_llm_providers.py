@@ -0,0 +1,81 @@
+import unittest
+import sys
+import os
+import json
+from unittest.mock import patch, MagicMock
+
+# Add the project root to the Python path to ensure imports work correctly
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.llm.providers import (
+    JsonStreamScanner,
+    extract_json_object,
+    parse_json_response
+)
+
+class TestJsonResponseParsing(unittest.TestCase):
+    """Test cases for the JSON helpers shared by the LLM providers."""
+
+    def test_extract_json_object_ignores_braces_in_strings(self):
+        """Braces and escaped quotes inside strings do not close the object."""
+        text = 'Voici: {"titre": "a } b { c", "citation": "il dit \\"}\\""} fin'
+        self.assertEqual(
+            extract_json_object(text),
+            '{"titre": "a } b { c", "citation": "il dit \\"}\\""}'
+        )
+
+    def test_extract_json_object_with_code_fence(self):
+        """An object wrapped in a markdown code block is extracted."""
+        text = '```json\n{"prix": [1, 2]}\n```'
+        self.assertEqual(extract_json_object(text), '{"prix": [1, 2]}')
+
+    def test_extract_json_object_with_trailing_text(self):
+        """Text after the first complete object is ignored."""
+        text = '{"a": {"b": 1}} puis {"c": 2}'
+        self.assertEqual(extract_json_object(text), '{"a": {"b": 1}}')
+
+    def test_extract_json_object_unclosed(self):
+        """An object that is never closed yields None."""
+        self.assertIsNone(extract_json_object('{"a": [1, 2'))
+        self.assertIsNone(extract_json_object("pas de JSON"))
+
+    def test_scanner_across_fragments(self):
+        """The stream scanner finds the object across fragments and records where it starts."""
+        scanner = JsonStreamScanner()
+        self.assertFalse(scanner.feed('Réponse : {"a": "'))
+        self.assertFalse(scanner.feed('}", "b": '))
+        self.assertTrue(scanner.feed('2} reste'))
+        self.assertEqual(scanner.json_text, '{"a": "}", "b": 2}')
+
+    def test_parse_json_response_with_surrounding_text(self):
+        """A response with a code fence and trailing text is parsed."""
+        text = '```json\n{"titres": ["A {1}"]}\n```\nJ\'espère que cela aide.'
+        self.assertEqual(parse_json_response(text), {"titres": ["A {1}"]})
+
+    def test_parse_json_response_invalid(self):
+        """A response without any JSON object raises JSONDecodeError."""
+        with self.assertRaises(json.JSONDecodeError):
+            parse_json_response("aucune donnée")
+
+class TestOpenRouterProviderParsing(unittest.TestCase):
+    """Test cases for OpenRouterProvider response parsing."""
+
+    def _extract(self, content):
+        from src.llm.providers.openrouter_provider import OpenRouterProvider
+        response = MagicMock()
+        response.json.return_value = {"choices": [{"message": {"content": content}}]}
+        with patch('src.llm.providers.openrouter_provider.requests.post', return_value=response):
+            return OpenRouterProvider(api_key="test").extract("contenu", "instruction")
+
+    def test_extract_returns_object(self):
+        """A JSON object reply is returned as a dict."""
+        self.assertEqual(self._extract('{"titres": ["A"]}'), {"titres": ["A"]})
+
+    def test_extract_rejects_non_object_json(self):
+        """A valid JSON reply that is not an object is reported as a parsing error."""
+        result = self._extract('["A", "B"]')
+        self.assertEqual(result["error"], "parsing_error")
+        self.assertEqual(result["raw_response"], '["A", "B"]')
+
+if __name__ == '__main__':
+    unittest.main()
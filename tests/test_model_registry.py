@@ -0,0 +1,73 @@
+import unittest
+from unittest.mock import MagicMock
+import sys
+import os
+
+# Add the project root to the Python path to ensure imports work correctly
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.llm import model_registry
+from src.llm.model_registry import get_model, release_model
+
+class TestModelRegistry(unittest.TestCase):
+    """Test cases for the model_registry module."""
+
+    def setUp(self):
+        release_model()
+
+    def tearDown(self):
+        release_model()
+
+    def test_get_model_loads_once(self):
+        """The factory is only called once for identical arguments."""
+        factory = MagicMock(side_effect=lambda task, model=None: object())
+
+        first = get_model(factory, "sentiment-analysis", model="model-a")
+        second = get_model(factory, "sentiment-analysis", model="model-a")
+
+        self.assertIs(first, second)
+        factory.assert_called_once_with("sentiment-analysis", model="model-a")
+
+    def test_get_model_different_arguments(self):
+        """Different arguments produce different models."""
+        factory = MagicMock(side_effect=lambda task, model=None: object())
+
+        first = get_model(factory, "sentiment-analysis", model="model-a")
+        second = get_model(factory, "sentiment-analysis", model="model-b")
+
+        self.assertIsNot(first, second)
+        self.assertEqual(factory.call_count, 2)
+
+    def test_get_model_factory_error_not_cached(self):
+        """A failing load is not kept in the registry."""
+        factory = MagicMock(side_effect=[Exception("Test error"), "model"])
+
+        with self.assertRaises(Exception):
+            get_model(factory, "model-a")
+
+        self.assertEqual(get_model(factory, "model-a"), "model")
+
+    def test_get_model_evicts_least_recently_used(self):
+        """The registry never holds more than MODEL_REGISTRY_SIZE models."""
+        factory = MagicMock(side_effect=lambda name: object())
+
+        for i in range(model_registry.MODEL_REGISTRY_SIZE + 1):
+            get_model(factory, f"model-{i}")
+
+        self.assertEqual(len(model_registry._models), model_registry.MODEL_REGISTRY_SIZE)
+
+        # The first model was evicted and is loaded again
+        get_model(factory, "model-0")
+        self.assertEqual(factory.call_count, model_registry.MODEL_REGISTRY_SIZE + 2)
+
+    def test_release_model_by_name(self):
+        """Only the models matching the given name are released."""
+        factory = MagicMock(side_effect=lambda task, model=None: object())
+        get_model(factory, "sentiment-analysis", model="model-a")
+        get_model(factory, "sentiment-analysis", model="model-b")
+
+        self.assertEqual(release_model("model-a"), 1)
+        self.assertEqual(len(model_registry._models), 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -76,10 +76,29 @@ class TestPdfProcessor(unittest.TestCase):
         self.assertEqual(mock_doc.load_page.call_count, 2)
         mock_doc.close.assert_called_once()
 
+    @patch('os.path.exists')
+    @patch('fitz.open')
+    def test_extract_text_from_pdf_max_chars(self, mock_fitz_open, mock_exists):
+        """Test extract_text_from_pdf stops reading pages once max_chars is reached."""
+        mock_exists.return_value = True
+        mock_doc = MagicMock()
+        mock_page = MagicMock()
+        mock_page.get_text.return_value = "Page content"
+        mock_doc.load_page.return_value = mock_page
+        mock_doc.__len__.return_value = 5
+        mock_fitz_open.return_value = mock_doc
+
+        result = extract_text_from_pdf("test.pdf", max_chars=20)
+
+        self.assertEqual(result, "Page content\n\nPage content\n\n")
+        self.assertEqual(mock_doc.load_page.call_count, 2)
+        mock_doc.close.assert_called_once()
+
+    @patch('mmap.mmap', side_effect=ValueError("cannot mmap an empty file"))
     @patch('os.path.exists')
     @patch('fitz.open', side_effect=ImportError("No module named 'fitz'"))
     @patch('PyPDF2.PdfReader')
-    def test_extract_text_from_pdf_with_pypdf2(self, mock_pdf_reader, mock_fitz_open, mock_exists):
+    def test_extract_text_from_pdf_with_pypdf2(self, mock_pdf_reader, mock_fitz_open, mock_exists, mock_mmap):
         """Test extract_text_from_pdf fallback to PyPDF2."""
         # Setup mocks
         mock_exists.return_value = True
@@ -99,13 +118,14 @@ class TestPdfProcessor(unittest.TestCase):
         self.assertEqual(result, "Page content\n\nPage content\n\n")
         mock_exists.assert_called_once_with("test.pdf")
         mock_fitz_open.assert_called_once_with("test.pdf")
-        mock_pdf_reader.assert_called_once()
+        mock_pdf_reader.assert_called_once_with(m.return_value)
         m.assert_called_once_with("test.pdf", 'rb')
 
+    @patch('mmap.mmap', side_effect=ValueError("cannot mmap an empty file"))
     @patch('os.path.exists')
     @patch('fitz.open', side_effect=Exception("PyMuPDF error"))
     @patch('PyPDF2.PdfReader')
-    def test_extract_text_from_pdf_pymupdf_error(self, mock_pdf_reader, mock_fitz_open, mock_exists):
+    def test_extract_text_from_pdf_pymupdf_error(self, mock_pdf_reader, mock_fitz_open, mock_exists, mock_mmap):
         """Test extract_text_from_pdf when PyMuPDF raises an error."""
         # Setup mocks
         mock_exists.return_value = True
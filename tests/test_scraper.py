@@ -1,7 +1,9 @@
 import unittest
-from unittest.mock import patch, MagicMock, Mock
+from unittest.mock import patch, MagicMock, Mock, AsyncMock
 import sys
 import os
+import tempfile
+import asyncio
 import requests
 
 # Add the project root to the Python path to ensure imports work correctly
@@ -11,9 +13,12 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
 import src.scrapers.scraper
 from src.scrapers.scraper import (
     fetch_content,
+    fetch_content_to_file,
     _determine_best_method,
     _fetch_with_requests,
-    _fetch_with_selenium
+    _fetch_with_selenium,
+    _fetch_with_playwright,
+    _resource_blocker
 )
 
 class TestScraper(unittest.TestCase):
@@ -30,6 +35,11 @@ class TestScraper(unittest.TestCase):
         self.assertEqual(_determine_best_method("https://example.com"), "requests")
         self.assertEqual(_determine_best_method("https://python.org"), "requests")
 
+        # Only the host and its parent domains are matched
+        self.assertEqual(_determine_best_method("https://M.Facebook.com:443/page"), "selenium")
+        self.assertEqual(_determine_best_method("https://notfacebook.com"), "requests")
+        self.assertEqual(_determine_best_method("https://example.com/twitter.com"), "requests")
+
     @patch('src.scrapers.scraper.requests.get')
     def test_fetch_with_requests_success(self, mock_get):
         """Test successful request with the requests library."""
@@ -166,5 +176,73 @@ class TestScraper(unittest.TestCase):
         mock_fetch_requests.assert_called_once()
         mock_sleep.assert_called_once()  # Should still respect rate limiting
 
+    @patch('src.scrapers.scraper.requests.get')
+    @patch('src.scrapers.scraper.time.sleep')
+    def test_fetch_content_to_file_saves_raw_body(self, mock_sleep, mock_get):
+        """Test fetch_content_to_file saves the raw body and decodes it like fetch_content."""
+        body = "<html><body>Téléphone</body></html>".encode("utf-8")
+        mock_response = MagicMock()
+        mock_response.content = body
+        mock_response.text = body.decode("utf-8")
+        mock_response.encoding = "ISO-8859-1"
+        mock_response.apparent_encoding = "utf-8"
+        mock_get.return_value = mock_response
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "page.html")
+            result = fetch_content_to_file("https://example.com", path, method="requests",
+                                           respect_robots=False)
+            with open(path, "rb") as f:
+                saved = f.read()
+
+        self.assertEqual(result, body.decode("utf-8"))
+        self.assertEqual(saved, body)
+        # Same encoding detection as _fetch_with_requests
+        self.assertEqual(mock_response.encoding, "utf-8")
+
+    @patch('src.scrapers.scraper._fetch_with_playwright')
+    @patch('src.scrapers.scraper.time.sleep')
+    def test_fetch_content_playwright(self, mock_sleep, mock_fetch_playwright):
+        """Test fetch_content forwards Playwright options."""
+        mock_fetch_playwright.return_value = "<html><body>Playwright Content</body></html>"
+
+        result = fetch_content("https://example.com", method="playwright", respect_robots=False,
+                               wait_selector="article", block_resources=["image", "font"])
+
+        self.assertEqual(result, "<html><body>Playwright Content</body></html>")
+        mock_fetch_playwright.assert_called_once_with(
+            "https://example.com", unittest.mock.ANY, "article", ["image", "font"]
+        )
+
+    def test_fetch_with_playwright_inside_running_loop(self):
+        """Test Playwright fetching from code already running in an event loop."""
+        async def fake_fetch(url, user_agent, wait_selector, block_resources):
+            return f"<html>{url}</html>"
+
+        async def caller():
+            # e.g. a FastAPI endpoint or a Jupyter cell
+            return _fetch_with_playwright("https://example.com")
+
+        with patch('src.scrapers.scraper._fetch_with_playwright_async', fake_fetch):
+            result = asyncio.run(caller())
+
+        self.assertEqual(result, "<html>https://example.com</html>")
+
+    def test_resource_blocker(self):
+        """Test the route handler aborts blocked resource types only."""
+        handler = _resource_blocker(frozenset({"image", "font"}))
+        image_route = AsyncMock()
+        image_route.request.resource_type = "image"
+        document_route = AsyncMock()
+        document_route.request.resource_type = "document"
+
+        asyncio.run(handler(image_route))
+        asyncio.run(handler(document_route))
+
+        image_route.abort.assert_awaited_once()
+        image_route.continue_.assert_not_awaited()
+        document_route.continue_.assert_awaited_once()
+        document_route.abort.assert_not_awaited()
+
 if __name__ == '__main__':
     unittest.main()
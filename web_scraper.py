@@ -213,7 +213,7 @@ def main():
                         help="Vectoriser les chunks avec un modèle d'embedding")
     parser.add_argument("--model", default="all-MiniLM-L6-v2",
                         help="Modèle sentence-transformers à utiliser pour la vectorisation")
-    parser.add_argument("--index-type", choices=["L2", "IP", "IVF"], default="L2",
+    parser.add_argument("--index-type", choices=["L2", "IP", "IVF", "HNSW", "IVFPQ"], default="L2",
                         help="Type d'index FAISS à créer")
     
     # Options éthiques et légales